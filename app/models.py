@@ -135,6 +135,36 @@ EVENT_SCHEMA = {
     'created_by': ObjectId
 }
 
+ATTENDANCE_SCHEMA = {
+    '_id': ObjectId,
+    'source': str,        # 'event', 'training'
+    'ref_id': ObjectId,   # events._id or training_sessions._id
+    'player_id': ObjectId,
+    'club_id': ObjectId,  # denormalized from the event/session
+    'team_id': ObjectId,  # denormalized from the event/session
+    'date': datetime,     # denormalized from the event/session
+    'status': str,        # 'present', 'absent', 'late', 'excused', 'convoked', 'uncertain'
+    'reason': str,        # Optional
+    'rating': int,        # Optional (training sessions)
+    'created_at': datetime,
+    'updated_at': datetime
+}
+
+RECURRENCE_SCHEMA = {
+    '_id': ObjectId,
+    'source': str,        # 'event', 'training'
+    'club_id': ObjectId,
+    'team_id': ObjectId,  # None for club-wide series
+    'template': dict,     # event / training session document without _id and date
+    'dtstart': datetime,  # first occurrence
+    'interval': int,      # 1 = weekly, 2 = biweekly
+    'until': datetime,    # Optional
+    'count': int,         # Optional
+    'exdates': list,      # cancelled occurrence datetimes
+    'last_date': datetime,  # computed from until/count, None when open-ended
+    'created_at': datetime
+}
+
 MATCH_SCHEMA = {
     '_id': ObjectId,
     'club_id': ObjectId,
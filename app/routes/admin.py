@@ -761,11 +761,8 @@ def members_directory():
     page      = max(1, int(request.args.get('page', 1)))
     per_page  = 25
 
-    all_members = user_service.search_members(club_id, search, role, team_id, status)
-    total = len(all_members)
-
-    # Pagination slice
-    members = all_members[(page - 1) * per_page: page * per_page]
+    result = user_service.list_members(club_id, search, role, team_id, status, page=page, per_page=per_page)
+    members, total = result['items'], result['total']
 
     # Enrich with team names
     teams = list(team_service.get_by_club(club_id))
@@ -800,7 +797,7 @@ def announcements():
         flash('Aucun club associé.', 'error')
         return redirect(url_for('admin.dashboard'))
     announcement_service = get_announcement_service()
-    history = announcement_service.get_announcements(club_id)
+    history = announcement_service.get_announcements(club_id, q=request.args.get('q'))
     teams = team_service.get_by_club(club_id)
     return render_template('admin/announcements.html', history=history, teams=teams)
 
@@ -1415,70 +1412,26 @@ def delete_event(event_id):
 @login_required
 @role_required('admin')
 def calendar_data():
-    """Return unified calendar data: competitions + matches + events"""
-    from app.services import get_competition_service, get_match_service, get_event_service, get_user_service, get_team_service
+    """Return unified calendar data (competitions + matches + events) for ?start=&end= (default: current month)"""
+    from app.services import get_calendar_service, get_user_service, get_team_service
+    from app.services.calendar_service import serialize_items
+    from app.services.dates import month_bounds
     user_service = get_user_service()
     admin_user = user_service.get_by_id(session.get('user_id'))
     club_id = admin_user.get('club_id')
     if not club_id:
         return jsonify([])
 
-    competition_service = get_competition_service()
-    match_service = get_match_service()
-    event_service = get_event_service()
-    team_service = get_team_service()
+    now = datetime.utcnow()
+    default_start, default_end = month_bounds(now.year, now.month)
+    start = request.args.get('start') or default_start
+    end = request.args.get('end') or default_end
 
-    teams = team_service.get_by_club(club_id)
+    teams = get_team_service().get_by_club(club_id)
     team_map = {str(t['_id']): t.get('name', '') for t in teams}
 
-    items = []
-
-    # Competitions → calendar items (use start_date)
-    for c in competition_service.get_all(club_id):
-        if c.get('start_date'):
-            items.append({
-                'id': str(c['_id']),
-                'title': c.get('name', ''),
-                'date': c['start_date'].isoformat() if hasattr(c['start_date'], 'isoformat') else str(c['start_date']),
-                'end_date': c['end_date'].isoformat() if c.get('end_date') and hasattr(c['end_date'], 'isoformat') else '',
-                'type': 'competition',
-                'subtype': c.get('type', ''),
-                'status': c.get('status', ''),
-                'category': c.get('category', ''),
-                'location': '',
-            })
-
-    # Matches → calendar items
-    for m in match_service.get_by_club(club_id):
-        if m.get('date'):
-            items.append({
-                'id': str(m['_id']),
-                'title': f"vs {m.get('opponent', '?')}",
-                'date': m['date'].isoformat() if hasattr(m['date'], 'isoformat') else str(m['date']),
-                'type': 'match',
-                'subtype': 'home' if m.get('is_home') else 'away',
-                'status': m.get('status', 'scheduled'),
-                'category': '',
-                'location': m.get('location', ''),
-                'team': team_map.get(str(m.get('team_id', '')), ''),
-                'score': m.get('score'),
-                'competition': m.get('competition', ''),
-            })
-
-    # Events → calendar items
-    for e in event_service.get_by_club(club_id):
-        if e.get('date'):
-            items.append({
-                'id': str(e['_id']),
-                'title': e.get('title', ''),
-                'date': e['date'].isoformat() if hasattr(e['date'], 'isoformat') else str(e['date']),
-                'type': 'event',
-                'subtype': e.get('type', 'other'),
-                'status': e.get('status', 'scheduled'),
-                'category': e.get('category', ''),
-                'location': e.get('location', ''),
-                'description': e.get('description', ''),
-            })
-
-    from app.models import serialize_docs
-    return jsonify(items)
+    items = get_calendar_service().get_feed(
+        club_id, start=start, end=end,
+        types=('competition', 'match', 'event'), team_names=team_map
+    )
+    return jsonify(serialize_items(items))
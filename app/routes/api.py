@@ -4,10 +4,9 @@
 # =====================
 
 import jwt
-import os
 import datetime
 import smtplib
-from flask import Blueprint, jsonify, request, current_app, render_template, url_for, make_response
+from flask import Blueprint, jsonify, request, current_app, render_template, url_for, make_response, Response
 from app.models import serialize_doc, serialize_docs
 from app.services import (
     get_player_service, get_club_service, get_event_service,
@@ -19,6 +18,7 @@ from app.services import (
     get_announcement_service,
     get_platform_management_service, get_platform_analytics_service,
     get_parent_monitoring_service, get_fan_engagement_service, get_media_service,
+    get_search_service, get_autocomplete_service, get_upload_service, get_feed_service,
 )
 from app.services.messaging_service import MessagingService
 from app.services.db import mongo
@@ -107,6 +107,16 @@ def _get_club_personalization(club):
     else:
         personalization.pop('coverUrl', None)
     
+    # Resized variants, while the current image is still the uploaded one
+    for key, url_key, variants_key in (('logoVariants', 'logoUrl', 'logo_variants'),
+                                       ('coverVariants', 'coverUrl', 'cover_variants')):
+        variants = club.get(variants_key) or {}
+        urls = {u for formats in variants.values() for u in formats.values()}
+        if personalization.get(url_key) in urls:
+            personalization[key] = variants
+        else:
+            personalization.pop(key, None)
+
     personalization.setdefault('primaryColor', colors.get('primary', '#22c55e'))
     personalization.setdefault('accentColor', colors.get('secondary', '#16a34a'))
 
@@ -133,17 +143,17 @@ def _build_auth_user(user):
     }
 
 
-def _save_club_asset(club_id, file_storage, asset_name):
+def _save_club_asset(club_id, file_storage):
+    """Store a club image with its variants. Returns ({'url', 'variants'}, error)."""
+    from app.services.image_service import save_image, ImageError
     ext = file_storage.filename.rsplit('.', 1)[-1].lower() if '.' in file_storage.filename else ''
     if ext not in ALLOWED_IMAGE_EXTENSIONS:
         return None, 'Type de fichier invalide'
 
-    upload_dir = os.path.join(current_app.static_folder, 'uploads', 'clubs', str(club_id))
-    os.makedirs(upload_dir, exist_ok=True)
-
-    filename = f'{asset_name}.{ext}'
-    file_storage.save(os.path.join(upload_dir, filename))
-    return f'/static/uploads/clubs/{club_id}/{filename}', None
+    try:
+        return save_image(file_storage, get_upload_service(), ext, club_id=club_id), None
+    except ImageError as exc:
+        return None, str(exc)
 
 @api_bp.route('/admin/seed-players', methods=['POST'])
 @role_required('admin')
@@ -660,6 +670,85 @@ def get_event(event_id):
     return jsonify({'success': False, 'error': 'Event not found'}), 404
 
 
+@api_bp.route('/calendar', methods=['GET'])
+@token_required
+def get_calendar():
+    """Merged calendar feed for ?start=&end= (default: current month).
+
+    Optional: team_id, types=match,event,training,competition
+    """
+    from app.services import get_calendar_service
+    from app.services.calendar_service import ITEM_TYPES, DEFAULT_TYPES, serialize_items
+    from app.services.dates import month_bounds
+    club_id = request.current_user.get('club_id')
+    if not club_id:
+        return jsonify({'success': True, 'data': []})
+
+    now = datetime.datetime.utcnow()
+    default_start, default_end = month_bounds(now.year, now.month)
+    types = tuple(t for t in request.args.get('types', '').split(',') if t in ITEM_TYPES) or DEFAULT_TYPES
+    team_id = request.args.get('team_id')
+
+    items = get_calendar_service().get_feed(
+        club_id,
+        team_ids=[team_id] if team_id else None,
+        start=request.args.get('start') or default_start,
+        end=request.args.get('end') or default_end,
+        types=types,
+    )
+    return jsonify({'success': True, 'data': serialize_items(items)})
+
+
+@api_bp.route('/calendar/feeds', methods=['POST'])
+@token_required
+def create_calendar_feed():
+    """Get (or create) the caller's tokenized .ics subscription URL.
+
+    Body: {scope: 'user'|'team', team_id?}
+    """
+    from app.services import get_ics_feed_service
+    from app.services.ics_service import SCOPE_USER, SCOPE_TEAM
+    data = request.get_json() or {}
+    club_id = request.current_user.get('club_id')
+    scope = data.get('scope', SCOPE_USER)
+    team_id = data.get('team_id')
+    if not club_id or scope not in (SCOPE_USER, SCOPE_TEAM):
+        return jsonify({'success': False, 'error': 'Invalid scope'}), 400
+    if scope == SCOPE_TEAM:
+        team = get_team_service().get_by_id(team_id) if team_id and ObjectId.is_valid(team_id) else None
+        if not team or str(team.get('club_id')) != str(club_id):
+            return jsonify({'success': False, 'error': 'Team not found'}), 404
+
+    feed = get_ics_feed_service().get_or_create(request.current_user['user_id'], club_id, scope, team_id)
+    url = url_for('api.calendar_feed_ics', token=feed['token'], _external=True)
+    return jsonify({'success': True, 'data': {'token': feed['token'], 'url': url, 'scope': scope}})
+
+
+@api_bp.route('/calendar/feeds/<token>', methods=['DELETE'])
+@token_required
+def revoke_calendar_feed(token):
+    """Revoke a subscription URL (a new one is issued on the next POST)."""
+    from app.services import get_ics_feed_service
+    if get_ics_feed_service().revoke(request.current_user['user_id'], token):
+        return jsonify({'success': True})
+    return jsonify({'success': False, 'error': 'Feed not found'}), 404
+
+
+@api_bp.route('/calendar/feeds/<token>.ics', methods=['GET'])
+def calendar_feed_ics(token):
+    """Public .ics feed, authenticated by its token (calendar apps cannot send a JWT)."""
+    from app.services import get_ics_feed_service
+    body, etag = get_ics_feed_service().get_rendered(token)
+    if body is None:
+        return jsonify({'success': False, 'error': 'Feed not found'}), 404
+
+    response = current_app.response_class(body, mimetype='text/calendar')
+    response.headers['Content-Disposition'] = 'inline; filename="footlogic.ics"'
+    response.headers['Cache-Control'] = 'private, max-age=900'
+    response.set_etag(etag)
+    return response.make_conditional(request)
+
+
 @api_bp.route('/calendar/upcoming', methods=['GET'])
 @token_required
 def get_calendar_upcoming():
@@ -671,19 +760,25 @@ def get_calendar_upcoming():
     if not club_id:
         return jsonify({'success': True, 'data': {'events': [], 'matches': []}})
 
-    event_service = get_event_service()
-    match_service = get_match_service()
+    return jsonify({'success': True, 'data': _upcoming_calendar(club_id, team_id, limit)})
 
-    events = event_service.get_upcoming(club_id, team_id=team_id, limit=limit)
-    matches = match_service.get_upcoming(club_id, team_id=team_id, limit=limit)
 
-    return jsonify({
-        'success': True,
-        'data': {
-            'events': serialize_docs(events),
-            'matches': serialize_docs(matches),
-        }
-    })
+def _upcoming_calendar(club_id, team_id, limit):
+    """{'events', 'matches', 'items'} from now on, fetched concurrently by CalendarService
+
+    Only scheduled matches are listed (not live, completed or cancelled ones).
+    """
+    from app.services import get_calendar_service
+    from app.services.calendar_service import serialize_items
+    svc = get_calendar_service()
+    sources = svc.fetch(str(club_id), team_ids=[str(team_id)] if team_id else None,
+                        types=('match', 'event'), limit=limit, filters={'match': {'status': 'scheduled'}})
+    items = svc.merge(sources)
+    return {
+        'events': serialize_docs(sources['event']),
+        'matches': serialize_docs(sources['match']),
+        'items': serialize_items(items[:limit]),
+    }
 
 
 @api_bp.route('/events/<event_id>/rsvp', methods=['POST'])
@@ -791,10 +886,14 @@ def get_season_stats():
     """Get season stats for current club."""
     club_id = request.current_user.get('club_id')
     team_id = request.args.get('team_id')
+    season = request.args.get('season')
+    from app.services.dates import season_bounds
     if not club_id:
         return jsonify({'success': True, 'data': {}})
+    if season and not season_bounds(season):
+        return jsonify({'success': False, 'error': 'Saison invalide (format AAAA-AAAA)'}), 400
     match_service = get_match_service()
-    stats = match_service.get_season_stats(club_id, team_id=team_id)
+    stats = match_service.get_season_stats(club_id, team_id=team_id, season=season)
     return jsonify({'success': True, 'data': stats})
 
 
@@ -830,6 +929,7 @@ def get_post(post_id):
     post_service = get_post_service()
     post = post_service.get_by_id(post_id)
     if post:
+        post_service.record_view(post_id)
         return jsonify({'success': True, 'data': serialize_doc(post)})
     return jsonify({'success': False, 'error': 'Post not found'}), 404
 
@@ -837,12 +937,21 @@ def get_post(post_id):
 @api_bp.route('/posts/<post_id>/like', methods=['POST'])
 @token_required
 def like_post(post_id):
-    """Like a post."""
+    """Like a post (once per user)."""
     post_service = get_post_service()
-    post_service.like(post_id)
+    post_service.like(post_id, request.current_user['user_id'])
     return jsonify({'success': True, 'message': 'Post liked'})
 
 
+@api_bp.route('/posts/<post_id>/like', methods=['DELETE'])
+@token_required
+def unlike_post(post_id):
+    """Remove the current user's like."""
+    post_service = get_post_service()
+    post_service.unlike(post_id, request.current_user['user_id'])
+    return jsonify({'success': True, 'message': 'Like removed'})
+
+
 @api_bp.route('/posts/<post_id>/comment', methods=['POST'])
 @token_required
 def comment_post(post_id):
@@ -859,16 +968,102 @@ def comment_post(post_id):
 @api_bp.route('/posts/search', methods=['GET'])
 @token_required
 def search_posts():
-    """Search posts."""
+    """Search posts (?q=words, or ?q=prefix* for titles starting with it)."""
     club_id = request.current_user.get('club_id')
     query = request.args.get('q', '')
     if not club_id or not query:
         return jsonify({'success': True, 'data': []})
     post_service = get_post_service()
-    posts = post_service.search(club_id, query)
+    limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+    posts = post_service.search(club_id, query, limit=limit)
     return jsonify({'success': True, 'data': serialize_docs(posts)})
 
 
+# ============================================================
+# FEED API
+# ============================================================
+
+@api_bp.route('/feed', methods=['GET'])
+@token_required
+def get_feed():
+    """Club (or team) news feed: posts, match results, announcements and media.
+
+    ?team_id=&types=post,match&limit=20, then ?cursor=<next_cursor> for older
+    entries or ?since=<latest> for entries added since the last read.
+    """
+    from app.services.feed_service import KINDS
+    club_id = request.current_user.get('club_id')
+    if not club_id:
+        return jsonify({'success': False, 'error': 'No club'}), 400
+    team_id, cursor, since = (request.args.get(k) for k in ('team_id', 'cursor', 'since'))
+    if any(v and not ObjectId.is_valid(v) for v in (team_id, cursor, since)):
+        return jsonify({'success': False, 'error': 'Identifiant invalide'}), 400
+    types = [t for t in request.args.get('types', '').split(',') if t]
+    unknown = [t for t in types if t not in KINDS]
+    if unknown:
+        return jsonify({'success': False, 'error': f"Type(s) inconnu(s): {', '.join(unknown)}"}), 400
+
+    feed = get_feed_service()
+    if team_id and not feed.can_read_team(request.current_user, team_id):
+        return jsonify({'success': False, 'error': 'Accès refusé'}), 403
+    entries, next_cursor = feed.get_timeline(
+        club_id, team_id, since=since, cursor=cursor,
+        limit=request.args.get('limit', 20, type=int), kinds=types or None,
+    )
+    return jsonify({
+        'success': True,
+        'data': serialize_docs(entries),
+        'next_cursor': next_cursor,
+        'latest': str(entries[0]['key']) if entries else since,
+    })
+
+
+# ============================================================
+# SEARCH API
+# ============================================================
+
+@api_bp.route('/search', methods=['GET'])
+@token_required
+def search_club():
+    """Ranked search across the club's posts, members, players, drills and media.
+
+    ?q=<text>&types=posts,players&limit=20
+    """
+    from app.services.search_service import SOURCES
+    club_id = request.current_user.get('club_id')
+    query = request.args.get('q', '').strip()
+    types = [t for t in request.args.get('types', '').split(',') if t]
+    unknown = [t for t in types if t not in SOURCES]
+    if unknown:
+        return jsonify({'success': False, 'error': f"Type(s) inconnu(s): {', '.join(unknown)}"}), 400
+    if not club_id or not query:
+        return jsonify({'success': True, 'data': []})
+    limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+    hits = get_search_service().search(club_id, query, types=types or None, limit=limit)
+    return jsonify({'success': True, 'data': hits})
+
+
+@api_bp.route('/autocomplete/members', methods=['GET'])
+@token_required
+def autocomplete_members():
+    """Typeahead over the club's members and players.
+
+    ?q=<prefix>&types=member,player&limit=10 — words match the start of a
+    first/last name, jersey number, role or position, accents ignored.
+    """
+    club_id = request.current_user.get('club_id')
+    if not club_id:
+        return jsonify({'success': True, 'data': []})
+    types = [t for t in request.args.get('types', '').split(',') if t]
+    if any(t not in ('member', 'player') for t in types):
+        return jsonify({'success': False, 'error': 'types doit valoir member et/ou player'}), 400
+    results = get_autocomplete_service().complete(
+        club_id, request.args.get('q', ''), types=types or None,
+        limit=request.args.get('limit', 10, type=int)
+    )
+    return jsonify({'success': True, 'data': results})
+
+
 # ============================================================
 # MESSAGING API
 # ============================================================
@@ -1078,29 +1273,27 @@ def coach_dashboard():
     if not club_id:
         return jsonify({'success': True, 'data': {}})
 
-    player_service = get_player_service()
-    match_service = get_match_service()
-    event_service = get_event_service()
-
-    players = player_service.get_by_club(club_id, team_id=team_id)
-    upcoming_matches = match_service.get_upcoming(club_id, team_id=team_id, limit=5)
-    upcoming_events = event_service.get_upcoming(club_id, team_id=team_id, limit=5)
-    season_stats = match_service.get_season_stats(club_id, team_id=team_id)
-    top_scorers = player_service.get_top_scorers(club_id, limit=5)
-
-    injured = [p for p in players if p.get('status') == 'injured']
+    from app.services import get_coach_dashboard_service
+    from app.services.dashboard_service import server_timing
+    data = get_coach_dashboard_service().build(club_id, team_id=team_id, top_scorers=True)
 
-    return jsonify({
+    response = jsonify({
         'success': True,
         'data': {
-            'total_players': len(players),
-            'injured_players': serialize_docs(injured),
-            'upcoming_matches': serialize_docs(upcoming_matches),
-            'upcoming_events': serialize_docs(upcoming_events),
-            'season_stats': season_stats,
-            'top_scorers': serialize_docs(top_scorers),
+            'total_players': len(data['players']),
+            'injured_players': serialize_docs(data['injured_players']),
+            'upcoming_matches': serialize_docs(data['upcoming_matches'][:5]),
+            'upcoming_events': serialize_docs(data['upcoming_events'][:5]),
+            'recent_matches': serialize_docs(data['recent_matches']),
+            'season_stats': data['season_stats'],
+            'top_scorers': serialize_docs(data['top_scorers']),
+            'alerts': serialize_docs(data['alerts']),
+            'activity_feed': serialize_docs(data['activity_feed']),
+            'timings': data['timings'],
         }
     })
+    response.headers['Server-Timing'] = server_timing(data['timings'])
+    return response
 
 
 @api_bp.route('/coach/roster', methods=['GET'])
@@ -1380,6 +1573,22 @@ def coach_get_attendance():
     return jsonify({'success': True, 'data': attendance})
 
 
+@api_bp.route('/coach/attendance/rates', methods=['GET'])
+@role_required('coach')
+def coach_attendance_rates():
+    """Per-player attendance rates for a team (events + training sessions)."""
+    from app.services import get_attendance_service
+    team_id = request.args.get('team_id')
+    if not team_id or not ObjectId.is_valid(team_id):
+        return jsonify({'success': False, 'error': 'team_id required'}), 400
+    team = get_team_service().get_by_id(team_id)
+    if not team or str(team.get('club_id')) != str(request.current_user.get('club_id')):
+        return jsonify({'success': False, 'error': 'Team not found'}), 404
+    source = request.args.get('source')
+    svc = get_attendance_service()
+    return jsonify({'success': True, 'data': svc.get_team_rates(team_id, source=source)})
+
+
 @api_bp.route('/coach/convocation', methods=['GET'])
 @role_required('coach')
 def get_convocation():
@@ -1485,18 +1694,69 @@ def upload_player_document(doc_type):
     if not player:
         return jsonify({'success': False, 'error': 'Player not found'}), 404
 
-    upload_dir = os.path.join(current_app.root_path, 'static', 'uploads', 'player_docs',
-                              str(player['_id']))
-    os.makedirs(upload_dir, exist_ok=True)
+    uploads = get_upload_service()
+    owners = {'club_id': player.get('club_id'), 'user_id': request.current_user['user_id']}
+    data = {'doc_type': doc_type}
 
-    filename = f"{doc_type}.{ext}"
-    filepath = os.path.join(upload_dir, filename)
-    file.save(filepath)
+    if doc_type == 'photo':
+        from app.services.image_service import save_image, ImageError
+        try:
+            image = save_image(file, uploads, ext, **owners)
+        except ImageError as exc:
+            return jsonify({'success': False, 'error': str(exc)}), 400
+        rel_url = image['url']
+        data['variants'] = image['variants']
+        player_service.update(str(player['_id']), {'photo': rel_url, 'photo_variants': image['variants']})
+    else:
+        rel_url = uploads.save_file(file, ext, public=False, **owners)['url']
 
-    rel_url = f"/static/uploads/player_docs/{player['_id']}/{filename}"
     player_service.update_documents(str(player['_id']), doc_type, 'provided', rel_url)
 
-    return jsonify({'success': True, 'data': {'url': rel_url, 'doc_type': doc_type}})
+    return jsonify({'success': True, 'data': {'url': rel_url, **data}})
+
+
+@api_bp.route('/files/<key>', methods=['GET'])
+def get_uploaded_file(key):
+    """Download an uploaded file.
+
+    Private files need the token of an owner or of club staff, or a signed
+    link from /api/files/<key>/link (for plain <a href> links).
+    """
+    from app.services.upload_store import send_blob, check_signature
+    uploads = get_upload_service()
+    upload = uploads.get(key)
+    if not upload or not uploads.store.exists(key):
+        return jsonify({'success': False, 'error': 'Fichier introuvable'}), 404
+    if upload.get('public'):
+        return send_blob(uploads.store, upload)
+    if 'sig' in request.args:
+        if not check_signature(key, request.args.get('expires'), request.args['sig'],
+                               current_app.config['SECRET_KEY']):
+            return jsonify({'success': False, 'error': 'Lien expiré ou invalide'}), 403
+        return send_blob(uploads.store, upload)
+    return token_required(_send_private_file)(uploads, upload)
+
+
+@api_bp.route('/files/<key>/link', methods=['GET'])
+@token_required
+def get_uploaded_file_link(key):
+    """Short-lived signed URL of a file, usable without a token."""
+    from app.services.upload_store import signed_url, SIGNED_URL_SECONDS
+    uploads = get_upload_service()
+    upload = uploads.get(key)
+    if not upload:
+        return jsonify({'success': False, 'error': 'Fichier introuvable'}), 404
+    if not uploads.can_read(upload, request.current_user):
+        return jsonify({'success': False, 'error': 'Accès refusé'}), 403
+    url = uploads.url(key) if upload.get('public') else signed_url(key, current_app.config['SECRET_KEY'])
+    return jsonify({'success': True, 'data': {'url': url, 'expires_in': SIGNED_URL_SECONDS}})
+
+
+def _send_private_file(uploads, upload):
+    from app.services.upload_store import send_blob
+    if not uploads.can_read(upload, request.current_user):
+        return jsonify({'success': False, 'error': 'Accès refusé'}), 403
+    return send_blob(uploads.store, upload)
 
 
 @api_bp.route('/player/evolution', methods=['GET'])
@@ -1526,13 +1786,13 @@ def get_player_evolution():
 @token_required
 def player_dashboard_stats():
     """Get player performance dashboard."""
-    from app.services import get_player_analytics_service
+    from app.services import get_player_snapshot_service
     player_service = get_player_service()
     player = player_service.get_by_user(request.current_user['user_id'])
     if not player:
         return jsonify({'success': False, 'error': 'Player not found'}), 404
-    svc = get_player_analytics_service()
-    data = svc.get_player_dashboard(str(player['_id']))
+    svc = get_player_snapshot_service()
+    data = svc.get_dashboard(str(player['_id']))
     return jsonify({'success': True, 'data': data})
 
 
@@ -2093,9 +2353,10 @@ def coach_update_attendance():
         return jsonify({'success': False, 'error': 'event_id and attendance required'}), 400
 
     event_service = get_event_service()
-    for item in data['attendance']:
-        event_service.set_attendance(data['event_id'], item['player_id'], item['status'])
-    return jsonify({'success': True, 'message': 'Attendance updated'})
+    counts = event_service.bulk_attendance(data['event_id'], data['attendance'])
+    if counts is None:
+        return jsonify({'success': False, 'error': 'Event not found'}), 404
+    return jsonify({'success': True, 'message': 'Attendance updated', 'data': counts})
 
 
 @api_bp.route('/coach/events', methods=['POST'])
@@ -2108,7 +2369,7 @@ def coach_create_event():
 
     club_id = request.current_user.get('club_id')
     event_service = get_event_service()
-    event_id = event_service.create(
+    fields = dict(
         club_id=club_id,
         team_id=data.get('team_id'),
         title=data['title'],
@@ -2118,9 +2379,60 @@ def coach_create_event():
         location=data.get('location', ''),
         description=data.get('description', ''),
     )
+    recurrence = data.get('recurrence')
+    if recurrence:
+        # {interval: 1|2, until?, count?, exdates?} — stored once, expanded on read
+        try:
+            series = event_service.create_recurring(**fields, **_recurrence_args(recurrence))
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        return jsonify({'success': True, 'series_id': str(series['_id'])}), 201
+
+    event_id = event_service.create(**fields)
     return jsonify({'success': True, 'event_id': str(event_id['_id'])}), 201
 
 
+def _recurrence_args(recurrence):
+    return {
+        'interval': recurrence.get('interval', 1),
+        'until': recurrence.get('until'),
+        'count': recurrence.get('count'),
+        'exdates': recurrence.get('exdates'),
+    }
+
+
+@api_bp.route('/coach/recurrences/<series_id>/exceptions', methods=['POST'])
+@role_required('coach')
+def coach_recurrence_exception(series_id):
+    """Cancel one occurrence of a recurring event/session. Body: {date}"""
+    from app.services import get_recurrence_service
+    data = request.get_json() or {}
+    svc = get_recurrence_service()
+    series = svc.get(series_id) if ObjectId.is_valid(series_id) else None
+    if not series or str(series.get('club_id')) != str(request.current_user.get('club_id')):
+        return jsonify({'success': False, 'error': 'Series not found'}), 404
+    if not data.get('date'):
+        return jsonify({'success': False, 'error': 'date required'}), 400
+    try:
+        svc.add_exception(series_id, data['date'])
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    return jsonify({'success': True})
+
+
+@api_bp.route('/coach/recurrences/<series_id>', methods=['DELETE'])
+@role_required('coach')
+def coach_end_recurrence(series_id):
+    """Stop a series from now on; past and materialized occurrences are kept."""
+    from app.services import get_recurrence_service
+    svc = get_recurrence_service()
+    series = svc.get(series_id) if ObjectId.is_valid(series_id) else None
+    if not series or str(series.get('club_id')) != str(request.current_user.get('club_id')):
+        return jsonify({'success': False, 'error': 'Series not found'}), 404
+    svc.end(series_id, datetime.datetime.utcnow())
+    return jsonify({'success': True})
+
+
 @api_bp.route('/coach/events/<event_id>', methods=['PUT'])
 @role_required('coach')
 def coach_edit_event(event_id):
@@ -2129,7 +2441,8 @@ def coach_edit_event(event_id):
     if not data:
         return jsonify({'success': False, 'error': 'Data required'}), 400
     event_service = get_event_service()
-    event_service.update(event_id, data)
+    if not event_service.update(event_id, data):
+        return jsonify({'success': False, 'error': 'Event not found'}), 404
     return jsonify({'success': True, 'message': 'Event updated'})
 
 
@@ -2138,7 +2451,8 @@ def coach_edit_event(event_id):
 def coach_delete_event(event_id):
     """Delete an event."""
     event_service = get_event_service()
-    event_service.delete(event_id)
+    if not event_service.delete(event_id):
+        return jsonify({'success': False, 'error': 'Event not found'}), 404
     return jsonify({'success': True, 'message': 'Event deleted'})
 
 
@@ -2163,7 +2477,7 @@ def coach_add_match_event(match_id):
     if not data:
         return jsonify({'success': False, 'error': 'Data required'}), 400
     match_service = get_match_service()
-    match_service.add_event(match_id, data)
+    match_service.add_event(match_id, data.get('type'), data.get('player_id'), int(data.get('minute') or 0))
     return jsonify({'success': True, 'message': 'Match event added'})
 
 
@@ -2183,9 +2497,10 @@ def coach_create_match():
         is_home=data.get('is_home', True),
         team_id=data.get('team_id'),
         competition=data.get('competition', ''),
+        competition_id=data.get('competition_id') if ObjectId.is_valid(str(data.get('competition_id'))) else None,
         location=data.get('location', ''),
     )
-    return jsonify({'success': True, 'match_id': str(match_id)}), 201
+    return jsonify({'success': True, 'match_id': str(match_id['_id'])}), 201
 
 
 # ============================================================
@@ -2200,35 +2515,20 @@ def admin_dashboard():
     if not club_id:
         return jsonify({'success': True, 'data': {}})
 
-    user_service = get_user_service()
-    team_service = get_team_service()
-    player_service = get_player_service()
-    event_service = get_event_service()
-    match_service = get_match_service()
-
-    members = user_service.get_members_by_club(club_id)
-    teams = team_service.get_by_club(club_id)
-    players = player_service.get_by_club(club_id)
-    upcoming_events = event_service.get_upcoming(club_id, limit=5)
     club_service = get_club_service()
+    counts = club_service.get_dashboard_counts(club_id)
     club = club_service.get_by_id(club_id)
-
-    role_counts = {}
-    for m in members:
-        r = m.get('role', 'fan')
-        role_counts[r] = role_counts.get(r, 0) + 1
-
-    pending = [m for m in members if m.get('account_status') == 'pending']
+    teams = list(mongo.db.teams.find(
+        {'club_id': ObjectId(club_id)},
+        {'name': 1, 'category': 1, 'colors': 1, 'logo': 1, 'coach_ids': 1}
+    ))
+    upcoming_events = get_event_service().get_upcoming(club_id, limit=5)
 
     return jsonify({
         'success': True,
         'data': {
             'club': serialize_doc(club) if club else {},
-            'total_members': len(members),
-            'total_teams': len(teams),
-            'total_players': len(players),
-            'role_counts': role_counts,
-            'pending_invitations': len(pending),
+            **counts,
             'upcoming_events': serialize_docs(upcoming_events),
             'teams': serialize_docs(teams),
         }
@@ -2238,47 +2538,39 @@ def admin_dashboard():
 @api_bp.route('/admin/members', methods=['GET'])
 @role_required('admin')
 def admin_members():
-    """Get all members of the club with enriched player data."""
+    """Club members with enriched player data.
+
+    Query params: role, status, team_id, q (search), sort (name|email|role|status|created_at,
+    '-' for descending), page, per_page. Without per_page every matching member is returned.
+    """
     club_id = request.current_user.get('club_id')
     if not club_id:
         return jsonify({'success': True, 'data': []})
-    role = request.args.get('role')
-    status = request.args.get('status')
-    user_service = get_user_service()
-    members = user_service.get_members_by_club(club_id)
-    if role:
-        members = [m for m in members if m.get('role') == role]
-    if status:
-        members = [m for m in members if m.get('account_status') == status]
-
-    # Enrich with player data
-    player_service = get_player_service()
-    user_ids = [m['_id'] for m in members]
-    players_list = list(player_service.collection.find({'user_id': {'$in': user_ids}}))
-    players_map = {str(p['user_id']): p for p in players_list}
-
-    for member in members:
-        player = players_map.get(str(member['_id']))
-        if player:
-            # Format birth_date for JSON
-            birth_date = player.get('birth_date')
-            if birth_date:
-                birth_date = birth_date.isoformat() if hasattr(birth_date, 'isoformat') else str(birth_date)
-            member['player_data'] = {
-                'player_id': str(player['_id']),
-                'team_id': str(player.get('team_id', '')) if player.get('team_id') else '',
-                'jersey_number': player.get('jersey_number'),
-                'position': player.get('position'),
-                'photo': player.get('photo'),
-                'birth_date': birth_date,
-                'height': player.get('height'),
-                'weight': player.get('weight'),
-                'documents': player.get('documents', {}),
-                'license_number': player.get('license_number'),
-                'status': player.get('status', 'active')
-            }
-
-    return jsonify({'success': True, 'count': len(members), 'data': serialize_docs(members)})
+    try:
+        page = int(request.args.get('page', 1))
+        per_page = int(request.args.get('per_page', 0))
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Invalid page'}), 400
+
+    result = get_user_service().list_members(
+        club_id,
+        search=request.args.get('q', '').strip(),
+        role=request.args.get('role', ''),
+        team_id=request.args.get('team_id', ''),
+        status=request.args.get('status', ''),
+        sort=request.args.get('sort', 'name'),
+        page=page,
+        per_page=per_page,
+    )
+    return jsonify({
+        'success': True,
+        'count': len(result['items']),
+        'total': result['total'],
+        'page': result['page'],
+        'per_page': result['per_page'],
+        'facets': result['facets'],
+        'data': serialize_docs(result['items']),
+    })
 
 
 @api_bp.route('/admin/members', methods=['POST'])
@@ -2490,15 +2782,16 @@ def admin_upload_member_photo(user_id):
     if ext not in {'jpg', 'jpeg', 'png', 'webp'}:
         return jsonify({'success': False, 'error': 'Invalid file type'}), 400
 
-    upload_dir = os.path.join(current_app.static_folder, 'uploads', 'player_docs', str(player['_id']))
-    os.makedirs(upload_dir, exist_ok=True)
-    filename = f"photo.{ext}"
-    file.save(os.path.join(upload_dir, filename))
+    from app.services.image_service import save_image, ImageError
+    try:
+        image = save_image(file, get_upload_service(), ext, club_id=player.get('club_id'), user_id=user_id)
+    except ImageError as exc:
+        return jsonify({'success': False, 'error': str(exc)}), 400
 
-    photo_url = f"/static/uploads/player_docs/{player['_id']}/{filename}"
-    player_service.update(str(player['_id']), {'photo': photo_url})
+    photo_url = image['url']
+    player_service.update(str(player['_id']), {'photo': photo_url, 'photo_variants': image['variants']})
 
-    return jsonify({'success': True, 'photo': photo_url})
+    return jsonify({'success': True, 'photo': photo_url, 'variants': image['variants']})
 
 
 @api_bp.route('/admin/members/<user_id>/documents/<doc_type>', methods=['POST'])
@@ -2521,12 +2814,8 @@ def admin_upload_member_document(user_id, doc_type):
     if ext not in {'jpg', 'jpeg', 'png', 'pdf', 'webp'}:
         return jsonify({'success': False, 'error': 'Invalid file type'}), 400
 
-    upload_dir = os.path.join(current_app.static_folder, 'uploads', 'player_docs', str(player['_id']))
-    os.makedirs(upload_dir, exist_ok=True)
-    filename = f"{doc_type}.{ext}"
-    file.save(os.path.join(upload_dir, filename))
-
-    file_url = f"/static/uploads/player_docs/{player['_id']}/{filename}"
+    file_url = get_upload_service().save_file(
+        file, ext, club_id=player.get('club_id'), user_id=user_id, public=False)['url']
     player_service.update_documents(str(player['_id']), doc_type, 'valid', file_url)
 
     return jsonify({'success': True, 'file': file_url, 'status': 'valid'})
@@ -2672,9 +2961,10 @@ def admin_upload_club_logo():
     if not club_id:
         return jsonify({'success': False, 'error': 'Club introuvable'}), 400
 
-    logo_url, error = _save_club_asset(club_id, file, 'logo')
+    image, error = _save_club_asset(club_id, file)
     if error:
         return jsonify({'success': False, 'error': error}), 400
+    logo_url = image['url']
 
     club = _get_club_doc(club_id)
     personalization = _get_club_personalization(club)
@@ -2682,10 +2972,10 @@ def admin_upload_club_logo():
 
     mongo.db.clubs.update_one(
         {'_id': ObjectId(club_id)},
-        {'$set': {'logo': logo_url, 'personalization': personalization}}
+        {'$set': {'logo': logo_url, 'logo_variants': image['variants'], 'personalization': personalization}}
     )
 
-    return jsonify({'success': True, 'data': {'url': logo_url}})
+    return jsonify({'success': True, 'data': image})
 
 
 @api_bp.route('/admin/club/cover', methods=['POST'])
@@ -2700,9 +2990,10 @@ def admin_upload_club_cover():
     if not club_id:
         return jsonify({'success': False, 'error': 'Club introuvable'}), 400
 
-    cover_url, error = _save_club_asset(club_id, file, 'cover')
+    image, error = _save_club_asset(club_id, file)
     if error:
         return jsonify({'success': False, 'error': error}), 400
+    cover_url = image['url']
 
     club = _get_club_doc(club_id)
     personalization = _get_club_personalization(club)
@@ -2710,10 +3001,10 @@ def admin_upload_club_cover():
 
     mongo.db.clubs.update_one(
         {'_id': ObjectId(club_id)},
-        {'$set': {'cover_url': cover_url, 'personalization': personalization}}
+        {'$set': {'cover_url': cover_url, 'cover_variants': image['variants'], 'personalization': personalization}}
     )
 
-    return jsonify({'success': True, 'data': {'url': cover_url}})
+    return jsonify({'success': True, 'data': image})
 
 
 @api_bp.route('/admin/onboarding', methods=['GET'])
@@ -2798,13 +3089,13 @@ def admin_cancel_subscription():
 @api_bp.route('/admin/announcements', methods=['GET'])
 @role_required('admin')
 def admin_announcements():
-    """Get announcement history for the admin's club."""
+    """Get announcement history for the admin's club (?q= to search it)."""
     club_id = request.current_user.get('club_id')
     if not club_id:
         return jsonify({'success': True, 'data': []})
 
     svc = get_announcement_service()
-    rows = svc.get_announcements(club_id)
+    rows = svc.get_announcements(club_id, q=request.args.get('q'))
 
     # Keep API payload aligned with frontend keys.
     payload = []
@@ -2820,11 +3111,24 @@ def admin_announcements():
             'target_label': row.get('target_label', ''),
             'recipient_count': row.get('recipient_count', 0),
             'failed_count': row.get('failed_count', 0),
+            'opens': row.get('opens', 0),
         })
 
     return jsonify({'success': True, 'data': serialize_docs(payload)})
 
 
+@api_bp.route('/announcements/<announcement_id>/open', methods=['POST'])
+@token_required
+def open_announcement(announcement_id):
+    """Count an opening of an announcement (buffered)."""
+    if not ObjectId.is_valid(announcement_id):
+        return jsonify({'success': False, 'error': 'Identifiant invalide'}), 400
+    club_id = request.current_user.get('club_id')
+    if not club_id or not get_announcement_service().record_open(announcement_id, club_id):
+        return jsonify({'success': False, 'error': 'Annonce introuvable'}), 404
+    return jsonify({'success': True})
+
+
 @api_bp.route('/admin/announcement', methods=['POST'])
 @role_required('admin')
 def admin_create_announcement():
@@ -3682,18 +3986,9 @@ def parent_child_calendar(player_id):
     if not player:
         return jsonify({'success': False, 'error': 'Player not found'}), 404
 
-    team_id = player.get('team_id')
-    club_id = player.get('club_id')
-    event_service = get_event_service()
-    match_service = get_match_service()
-    events = event_service.get_upcoming(str(club_id), team_id=str(team_id) if team_id else None, limit=20)
-    matches = match_service.get_upcoming(str(club_id), team_id=str(team_id) if team_id else None, limit=10)
     return jsonify({
         'success': True,
-        'data': {
-            'events': serialize_docs(events),
-            'matches': serialize_docs(matches),
-        }
+        'data': _upcoming_calendar(player.get('club_id'), player.get('team_id'), 20),
     })
 
 
@@ -4084,6 +4379,75 @@ def get_competition(competition_id):
     return jsonify({'success': True, 'data': serialize_doc(comp)})
 
 
+@api_bp.route('/competitions/<competition_id>/standings', methods=['GET'])
+def get_competition_standings(competition_id):
+    """League table (ranked by the competition type's tiebreak rules) with form."""
+    from app.services import get_standings_service
+    if not ObjectId.is_valid(competition_id):
+        return jsonify({'success': False, 'error': 'Competition not found'}), 404
+    table = get_standings_service().get_table(competition_id)
+    return jsonify({'success': True, 'data': table})
+
+
+@api_bp.route('/competitions/<competition_id>/form', methods=['GET'])
+def get_competition_form(competition_id):
+    """Last five results per team, most recent first ({team_key: ['W', 'D', 'L', ...]})."""
+    from app.services import get_standings_service
+    if not ObjectId.is_valid(competition_id):
+        return jsonify({'success': False, 'error': 'Competition not found'}), 404
+    return jsonify({'success': True, 'data': get_standings_service().get_form_guide(competition_id)})
+
+
+def _own_competition(competition_id):
+    if not ObjectId.is_valid(competition_id):
+        return None
+    comp = mongo.db.competitions.find_one({'_id': ObjectId(competition_id)})
+    if not comp or str(comp.get('club_id')) != str(request.current_user.get('club_id')):
+        return None
+    return comp
+
+
+@api_bp.route('/competitions/<competition_id>/fixtures', methods=['POST'])
+@role_required('admin', 'coach')
+def generate_competition_fixtures(competition_id):
+    """Generate the fixtures of a competition (round-robin or knockout), see CompetitionService.generate_fixtures."""
+    from app.services import get_competition_service
+    if not _own_competition(competition_id):
+        return jsonify({'success': False, 'error': 'Competition not found'}), 404
+    try:
+        result = get_competition_service().generate_fixtures(competition_id, request.get_json() or {})
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    return jsonify({'success': True, 'data': result}), 201
+
+
+@api_bp.route('/competitions/<competition_id>/knockout/advance', methods=['POST'])
+@role_required('admin', 'coach')
+def advance_competition_knockout(competition_id):
+    """Schedule the next knockout round once the current one is completed."""
+    from app.services import get_competition_service
+    if not _own_competition(competition_id):
+        return jsonify({'success': False, 'error': 'Competition not found'}), 404
+    try:
+        created = get_competition_service().advance_knockout(competition_id)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    if created is None:
+        return jsonify({'success': False, 'error': 'Current round is not finished'}), 409
+    return jsonify({'success': True, 'data': {'created': created}})
+
+
+@api_bp.route('/competitions/<competition_id>/standings/recompute', methods=['POST'])
+@role_required('admin')
+def recompute_competition_standings(competition_id):
+    """Rebuild the table from the competition's completed matches."""
+    from app.services import get_standings_service
+    if not _own_competition(competition_id):
+        return jsonify({'success': False, 'error': 'Competition not found'}), 404
+    count = get_standings_service().recompute(competition_id)
+    return jsonify({'success': True, 'data': {'matches': count}})
+
+
 # ============================================================
 # COACH SCOUTING ENDPOINT
 # ============================================================
@@ -4201,9 +4565,20 @@ def coach_delete_training_plan(plan_id):
 def coach_create_session(plan_id):
     """Add a session to a training plan."""
     from app.services import get_training_service
-    data = request.get_json()
+    data = request.get_json() or {}
     svc = get_training_service()
-    session_id = svc.create_session(plan_id, request.current_user['user_id'], data or {})
+    if data.get('recurrence'):
+        try:
+            series_id = svc.create_recurring_sessions(
+                plan_id, request.current_user['user_id'], data, **_recurrence_args(data['recurrence'])
+            )
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        if not series_id:
+            return jsonify({'success': False, 'error': 'Plan not found'}), 404
+        return jsonify({'success': True, 'series_id': series_id}), 201
+
+    session_id = svc.create_session(plan_id, request.current_user['user_id'], data)
     if not session_id:
         return jsonify({'success': False, 'error': 'Plan not found'}), 404
     return jsonify({'success': True, 'session_id': session_id}), 201
@@ -4239,12 +4614,12 @@ def coach_session_attendance(session_id):
     from app.services import get_training_service
     data = request.get_json()
     svc = get_training_service()
-    if isinstance(data, list):
-        svc.bulk_attendance(session_id, data)
-    elif data and data.get('player_id'):
-        svc.mark_attendance(session_id, data['player_id'], data.get('status', 'present'),
-                            data.get('reason'), data.get('rating'))
-    return jsonify({'success': True})
+    if isinstance(data, dict) and data.get('player_id'):
+        data = [{**data, 'status': data.get('status', 'present')}]
+    counts = svc.bulk_attendance(session_id, data if isinstance(data, list) else [])
+    if counts is None:
+        return jsonify({'success': False, 'error': 'Session not found'}), 404
+    return jsonify({'success': True, 'data': counts})
 
 
 @api_bp.route('/coach/drills', methods=['GET'])
@@ -4397,6 +4772,25 @@ def coach_injury_stats():
     return jsonify({'success': True, 'data': stats})
 
 
+@api_bp.route('/coach/injuries/heatmap', methods=['GET'])
+@role_required('coach')
+def coach_injury_heatmap():
+    """Club injury analytics: status counts, recovery days, body part × month heatmap, recurrence."""
+    from app.services import get_injury_analytics_service
+    club_id = request.current_user.get('club_id')
+    if not club_id:
+        return jsonify({'success': True, 'data': {}})
+    team_id = request.args.get('team_id')
+    if team_id and not ObjectId.is_valid(team_id):
+        return jsonify({'success': False, 'error': 'Invalid team_id'}), 400
+    if team_id:
+        team = get_team_service().get_by_id(team_id)
+        if not team or str(team.get('club_id')) != str(club_id):
+            return jsonify({'success': False, 'error': 'Team not found'}), 404
+    svc = get_injury_analytics_service()
+    return jsonify({'success': True, 'data': svc.get_heatmap(club_id, team_id=team_id)})
+
+
 @api_bp.route('/coach/injuries/player/<player_id>', methods=['GET'])
 @role_required('coach')
 def coach_player_injuries(player_id):
@@ -4432,9 +4826,9 @@ def coach_analytics_players():
 @role_required('coach')
 def coach_analytics_player_detail(player_id):
     """Get comprehensive player dashboard."""
-    from app.services import get_player_analytics_service
-    svc = get_player_analytics_service()
-    dashboard = svc.get_player_dashboard(player_id)
+    from app.services import get_player_snapshot_service
+    svc = get_player_snapshot_service()
+    dashboard = svc.get_dashboard(player_id)
     if not dashboard:
         return jsonify({'success': False, 'error': 'Player not found'}), 404
     return jsonify({'success': True, 'data': dashboard})
@@ -4876,37 +5270,38 @@ def superadmin_update_support_ticket(ticket_id):
 def superadmin_monitoring():
     """Get platform monitoring data: inactive clubs, low engagement clubs."""
     from datetime import datetime, timedelta
+    from app.services.dates import date_range, iso
+
+    now = datetime.utcnow()
+    cutoff_inactive = now - timedelta(days=30)
+    cutoff_veryinactive = now - timedelta(days=60)
+
+    def _clubs_idle(start, end):
+        # Clubs never active fall back to created_at, as before
+        bounds = date_range(start, end)
+        return mongo.db.clubs.find({'$or': [
+            {'last_activity': bounds},
+            {'last_activity': {'$in': [None, '']}, 'created_at': bounds},
+        ]}, {'name': 1, 'last_activity': 1, 'created_at': 1})
+
+    def _row(club, status):
+        return {
+            'id': str(club['_id']),
+            'name': club.get('name', ''),
+            'last_activity': iso(club.get('last_activity') or club.get('created_at', '')),
+            'status': status,
+        }
 
-    cutoff_inactive = (datetime.utcnow() - timedelta(days=30)).isoformat()
-    cutoff_veryinactive = (datetime.utcnow() - timedelta(days=60)).isoformat()
-
-    clubs = list(mongo.db.clubs.find({}))
-    inactive = []
-    very_inactive = []
-
-    for club in clubs:
-        last_login = club.get('last_activity') or club.get('created_at', '')
-        if last_login < cutoff_veryinactive:
-            very_inactive.append({
-                'id': str(club['_id']),
-                'name': club.get('name', ''),
-                'last_activity': last_login,
-                'status': 'very_inactive',
-            })
-        elif last_login < cutoff_inactive:
-            inactive.append({
-                'id': str(club['_id']),
-                'name': club.get('name', ''),
-                'last_activity': last_login,
-                'status': 'inactive',
-            })
+    very_inactive = [_row(c, 'very_inactive') for c in _clubs_idle(None, cutoff_veryinactive)]
+    inactive = [_row(c, 'inactive') for c in _clubs_idle(cutoff_veryinactive, cutoff_inactive)]
+    total_monitored = mongo.db.clubs.estimated_document_count()
 
     return jsonify({
         'success': True,
         'data': {
             'inactive_clubs': inactive,
             'very_inactive_clubs': very_inactive,
-            'total_monitored': len(clubs),
+            'total_monitored': total_monitored,
         }
     })
 
@@ -4918,9 +5313,32 @@ def superadmin_monitoring():
 @api_bp.route('/fan/comments/<post_id>', methods=['GET'])
 @token_required
 def fan_get_comments(post_id):
-    """Get comments for a post."""
+    """Get a page of top-level comments for a post, with their first replies.
+
+    ?cursor=<next_cursor>&limit=20&replies=3
+    """
+    cursor = request.args.get('cursor')
+    if not ObjectId.is_valid(post_id) or (cursor and not ObjectId.is_valid(cursor)):
+        return jsonify({'success': False, 'error': 'Identifiant invalide'}), 400
+    svc = get_fan_engagement_service()
+    comments, next_cursor = svc.get_comments(
+        post_id, cursor,
+        limit=request.args.get('limit', 20, type=int),
+        replies=min(max(request.args.get('replies', 3, type=int), 0), 20),
+    )
+    return jsonify({'success': True, 'data': serialize_docs(comments), 'next_cursor': next_cursor})
+
+
+@api_bp.route('/fan/comments/<comment_id>/replies', methods=['GET'])
+@token_required
+def fan_get_replies(comment_id):
+    """Get a page of replies to a comment (?cursor=&limit=)."""
+    cursor = request.args.get('cursor')
+    if not ObjectId.is_valid(comment_id) or (cursor and not ObjectId.is_valid(cursor)):
+        return jsonify({'success': False, 'error': 'Identifiant invalide'}), 400
     svc = get_fan_engagement_service()
-    return jsonify({'success': True, 'data': svc.get_comments(post_id)})
+    replies, next_cursor = svc.get_replies(comment_id, cursor, limit=request.args.get('limit', 20, type=int))
+    return jsonify({'success': True, 'data': serialize_docs(replies), 'next_cursor': next_cursor})
 
 
 @api_bp.route('/fan/comments/<post_id>', methods=['POST'])
@@ -4931,18 +5349,36 @@ def fan_create_comment(post_id):
     if not data or not data.get('content'):
         return jsonify({'success': False, 'error': 'Contenu requis'}), 400
     svc = get_fan_engagement_service()
-    comment_id = svc.create_comment(post_id, request.current_user['user_id'],
-                                     data['content'], data.get('parent_comment_id'))
+    try:
+        comment_id = svc.create_comment(post_id, request.current_user['user_id'],
+                                         data['content'], data.get('parent_comment_id'))
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Commentaire parent invalide'}), 400
     return jsonify({'success': True, 'comment_id': comment_id}), 201
 
 
 @api_bp.route('/fan/reactions/<post_id>', methods=['POST'])
 @token_required
 def fan_toggle_reaction(post_id):
-    """Toggle a reaction on a post."""
+    """Toggle a reaction on a post.
+
+    With {"active": true|false} the reaction is set instead of toggled, so a
+    retried request does not undo itself.
+    """
+    from app.services.fan_engagement_service import REACTION_TYPES
     data = request.get_json() or {}
     svc = get_fan_engagement_service()
-    result = svc.toggle_reaction(post_id, request.current_user['user_id'], data.get('type', 'like'))
+    reaction_type = data.get('type', 'like')
+    if reaction_type not in REACTION_TYPES:
+        return jsonify({'success': False, 'error': 'Type de réaction invalide'}), 400
+    user_id = request.current_user['user_id']
+    if 'active' in data:
+        active = bool(data['active'])
+        svc.set_reaction(post_id, user_id, reaction_type, active)
+        result = {'action': 'added' if active else 'removed'}
+    else:
+        result = svc.toggle_reaction(post_id, user_id, reaction_type)
+    result['counts'] = svc.get_reactions_count(post_id)
     return jsonify({'success': True, 'data': result})
 
 
@@ -4954,7 +5390,8 @@ def fan_get_polls():
     if not club_id:
         return jsonify({'success': True, 'data': []})
     svc = get_fan_engagement_service()
-    return jsonify({'success': True, 'data': svc.get_polls(club_id)})
+    polls = svc.get_polls(club_id, user_id=request.current_user['user_id'])
+    return jsonify({'success': True, 'data': serialize_docs(polls)})
 
 
 @api_bp.route('/fan/polls', methods=['POST'])
@@ -4996,6 +5433,17 @@ def fan_get_media():
     return jsonify({'success': True, 'data': svc.get_gallery(club_id, category)})
 
 
+@api_bp.route('/fan/media/top', methods=['GET'])
+@token_required
+def fan_get_top_media():
+    """Most viewed media of the club (?limit=10)."""
+    club_id = request.current_user.get('club_id')
+    if not club_id:
+        return jsonify({'success': True, 'data': []})
+    limit = min(max(request.args.get('limit', 10, type=int), 1), 50)
+    return jsonify({'success': True, 'data': get_media_service().get_top_viewed(club_id, limit)})
+
+
 @api_bp.route('/fan/media/<media_id>', methods=['GET'])
 @token_required
 def fan_get_media_detail(media_id):
@@ -5030,6 +5478,29 @@ def match_timeline(match_id):
     return jsonify({'success': True, 'data': events})
 
 
+@api_bp.route('/matches/<match_id>/live', methods=['GET'])
+def match_live(match_id):
+    """Live match feed (public, server-sent events): score, timeline and stats deltas."""
+    from app.services.live_match import hub, LiveFeedFull, POLL_SECONDS
+    if not ObjectId.is_valid(match_id):
+        return jsonify({'success': False, 'error': 'Match not found'}), 404
+    try:
+        subscription = hub.subscribe(mongo.db, match_id, request.headers.get('Last-Event-ID'))
+    except LiveFeedFull:
+        # Clients fall back to polling /timeline and /stats
+        response = jsonify({'success': False, 'error': 'Live feed busy'})
+        response.headers['Retry-After'] = str(POLL_SECONDS * 5)
+        return response, 503
+    if subscription is None:
+        return jsonify({'success': False, 'error': 'Match not found'}), 404
+
+    response = Response(subscription.events(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    response.call_on_close(subscription.close)
+    return response
+
+
 @api_bp.route('/matches/<match_id>/stats', methods=['GET'])
 def match_stats(match_id):
     """Get match statistics (public)."""
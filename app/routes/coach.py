@@ -1,6 +1,6 @@
 # FootLogic V2 - Coach Routes
 
-from flask import Blueprint, render_template, request, redirect, url_for, flash, session, jsonify
+from flask import Blueprint, render_template, request, redirect, url_for, flash, session, jsonify, make_response
 from app.routes.auth import login_required, role_required
 
 coach_bp = Blueprint('coach', __name__, url_prefix='/coach')
@@ -19,70 +19,33 @@ def dashboard():
         flash('Aucun club associe.', 'warning')
         return redirect(url_for('main.index'))
 
-    from app.services import get_player_service, get_event_service, get_match_service, get_team_service, get_notification_service
-
-    player_service = get_player_service()
-    event_service = get_event_service()
-    match_service = get_match_service()
-    team_service = get_team_service()
-    notification_service = get_notification_service()
+    from app.services import get_team_service, get_coach_dashboard_service
+    from app.services.dashboard_service import server_timing
 
     # Get all teams for the club to allow selection
-    teams = team_service.get_by_club(club_id)
+    teams = get_team_service().get_by_club(club_id)
 
     # Determine the selected team (default to the first one or a specific one from session/query)
     selected_team_id = request.args.get('team_id')
     if not selected_team_id and teams:
         selected_team_id = str(teams[0]['_id'])
 
-    players = player_service.get_by_club(club_id, team_id=selected_team_id)
-    upcoming_events = event_service.get_upcoming(club_id, team_id=selected_team_id, limit=5)
-    upcoming_matches = match_service.get_upcoming(club_id, team_id=selected_team_id, limit=3)
-    recent_matches = match_service.get_completed(club_id, team_id=selected_team_id, limit=5)
-    season_stats = match_service.get_season_stats(club_id, team_id=selected_team_id)
-    alerts = notification_service.get_dashboard_alerts(club_id, team_id=selected_team_id, user_role='coach')
-
-    # Build activity feed — combine recent events + matches chronologically
-    activity_feed = []
-    for m in recent_matches[:5]:
-        score = m.get('score', {})
-        activity_feed.append({
-            'type': 'match_result',
-            'icon': 'fa-futbol',
-            'color': 'green' if (score.get('home', 0) > score.get('away', 0) if m.get('is_home') else score.get('away', 0) > score.get('home', 0)) else ('amber' if score.get('home', 0) == score.get('away', 0) else 'red'),
-            'title': f"{score.get('home', 0)} - {score.get('away', 0)} vs {m.get('opponent', 'Adversaire')}",
-            'subtitle': 'Victoire' if (score.get('home', 0) > score.get('away', 0) if m.get('is_home') else score.get('away', 0) > score.get('home', 0)) else ('Match nul' if score.get('home', 0) == score.get('away', 0) else 'Défaite'),
-            'date': m.get('date'),
-            'link': f"/coach/match-center/{m['_id']}"
-        })
-    for e in upcoming_events[:3]:
-        activity_feed.append({
-            'type': 'event',
-            'icon': 'fa-calendar-plus' if e.get('event_type') == 'training' else 'fa-flag',
-            'color': 'primary',
-            'title': e.get('title', 'Événement'),
-            'subtitle': e.get('event_type', 'event').capitalize(),
-            'date': e.get('date'),
-            'link': f"/coach/attendance/{e['_id']}"
-        })
-    activity_feed.sort(key=lambda x: x.get('date') or '', reverse=True)
-    activity_feed = activity_feed[:8]
+    data = get_coach_dashboard_service().build(club_id, team_id=selected_team_id)
 
-    # Injured players (status == 'injured')
-    injured_players = [p for p in players if p.get('status') == 'injured']
-
-    return render_template('coach/dashboard.html',
-        players=players,
+    response = make_response(render_template('coach/dashboard.html',
+        players=data['players'],
         teams=teams,
         selected_team_id=selected_team_id,
-        upcoming_events=upcoming_events,
-        upcoming_matches=upcoming_matches,
-        recent_matches=recent_matches,
-        season_stats=season_stats,
-        alerts=alerts,
-        activity_feed=activity_feed,
-        injured_players=injured_players
-    )
+        upcoming_events=data['upcoming_events'][:5],
+        upcoming_matches=data['upcoming_matches'][:3],
+        recent_matches=data['recent_matches'],
+        season_stats=data['season_stats'],
+        alerts=data['alerts'],
+        activity_feed=data['activity_feed'],
+        injured_players=data['injured_players']
+    ))
+    response.headers['Server-Timing'] = server_timing(data['timings'])
+    return response
 
 @coach_bp.route('/calendar')
 @login_required
@@ -1,9 +1,12 @@
 from flask import Blueprint, render_template, request, jsonify, session, redirect, url_for
 from app.routes.auth import login_required
-from app.services import get_user_service, get_team_service, get_club_service
+from app.services import get_user_service, get_team_service, get_club_service, get_autocomplete_service
 
 messaging_bp = Blueprint('messaging', __name__, url_prefix='/messages')
 
+# Members returned per keystroke by the new conversation / channel pickers
+MEMBER_SEARCH_LIMIT = 50
+
 def get_messaging_service():
     from app.services.messaging_service import MessagingService
     from app.services.db import mongo
@@ -199,23 +202,16 @@ def delete_channel(channel_id):
 def search_members():
     """Search club members for new conversation"""
     club_id = session.get('club_id')
-    q = request.args.get('q', '').lower()
-    
-    user_service = get_user_service()
-    members = user_service.get_members_by_club(club_id)
-    
-    results = []
-    for m in members:
-        if str(m['_id']) == session.get('user_id'):
-            continue
-        full_name = f"{m['profile']['first_name']} {m['profile']['last_name']}".lower()
-        role = m.get('role', '').lower()
-        if q in full_name or q in role or not q:
-            results.append({
-                'id': str(m['_id']),
-                'name': f"{m['profile']['first_name']} {m['profile']['last_name']}",
-                'role': m.get('role', 'player'),
-                'initials': f"{m['profile']['first_name'][:1]}{m['profile']['last_name'][:1]}"
-            })
-    
-    return jsonify(results)
+    if not club_id:
+        return jsonify([])
+
+    members = get_autocomplete_service().complete(
+        club_id, request.args.get('q', ''), types=('member',),
+        limit=MEMBER_SEARCH_LIMIT, exclude=session.get('user_id')
+    )
+    return jsonify([{
+        'id': m['id'],
+        'name': m['name'],
+        'role': m['role'],
+        'initials': m['initials']
+    } for m in members])
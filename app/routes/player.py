@@ -122,22 +122,24 @@ def calendar():
     user_id = session.get('user_id')
     club_id = session.get('club_id')
 
-    from app.services import get_event_service, get_player_service, get_match_service
+    from app.services import get_calendar_service, get_player_service
+    from app.services.dates import months_around
     import json
-    event_service = get_event_service()
     player_service = get_player_service()
-    match_service = get_match_service()
 
     player = player_service.get_by_user(user_id) if user_id else None
     team_id = player.get('team_id') if player else None
 
-    events = event_service.get_by_club(club_id) if club_id else []
-    if team_id:
-        events = [e for e in events if not e.get('team_id') or e.get('team_id') == team_id]
+    # Bounded window around today (previous month → six months ahead)
+    # instead of every event and match of the club
+    start, end = months_around(1, 6)
 
-    matches = match_service.get_by_club(club_id) if club_id else []
-    if team_id:
-        matches = [m for m in matches if not m.get('team_id') or m.get('team_id') == team_id]
+    sources = get_calendar_service().fetch(
+        club_id, team_ids=[team_id] if team_id else None,
+        start=start, end=end, types=('match', 'event')
+    ) if club_id else {}
+    matches = sources.get('match', [])
+    events = sources.get('event', [])
 
     calendar_items = []
     for m in matches:
@@ -79,6 +79,30 @@ def get_competition_service():
     from .competition_service import CompetitionService
     return CompetitionService(mongo.db)
 
+def get_calendar_service():
+    from .calendar_service import CalendarService
+    return CalendarService(mongo.db)
+
+def get_recurrence_service():
+    from .recurrence_service import RecurrenceService
+    return RecurrenceService(mongo.db)
+
+def get_ics_feed_service():
+    from .ics_service import IcsFeedService
+    return IcsFeedService(mongo.db)
+
+def get_standings_service():
+    from .standings_service import StandingsService
+    return StandingsService(mongo.db)
+
+def get_coach_dashboard_service():
+    from .dashboard_service import CoachDashboardService
+    return CoachDashboardService(mongo.db)
+
+def get_attendance_service():
+    from .attendance_service import AttendanceService
+    return AttendanceService(mongo.db)
+
 def get_training_service():
     from .training_service import TrainingService
     return TrainingService(mongo.db)
@@ -87,10 +111,18 @@ def get_injury_service():
     from .injury_service import InjuryService
     return InjuryService(mongo.db)
 
+def get_injury_analytics_service():
+    from .injury_analytics_service import InjuryAnalyticsService
+    return InjuryAnalyticsService(mongo.db)
+
 def get_player_analytics_service():
     from .player_analytics_service import PlayerAnalyticsService
     return PlayerAnalyticsService(mongo.db)
 
+def get_player_snapshot_service():
+    from .player_snapshot_service import PlayerSnapshotService
+    return PlayerSnapshotService(mongo.db)
+
 def get_platform_management_service():
     from .platform_management_service import PlatformManagementService
     return PlatformManagementService(mongo.db)
@@ -111,5 +143,22 @@ def get_media_service():
     from .media_service import MediaService
     return MediaService(mongo.db)
 
+def get_search_service():
+    from .search_service import SearchService
+    return SearchService(mongo.db)
+
+def get_autocomplete_service():
+    from .autocomplete_service import AutocompleteService
+    return AutocompleteService(mongo.db)
+
+def get_feed_service():
+    from .feed_service import FeedService
+    return FeedService(mongo.db)
+
+def get_upload_service():
+    from flask import current_app
+    from .upload_store import LocalBlobStore, UploadService
+    return UploadService(mongo.db, LocalBlobStore(current_app.config['UPLOAD_ROOT']))
+
 # Role helpers
 from .user_service import has_permission, get_nav_for_role, ROLE_PERMISSIONS
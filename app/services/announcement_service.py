@@ -3,13 +3,21 @@
 
 from datetime import datetime
 from bson import ObjectId
+from app.services.text_search import ensure_text_index, search_text
+from app.services.feed_service import FeedService
+from app.services.view_counter import views
 
 
 class AnnouncementService:
+    _indexed = set()
+
     def __init__(self, db):
         self.db = db
         self.collection = db['announcements']
         self.users = db['users']
+        if db.name not in AnnouncementService._indexed:
+            ensure_text_index(self.collection, 'subject', 'body', 'announcements_text')
+            AnnouncementService._indexed.add(db.name)
 
     def get_announcement_recipients(self, club_id, target_type='all', target_id=''):
         """Return the list of users who would receive an announcement.
@@ -88,26 +96,46 @@ class AnnouncementService:
         }
         result = self.collection.insert_one(doc)
         doc['_id'] = result.inserted_id
+        FeedService(self.db).publish_announcement(doc)
         doc['recipient_count'] = success_count
         doc['failed_emails'] = failed_emails
         doc['recipient_emails'] = recipient_emails
         return doc
 
-    def get_announcements(self, club_id, limit=50):
-        """Return announcement history for a club, most recent first."""
+    def record_open(self, announcement_id, club_id):
+        """Count an opening of a club's announcement (buffered, written in batches).
+
+        Returns False, without counting, if the announcement is not the club's.
+        """
+        cid = ObjectId(club_id) if isinstance(club_id, str) else club_id
+        if not self.collection.find_one({'_id': ObjectId(announcement_id), 'club_id': cid}, {'_id': 1}):
+            return False
+        views.record(self.db, 'announcements', announcement_id, field='opens')
+        return True
+
+    def get_announcements(self, club_id, limit=50, q=None):
+        """Return announcement history for a club, most recent first.
+
+        With `q`, only matching announcements are returned, best match first
+        (full-text on subject and body; "entr*" searches subjects by prefix).
+        """
         cid = ObjectId(club_id) if isinstance(club_id, str) else club_id
-        docs = list(
-            self.collection.find({'club_id': cid})
-            .sort('sent_at', -1)
-            .limit(limit)
-        )
+        if q and q.strip():
+            docs = search_text(self.collection, cid, q, 'subject', 'sent_at', limit)
+        else:
+            docs = list(
+                self.collection.find({'club_id': cid})
+                .sort('sent_at', -1)
+                .limit(limit)
+            )
         # Resolve sender names
+        sender_ids = list({doc['sent_by'] for doc in docs if doc.get('sent_by')})
+        senders = {u['_id']: u for u in self.users.find({'_id': {'$in': sender_ids}}, {'profile': 1})} if sender_ids else {}
         for doc in docs:
-            sender = None
-            if doc.get('sent_by'):
-                sender = self.users.find_one({'_id': doc['sent_by']}, {'profile': 1})
+            sender = senders.get(doc.get('sent_by'))
+            profile = (sender or {}).get('profile') or {}
             doc['sender_name'] = (
-                f"{sender['profile'].get('first_name', '')} {sender['profile'].get('last_name', '')}".strip()
+                f"{profile.get('first_name', '')} {profile.get('last_name', '')}".strip()
                 if sender else 'Admin'
             )
         return docs
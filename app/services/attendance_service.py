@@ -0,0 +1,155 @@
+# FootLogic V2 - Attendance Service
+
+from bson import ObjectId
+from datetime import datetime
+from pymongo import UpdateOne
+
+
+# Sources an attendance record can point to
+SOURCE_EVENT = 'event'
+SOURCE_TRAINING = 'training'
+
+# Statuses counted as "attended" in rate calculations
+ATTENDED_STATUSES = ['present', 'late']
+# RSVP statuses that are not a final answer yet (excluded from rates)
+PENDING_STATUSES = ['convoked', 'uncertain']
+
+
+def _oid(value):
+    """Coerce a string id to ObjectId when possible (legacy rows may hold user ids)."""
+    if isinstance(value, ObjectId):
+        return value
+    if value and ObjectId.is_valid(str(value)):
+        return ObjectId(str(value))
+    return value
+
+
+class AttendanceService:
+    """Unified attendance store: one document per (source, ref_id, player_id).
+
+    Events and training sessions used to embed attendance in three different
+    shapes. Each record here is denormalized with club_id / team_id / date so
+    per-player and per-team rates are a single indexed aggregation.
+    """
+
+    _indexed = set()
+
+    def __init__(self, db):
+        self.db = db
+        self.collection = db.attendance
+        if db.name not in AttendanceService._indexed:
+            self.collection.create_index(
+                [('source', 1), ('ref_id', 1), ('player_id', 1)], unique=True
+            )
+            self.collection.create_index([('player_id', 1), ('date', -1)])
+            self.collection.create_index([('team_id', 1), ('date', -1)])
+            AttendanceService._indexed.add(db.name)
+
+    # ── Context ─────────────────────────────────────────────
+
+    @staticmethod
+    def context_from(doc):
+        """Extract the denormalized fields stored on every record from an event/session."""
+        if not doc:
+            return {}
+        return {
+            'club_id': _oid(doc.get('club_id')),
+            'team_id': _oid(doc.get('team_id')) or None,
+            'date': doc.get('date'),
+        }
+
+    # ── Writes ──────────────────────────────────────────────
+
+    def _upsert_op(self, source, ref_id, rec, context):
+        fields = {
+            'status': rec['status'],
+            'updated_at': datetime.utcnow(),
+            **(context or {}),
+        }
+        for key in ('reason', 'rating'):
+            if key in rec:
+                fields[key] = rec[key]
+        return UpdateOne(
+            {'source': source, 'ref_id': _oid(ref_id), 'player_id': _oid(rec['player_id'])},
+            {'$set': fields, '$setOnInsert': {'created_at': datetime.utcnow()}},
+            upsert=True,
+        )
+
+    def record(self, source, ref_id, player_id, status, context=None, **extra):
+        """Upsert a single player's attendance for an event or session."""
+        return self.bulk_upsert(source, ref_id, [{'player_id': player_id, 'status': status, **extra}], context)
+
+    def bulk_upsert(self, source, ref_id, records, context=None):
+        """Upsert many records in one bulk_write.
+
+        records = [{player_id, status, reason?, rating?}]
+        Returns counts: {'matched', 'modified', 'upserted'}.
+        """
+        ops = [self._upsert_op(source, ref_id, rec, context) for rec in records if rec.get('player_id')]
+        if not ops:
+            return {'matched': 0, 'modified': 0, 'upserted': 0}
+        result = self.collection.bulk_write(ops, ordered=False)
+
+        from app.services.player_snapshot_service import PlayerSnapshotService
+        PlayerSnapshotService(self.db).invalidate_players([rec['player_id'] for rec in records if rec.get('player_id')])
+        return {
+            'matched': result.matched_count,
+            'modified': result.modified_count,
+            'upserted': result.upserted_count,
+        }
+
+    def delete_for(self, source, ref_id):
+        """Drop every record attached to a deleted event or session."""
+        return self.collection.delete_many({'source': source, 'ref_id': _oid(ref_id)})
+
+    # ── Queries ─────────────────────────────────────────────
+
+    def get_for(self, source, ref_id):
+        """Attendance map {player_id_str: status} for one event or session."""
+        cursor = self.collection.find(
+            {'source': source, 'ref_id': _oid(ref_id)},
+            {'player_id': 1, 'status': 1}
+        )
+        return {str(r['player_id']): r.get('status') for r in cursor}
+
+    @staticmethod
+    def _rate_group(group_id):
+        return {'$group': {
+            '_id': group_id,
+            'total': {'$sum': {'$cond': [{'$in': ['$status', PENDING_STATUSES]}, 0, 1]}},
+            'attended': {'$sum': {'$cond': [{'$in': ['$status', ATTENDED_STATUSES]}, 1, 0]}},
+        }}
+
+    @staticmethod
+    def _format_rate(row):
+        total = row.get('total', 0) if row else 0
+        attended = row.get('attended', 0) if row else 0
+        return {
+            'total': total,
+            'attended': attended,
+            'rate': round(attended / total * 100, 1) if total else 0,
+        }
+
+    def get_player_rate(self, player_id, source=None, since=None, limit=None):
+        """Attendance rate for a player, optionally over the last `limit` records."""
+        match = {'player_id': _oid(player_id), 'status': {'$nin': PENDING_STATUSES}}
+        if source:
+            match['source'] = source
+        if since:
+            match['date'] = {'$gte': since}
+        pipeline = [{'$match': match}]
+        if limit:
+            pipeline += [{'$sort': {'date': -1}}, {'$limit': limit}]
+        pipeline.append(self._rate_group(None))
+        rows = list(self.collection.aggregate(pipeline))
+        return self._format_rate(rows[0] if rows else None)
+
+    def get_team_rates(self, team_id, source=None, since=None):
+        """Per-player attendance rates for a team: {player_id_str: {total, attended, rate}}."""
+        match = {'team_id': _oid(team_id)}
+        if source:
+            match['source'] = source
+        if since:
+            match['date'] = {'$gte': since}
+        rows = self.collection.aggregate([{'$match': match}, self._rate_group('$player_id')])
+        return {str(r['_id']): self._format_rate(r) for r in rows}
@@ -0,0 +1,168 @@
+# FootLogic V2 - Member Autocomplete (per-club prefix trie)
+
+import re
+import time
+from bson import ObjectId
+from app.services.cache import TTLCache
+from app.services.search_service import fold
+
+# How often a worker asks Mongo whether another worker changed a club's members
+CHECK_SECONDS = 2
+
+# A trie is rebuilt at least this often, for writes that bypass the services
+REBUILD_SECONDS = 300
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+# A query word equal to a whole token outranks one that is only its prefix
+EXACT_SCORE = 2
+PREFIX_SCORE = 1
+
+_tries = TTLCache(ttl=REBUILD_SECONDS, maxsize=256)
+
+
+def _words(text):
+    return re.findall(r'[a-z0-9]+', fold(text))
+
+
+class _Node:
+    __slots__ = ('children', 'ids', 'ends')
+
+    def __init__(self):
+        self.children = {}
+        self.ids = set()    # entries having a token under this node
+        self.ends = set()   # entries having a token ending here
+
+
+class _Trie:
+    """Prefix trie over the tokens of one club's members and players."""
+
+    def __init__(self, entries, version):
+        self.entries = entries
+        self.version = version
+        self.checked_at = time.monotonic()
+        self.root = _Node()
+        for idx, entry in enumerate(entries):
+            for token in entry.pop('_tokens'):
+                self._insert(token, idx)
+
+    def _insert(self, token, idx):
+        node = self.root
+        for char in token:
+            node = node.children.setdefault(char, _Node())
+            node.ids.add(idx)
+        node.ends.add(idx)
+
+    def _find(self, prefix):
+        node = self.root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return None
+        return node
+
+    def complete(self, q, limit, types=None, exclude=None):
+        """Entries matching every query word as a token prefix, best first."""
+        def wanted(idx):
+            entry = self.entries[idx]
+            return (not types or entry['type'] in types) and entry['id'] != exclude
+
+        words = list(dict.fromkeys(_words(q)))
+        if not words:
+            # Entries are stored sorted by name
+            return [e for i, e in enumerate(self.entries) if wanted(i)][:limit]
+
+        scores = None
+        for word in words:
+            node = self._find(word)
+            if node is None:
+                return []
+            if scores is None:
+                scores = dict.fromkeys(node.ids, 0)
+            else:
+                scores = {idx: s for idx, s in scores.items() if idx in node.ids}
+            for idx in scores:
+                scores[idx] += EXACT_SCORE if idx in node.ends else PREFIX_SCORE
+        ranked = sorted((idx for idx in scores if wanted(idx)), key=lambda idx: (-scores[idx], idx))
+        return [self.entries[idx] for idx in ranked[:limit]]
+
+
+class AutocompleteService:
+    """Typeahead over a club's members (user accounts) and players.
+
+    Names, jersey numbers, roles and positions are folded (lowercase, no
+    accents) into a prefix trie kept in worker memory per club and built on
+    first use. User and player writes go through invalidate(), which bumps a
+    per-club version in Mongo; each worker compares it at most every
+    CHECK_SECONDS and rebuilds its trie when it changed.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.state = db.autocomplete_state
+
+    def complete(self, club_id, q='', types=None, limit=DEFAULT_LIMIT, exclude=None):
+        """Top `limit` entries [{id, type, name, role, ...}] whose tokens start with the query words."""
+        limit = max(1, min(int(limit or DEFAULT_LIMIT), MAX_LIMIT))
+        return self._trie(str(club_id)).complete(q, limit, types=types, exclude=str(exclude) if exclude else None)
+
+    def invalidate(self, club_id):
+        """Drop the club's trie on every worker (call after a member or player write)."""
+        if not club_id:
+            return
+        self.state.update_one({'_id': str(club_id)}, {'$inc': {'version': 1}}, upsert=True)
+        _tries.invalidate(('autocomplete', str(club_id)))
+
+    def invalidate_for(self, collection, doc_id):
+        """invalidate() for the club of a users/players document."""
+        doc = self.db[collection].find_one({'_id': ObjectId(doc_id)}, {'club_id': 1})
+        if doc:
+            self.invalidate(doc.get('club_id'))
+
+    def _trie(self, club_id):
+        key = ('autocomplete', club_id)
+        trie = _tries.get(key)
+        if trie is not None and time.monotonic() - trie.checked_at < CHECK_SECONDS:
+            return trie
+        state = self.state.find_one({'_id': club_id}) or {}
+        version = state.get('version', 0)
+        if trie is not None and trie.version == version:
+            trie.checked_at = time.monotonic()
+            return trie
+        return _tries.set(key, _Trie(self._entries(club_id), version))
+
+    def _entries(self, club_id):
+        """Autocomplete entries of a club, sorted by name."""
+        club_oid = ObjectId(club_id)
+        players = list(self.db.players.find(
+            {'club_id': club_oid},
+            {'name': 1, 'first_name': 1, 'last_name': 1, 'jersey_number': 1, 'position': 1, 'user_id': 1}
+        ))
+        jerseys = {p['user_id']: p.get('jersey_number') for p in players if p.get('user_id')}
+
+        entries = []
+        for u in self.db.users.find({'club_id': club_oid}, {'profile.first_name': 1, 'profile.last_name': 1, 'role': 1}):
+            profile = u.get('profile') or {}
+            first, last = profile.get('first_name') or '', profile.get('last_name') or ''
+            jersey = jerseys.get(u['_id'])
+            role = u.get('role') or 'player'
+            entries.append({
+                'id': str(u['_id']), 'type': 'member',
+                'name': f'{first} {last}'.strip(), 'role': role,
+                'jersey_number': jersey, 'initials': f'{first[:1]}{last[:1]}'.upper(),
+                '_tokens': _words(f"{first} {last} {role} {'' if jersey is None else jersey}"),
+            })
+        for p in players:
+            name = p.get('name') or f"{p.get('first_name', '')} {p.get('last_name', '')}".strip()
+            parts = name.split()
+            entries.append({
+                'id': str(p['_id']), 'type': 'player',
+                'name': name, 'role': 'player', 'position': p.get('position'),
+                'jersey_number': p.get('jersey_number'),
+                'user_id': str(p['user_id']) if p.get('user_id') else None,
+                'initials': ''.join(w[:1] for w in parts[:2]).upper(),
+                '_tokens': _words(f"{name} {p.get('position') or ''} {p.get('jersey_number', '')}"),
+            })
+        entries.sort(key=lambda e: (fold(e['name']), e['type']))
+        return entries
@@ -0,0 +1,105 @@
+# FootLogic V2 - In-process TTL Cache
+
+import threading
+import time
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Thread-safe TTL cache shared by services within one worker process.
+
+    Keys are tuples such as ('club', club_id, team_id) so a whole family of
+    entries can be dropped with invalidate_prefix(('club', club_id)).
+    """
+
+    def __init__(self, ttl=60, maxsize=1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            return value
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            if key not in self._data and len(self._data) >= self.maxsize:
+                self._evict()
+            self._data[key] = (time.monotonic() + (ttl or self.ttl), value)
+        return value
+
+    def get_or_set(self, key, factory, ttl=None):
+        """Return the cached value, computing and storing it on a miss."""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = self.set(key, factory(), ttl)
+        return value
+
+    def invalidate(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def invalidate_prefix(self, prefix):
+        """Drop every tuple key starting with `prefix`."""
+        n = len(prefix)
+        with self._lock:
+            for key in [k for k in self._data if isinstance(k, tuple) and k[:n] == prefix]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def _evict(self):
+        # Drop expired entries first, then the oldest insertion if still full
+        now = time.monotonic()
+        for key in [k for k, (exp, _) in self._data.items() if exp < now]:
+            del self._data[key]
+        if len(self._data) >= self.maxsize:
+            del self._data[next(iter(self._data))]
+
+
+class GenerationCache:
+    """TTLCache whose scopes (e.g. a club) are dropped on every worker at once.
+
+    Each scope has a generation counter in the `cache_generations`
+    collection. Entries are stored under the generation read before
+    computing them and bump() increments it, so the other workers miss on
+    their next read instead of serving stale values until the TTL expires.
+    A read costs one _id lookup instead of the cached computation.
+    """
+
+    def __init__(self, namespace, ttl=300, maxsize=512):
+        self.namespace = namespace
+        self._cache = TTLCache(ttl=ttl, maxsize=maxsize)
+
+    def _state_id(self, scope):
+        return f'{self.namespace}:{scope}'
+
+    def generation(self, db, scope):
+        state = db.cache_generations.find_one({'_id': self._state_id(scope)}, {'gen': 1})
+        return state['gen'] if state else 0
+
+    def get_or_set(self, db, scope, key, factory):
+        """Cached value of `key` (a tuple) in `scope`, computed by factory() on a miss."""
+        scope = str(scope)
+        full_key = (db.name, scope, self.generation(db, scope)) + tuple(key)
+        return self._cache.get_or_set(full_key, factory)
+
+    def bump(self, db, scope):
+        """Invalidate a scope in every process."""
+        scope = str(scope)
+        db.cache_generations.update_one({'_id': self._state_id(scope)}, {'$inc': {'gen': 1}}, upsert=True)
+        self._cache.invalidate_prefix((db.name, scope))
+
+    def clear(self):
+        self._cache.clear()
@@ -0,0 +1,171 @@
+# FootLogic V2 - Calendar Service (unified date-range feed)
+
+import heapq
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from bson import ObjectId
+from app.services.dates import date_range, parse_date, iso, ensure_date_indexes
+from app.services.recurrence_service import RecurrenceService, SOURCE_EVENT, SOURCE_TRAINING
+
+# Shared by all requests of the worker: one indexed range query per source
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='calendar')
+
+ITEM_TYPES = ('match', 'event', 'training', 'competition')
+DEFAULT_TYPES = ('match', 'event', 'training')
+
+
+def _sort_key(item):
+    return parse_date(item.get('date')) or datetime.min
+
+
+def serialize_items(items):
+    """JSON-ready copy of feed items (ISO dates)."""
+    return [
+        {**item, 'date': iso(item.get('date')), 'end_date': iso(item.get('end_date')) or ''}
+        if 'end_date' in item else {**item, 'date': iso(item.get('date'))}
+        for item in items
+    ]
+
+
+class CalendarService:
+    """Merged calendar of matches, events, training sessions and competitions.
+
+    Every source is fetched with a (club_id, date) range query on its own
+    thread, already sorted by date, and the sorted streams are merged with a
+    heap. Views pass the visible window (e.g. one month) instead of loading
+    every document of the club.
+    """
+
+    _indexed = set()
+
+    def __init__(self, db):
+        self.db = db
+        self.recurrences = RecurrenceService(db)
+        if db.name not in CalendarService._indexed:
+            ensure_date_indexes(db)
+            CalendarService._indexed.add(db.name)
+
+    # ── Raw source queries ──────────────────────────────────
+
+    @staticmethod
+    def _scope(club_id, team_ids):
+        query = {'club_id': ObjectId(club_id)}
+        if team_ids:
+            # Club-wide documents (no team) are visible to every team; events
+            # created from forms may still hold the team id as a string
+            ids = [ObjectId(t) for t in team_ids] + [str(t) for t in team_ids]
+            query['team_id'] = {'$in': ids + [None, '']}
+        return query
+
+    def _find_dated(self, collection, club_id, team_ids, start, end, limit, extra=None):
+        query = self._scope(club_id, team_ids)
+        query['date'] = date_range(start, end)
+        if extra:
+            query.update(extra)
+        return list(collection.find(query).sort('date', 1).limit(limit or 0))
+
+    def _find_with_series(self, source, collection, club_id, team_ids, start, end, limit, extra=None):
+        """Stored documents plus the lazily expanded occurrences of recurring series."""
+        docs = self._find_dated(collection, club_id, team_ids, start, end, limit, extra)
+        occurrences = self.recurrences.expand(source, club_id, start, end, team_ids, limit)
+        if not occurrences:
+            return docs
+        merged = list(heapq.merge(docs, occurrences, key=lambda d: d['date']))
+        return merged[:limit] if limit else merged
+
+    def _find_competitions(self, club_id, start, end, limit):
+        # Overlap of [start_date, end_date] with the window
+        query = {'club_id': ObjectId(club_id), 'start_date': {'$lt': end} if end else {'$ne': None}}
+        if start:
+            query['$or'] = [{'end_date': {'$gte': start}}, {'end_date': None}]
+        return list(self.db.competitions.find(query).sort('start_date', 1).limit(limit or 0))
+
+    def fetch(self, club_id, team_ids=None, start=None, end=None, types=DEFAULT_TYPES, limit=None, filters=None):
+        """Run the range query of each requested source concurrently.
+
+        Returns {type: [raw documents sorted by date]}. `start` defaults to now.
+        `filters` adds query fields per source, e.g. {'match': {'status': 'scheduled'}}.
+        """
+        start = parse_date(start) or datetime.utcnow()
+        end = parse_date(end)
+        team_ids = [t for t in (team_ids or []) if t and ObjectId.is_valid(str(t))]
+        filters = filters or {}
+
+        jobs = {}
+        if 'match' in types:
+            jobs['match'] = (self._find_dated, self.db.matches, club_id, team_ids, start, end, limit,
+                             filters.get('match'))
+        if 'event' in types:
+            jobs['event'] = (self._find_with_series, SOURCE_EVENT, self.db.events,
+                             club_id, team_ids, start, end, limit, filters.get('event'))
+        if 'training' in types:
+            jobs['training'] = (self._find_with_series, SOURCE_TRAINING, self.db.training_sessions,
+                                club_id, team_ids, start, end, limit,
+                                {'status': {'$ne': 'cancelled'}, **filters.get('training', {})})
+        if 'competition' in types:
+            jobs['competition'] = (self._find_competitions, club_id, start, end, limit)
+
+        futures = {name: _executor.submit(*job) for name, job in jobs.items()}
+        return {name: future.result() for name, future in futures.items()}
+
+    # ── Typed feed ──────────────────────────────────────────
+
+    def get_feed(self, club_id, team_ids=None, start=None, end=None, types=DEFAULT_TYPES, limit=None, team_names=None):
+        """Single date-sorted list of calendar items for the window."""
+        items = self.merge(self.fetch(club_id, team_ids, start, end, types, limit), team_names)
+        return items[:limit] if limit else items
+
+    def merge(self, sources, team_names=None):
+        """Heap-merge the per-source sorted lists returned by fetch() into typed items."""
+        team_names = team_names or {}
+        streams = [
+            [self._to_item(kind, doc, team_names) for doc in docs]
+            for kind, docs in sources.items()
+        ]
+        return list(heapq.merge(*streams, key=_sort_key))
+
+    @staticmethod
+    def _to_item(kind, doc, team_names):
+        team_id = doc.get('team_id')
+        item = {
+            'id': str(doc['_id']),
+            'type': kind,
+            'date': doc.get('date'),
+            'status': doc.get('status', 'scheduled'),
+            'location': doc.get('location', ''),
+            'category': doc.get('category', ''),
+            'team_id': str(team_id) if team_id else None,
+            'team': team_names.get(str(team_id), '') if team_id else '',
+        }
+        if doc.get('series_id'):
+            item['series_id'] = str(doc['series_id'])
+        if kind == 'match':
+            item.update({
+                'title': f"vs {doc.get('opponent', '?')}",
+                'subtype': 'home' if doc.get('is_home') else 'away',
+                'opponent': doc.get('opponent', ''),
+                'score': doc.get('score'),
+                'competition': doc.get('competition', ''),
+            })
+        elif kind == 'event':
+            item.update({
+                'title': doc.get('title', ''),
+                'subtype': doc.get('type', 'other'),
+                'description': doc.get('description', ''),
+            })
+        elif kind == 'training':
+            item.update({
+                'title': 'Entraînement',
+                'subtype': doc.get('focus', 'mixed'),
+                'duration': doc.get('duration'),
+                'status': doc.get('status', 'planned'),
+            })
+        elif kind == 'competition':
+            item.update({
+                'title': doc.get('name', ''),
+                'date': doc.get('start_date'),
+                'end_date': doc.get('end_date'),
+                'subtype': doc.get('type', ''),
+                'status': doc.get('status', ''),
+            })
+        return item
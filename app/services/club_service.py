@@ -2,13 +2,26 @@
 
 from bson import ObjectId
 from datetime import datetime
+from app.services.cache import TTLCache
+
+# Admin dashboard counts per club. Not invalidated on writes (member, player and
+# team writes are spread over many routes and workers): the short TTL bounds how
+# stale they can be
+_counts_cache = TTLCache(ttl=30, maxsize=1024)
 
 class ClubService:
     """Service for club-related operations"""
+
+    _indexed = set()
     
     def __init__(self, db):
         self.db = db
         self.collection = db.clubs
+        if db.name not in ClubService._indexed:
+            db.users.create_index([('club_id', 1), ('role', 1), ('account_status', 1)])
+            db.players.create_index('club_id')
+            db.teams.create_index('club_id')
+            ClubService._indexed.add(db.name)
     
     def get_all(self):
         """Get all clubs"""
@@ -45,6 +58,37 @@ class ClubService:
         """Delete a club"""
         return self.collection.delete_one({'_id': ObjectId(club_id)})
     
+    def get_dashboard_counts(self, club_id):
+        """Member, player and team counts for the admin dashboard (cached per club).
+
+        Members are counted with one $group on (role, account_status) served by
+        the users (club_id, role, account_status) index; players and teams with
+        count_documents. No member or player document is loaded. Values may
+        lag writes by up to the cache TTL (30s).
+        """
+        key = ('club_counts', str(club_id))
+        return _counts_cache.get_or_set(key, lambda: self._build_counts(ObjectId(club_id)))
+
+    def _build_counts(self, club_id):
+        role_counts, status_counts, total = {}, {}, 0
+        for row in self.db.users.aggregate([
+            {'$match': {'club_id': club_id}},
+            {'$group': {'_id': {'role': '$role', 'status': '$account_status'}, 'count': {'$sum': 1}}},
+        ]):
+            role = row['_id'].get('role') or 'fan'
+            status = row['_id'].get('status') or 'active'
+            role_counts[role] = role_counts.get(role, 0) + row['count']
+            status_counts[status] = status_counts.get(status, 0) + row['count']
+            total += row['count']
+        return {
+            'total_members': total,
+            'role_counts': role_counts,
+            'status_counts': status_counts,
+            'pending_invitations': status_counts.get('pending', 0),
+            'total_players': self.db.players.count_documents({'club_id': club_id}),
+            'total_teams': self.db.teams.count_documents({'club_id': club_id}),
+        }
+
     def get_stats(self, club_id):
         """Get club statistics"""
         from app.services.db import mongo
@@ -1,7 +1,12 @@
 # FootLogic V2 - Competition Service
 
 from bson import ObjectId
-from datetime import datetime
+from datetime import datetime, timedelta
+from app.services.dates import parse_date
+from app.services.fixture_generator import (
+    Scheduler, plan_league, plan_knockout, knockout_first_round, build_match_docs,
+)
+from app.services.standings_service import participant_key
 
 
 class CompetitionService:
@@ -28,8 +33,8 @@ class CompetitionService:
             'season': data.get('season', ''),
             'category': data.get('category', ''),         # Senior, U19, U17 …
             'organizer': data.get('organizer', ''),
-            'start_date': data.get('start_date'),
-            'end_date': data.get('end_date'),
+            'start_date': parse_date(data.get('start_date')),
+            'end_date': parse_date(data.get('end_date')),
             'status': data.get('status', 'active'),       # active / finished / upcoming
             'teams_involved': data.get('teams_involved', []),  # list of team_id strings
             'notes': data.get('notes', ''),
@@ -43,6 +48,9 @@ class CompetitionService:
         allowed = ['name', 'type', 'season', 'category', 'organizer',
                     'start_date', 'end_date', 'status', 'teams_involved', 'notes']
         update_fields = {k: v for k, v in data.items() if k in allowed}
+        for key in ('start_date', 'end_date'):
+            if key in update_fields:
+                update_fields[key] = parse_date(update_fields[key])
         if update_fields:
             self.collection.update_one(
                 {'_id': ObjectId(competition_id)},
@@ -52,6 +60,166 @@ class CompetitionService:
     def delete(self, competition_id):
         return self.collection.delete_one({'_id': ObjectId(competition_id)})
 
+    # ── Fixture generation ────────────────────────────────
+
+    def _participants(self, club_id, entries):
+        """Normalize [team_id | {'team_id'} | {'name'} | 'External FC'] to {key: participant}, in seed order."""
+        team_ids = []
+        for entry in entries:
+            value = entry.get('team_id') if isinstance(entry, dict) else entry
+            if value and ObjectId.is_valid(str(value)):
+                team_ids.append(ObjectId(str(value)))
+        names = {t['_id']: t.get('name', '') for t in self.db.teams.find(
+            {'_id': {'$in': team_ids}, 'club_id': ObjectId(club_id)}, {'name': 1})}
+
+        participants = {}
+        for entry in entries:
+            value = entry.get('team_id') if isinstance(entry, dict) else entry
+            if value and ObjectId.is_valid(str(value)) and ObjectId(str(value)) in names:
+                team_id = ObjectId(str(value))
+                p = {'key': str(team_id), 'name': names[team_id], 'team_id': team_id}
+            else:
+                name = (entry.get('name') if isinstance(entry, dict) else entry) or ''
+                if not str(name).strip():
+                    continue
+                p = {'key': participant_key(name), 'name': str(name).strip(), 'team_id': None}
+            participants[p['key']] = p
+        return participants
+
+    def _venues(self, participants, venues):
+        """Venue map keyed by participant key (accepts keys, team ids or names)."""
+        by_name = {p['name']: key for key, p in participants.items()}
+        out = {}
+        for who, venue in (venues or {}).items():
+            key = who if who in participants else by_name.get(who)
+            if key and venue:
+                out[key] = venue
+        return out
+
+    def generate_fixtures(self, competition_id, options):
+        """Generate and bulk-insert the fixtures of a competition.
+
+        options:
+            format: 'league' (double round-robin by default) or 'knockout'
+            double: False for a single round-robin
+            participants: seed-ordered [team_id | {'name': ...}] (defaults to teams_involved)
+            divisions: [{'name', 'participants'}] to schedule several groups at once
+            start_date, interval_days (7), kickoff ('15:00')
+            venues: {participant: venue}, blackout_dates: [dates]
+            replace: drop previously generated fixtures that are still scheduled
+        Returns {'created', 'byes'} or None if the competition does not exist.
+        """
+        competition = self.get_by_id(competition_id)
+        if not competition:
+            return None
+        fmt = options.get('format') or ('knockout' if competition.get('type') == 'cup' else 'league')
+        if fmt not in ('league', 'knockout'):
+            raise ValueError('format must be league or knockout')
+
+        divisions = options.get('divisions') or [{
+            'name': '', 'participants': options.get('participants') or competition.get('teams_involved', []),
+        }]
+        scheduler = Scheduler(
+            options.get('start_date') or competition.get('start_date'),
+            interval_days=int(options.get('interval_days') or 7),
+            kickoff=options.get('kickoff') or '15:00',
+            blackout_dates=options.get('blackout_dates'),
+        )
+
+        docs, byes = [], []
+        for division in divisions:
+            participants = self._participants(competition['club_id'], division.get('participants', []))
+            if len(participants) < 2:
+                raise ValueError(f"Division '{division.get('name', '')}' needs at least two participants")
+            scheduler.venues = self._venues(participants, options.get('venues'))
+            scheduler.restart()
+            name = division.get('name', '')
+            if fmt == 'league':
+                fixtures = plan_league(list(participants), scheduler, options.get('double', True), name)
+            else:
+                fixtures, division_byes = plan_knockout(knockout_first_round(list(participants)), scheduler, 1, name)
+                byes += [{'division': name, 'slot': slot, 'participant': participants[key]}
+                         for slot, key in division_byes.items()]
+            docs += build_match_docs(competition['club_id'], competition, fixtures, participants)
+
+        if options.get('replace'):
+            self.db.matches.delete_many({
+                'competition_id': competition['_id'], 'generated': True, 'status': 'scheduled',
+            })
+        if docs:
+            self.db.matches.insert_many(docs, ordered=False)
+        if fmt == 'knockout':
+            self.collection.update_one(
+                {'_id': competition['_id']},
+                {'$set': {'bracket': {'byes': byes, 'round': 1, 'venues': options.get('venues') or {}}}}
+            )
+
+        from app.services.ics_service import IcsFeedService
+        IcsFeedService(self.db).invalidate(competition['club_id'])
+        return {'created': len(docs), 'byes': [b['participant']['name'] for b in byes]}
+
+    def advance_knockout(self, competition_id, interval_days=7, kickoff='15:00'):
+        """Create the next knockout round once every tie of the current one is completed.
+
+        A drawn tie needs `winner_key` on the match (penalties). Returns the
+        number of matches created, 0 when a division has its winner, or None
+        while the current round is still being played.
+        """
+        competition = self.get_by_id(competition_id)
+        bracket = (competition or {}).get('bracket')
+        if not bracket:
+            return None
+        current = bracket.get('round', 1)
+        matches = list(self.db.matches.find({'competition_id': competition['_id'], 'round': current}))
+        if any(m.get('status') != 'completed' for m in matches):
+            return None
+
+        last_date = max((m['date'] for m in matches if isinstance(m.get('date'), datetime)),
+                        default=datetime.utcnow())
+        scheduler = Scheduler(last_date + timedelta(days=interval_days), interval_days, kickoff)
+
+        docs, winners = [], {}
+        byes = bracket.get('byes', []) if current == 1 else []
+        for division in {m.get('division', '') for m in matches} | {b['division'] for b in byes}:
+            through = {b['slot']: b['participant'] for b in byes if b['division'] == division}
+            for m in (m for m in matches if m.get('division', '') == division):
+                through[m['slot']] = self._tie_winner(m)
+            if len(through) == 1:
+                winners[division] = next(iter(through.values()))['name']
+                continue
+            slots = [(through.get(2 * j), through.get(2 * j + 1)) for j in range(len(through) // 2)]
+            participants = {p['key']: p for pair in slots for p in pair if p}
+            scheduler.venues = self._venues(participants, bracket.get('venues'))
+            scheduler.restart()
+            fixtures, _ = plan_knockout([(h['key'], a['key']) for h, a in slots], scheduler, current + 1, division)
+            docs += build_match_docs(competition['club_id'], competition, fixtures, participants)
+
+        update = {'bracket.round': current + 1}
+        if winners:
+            update['bracket.winners'] = [{'division': d, 'name': w} for d, w in winners.items()]
+        if docs:
+            self.db.matches.insert_many(docs, ordered=False)
+        else:
+            update['status'] = 'finished'
+        self.collection.update_one({'_id': competition['_id']}, {'$set': update})
+        return len(docs)
+
+    @staticmethod
+    def _tie_winner(match):
+        score = match.get('score') or {}
+        home, away = score.get('home', 0), score.get('away', 0)
+        if home == away:
+            if match.get('winner_key') not in (match.get('home_key'), match.get('away_key')):
+                raise ValueError(f"Drawn tie {match['_id']} needs a winner_key")
+            home_wins = match['winner_key'] == match['home_key']
+        else:
+            home_wins = home > away
+        side = 'home' if home_wins else 'away'
+        key = match[f'{side}_key']
+        # Own teams are keyed by their team id, external ones by participant_key()
+        team_id = ObjectId(key) if ObjectId.is_valid(key) else None
+        return {'key': key, 'name': match[f'{side}_name'], 'team_id': team_id}
+
     # ── Excel helpers ─────────────────────────────────────
 
     def export_excel(self, club_id):
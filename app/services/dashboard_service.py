@@ -0,0 +1,117 @@
+# FootLogic V2 - Coach Dashboard Service (composite builder)
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from app.services.dates import parse_date
+from app.services.event_service import EventService
+from app.services.match_service import MatchService
+from app.services.notification_service import NotificationService
+from app.services.player_service import PlayerService
+
+# Shared by all requests of the worker; bounds the extra DB load per dashboard
+_executor = ThreadPoolExecutor(max_workers=6, thread_name_prefix='dashboard')
+
+# Fetched once and shared: the alerts use the next 7 days of these lists,
+# the dashboard sections show the first few
+UPCOMING_MATCHES = 10
+UPCOMING_EVENTS = 15
+RECENT_MATCHES = 5
+
+
+def server_timing(timings):
+    """Server-Timing header value for the per-section timings (milliseconds)."""
+    return ', '.join(f'{name};dur={ms}' for name, ms in timings.items())
+
+
+def _timed(timings, name, fn):
+    started = time.perf_counter()
+    try:
+        return fn()
+    finally:
+        timings[name] = round((time.perf_counter() - started) * 1000, 1)
+
+
+def _outcome(match):
+    """'win' | 'draw' | 'loss' from our side of a completed match."""
+    score = match.get('score', {})
+    home, away = score.get('home', 0), score.get('away', 0)
+    ours, theirs = (home, away) if match.get('is_home') else (away, home)
+    return 'win' if ours > theirs else 'draw' if ours == theirs else 'loss'
+
+
+class CoachDashboardService:
+    """Coach dashboard data, built from independent queries run concurrently.
+
+    Sections that only depend on the club/team (roster, upcoming and recent
+    matches, upcoming events, season stats) run on a shared bounded pool;
+    alerts, activity feed and injured players are then derived from those
+    results instead of being queried again. Each section's duration (ms) is
+    returned under 'timings'.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.players = PlayerService(db)
+        self.events = EventService(db)
+        self.matches = MatchService(db)
+
+    def build(self, club_id, team_id=None, top_scorers=False):
+        """Dashboard payload for a club, optionally scoped to one team."""
+        started = time.perf_counter()
+        timings = {}
+        now = datetime.utcnow()
+
+        jobs = {
+            'players': lambda: self.players.get_by_club(club_id, team_id=team_id),
+            'upcoming_matches': lambda: self.matches.get_in_range(
+                club_id, now, None, team_id=team_id, status='scheduled', limit=UPCOMING_MATCHES),
+            'upcoming_events': lambda: self.events.get_upcoming(club_id, team_id=team_id, limit=UPCOMING_EVENTS),
+            'recent_matches': lambda: self.matches.get_completed(club_id, team_id=team_id, limit=RECENT_MATCHES),
+            'season_stats': lambda: self.matches.get_season_stats(club_id, team_id=team_id),
+        }
+        if top_scorers:
+            jobs['top_scorers'] = lambda: self.players.get_top_scorers(club_id, limit=5)
+        futures = {name: _executor.submit(_timed, timings, name, job) for name, job in jobs.items()}
+        data = {name: future.result() for name, future in futures.items()}
+
+        data['alerts'] = _timed(timings, 'alerts', lambda: NotificationService.build_dashboard_alerts(
+            data['upcoming_matches'], data['upcoming_events'], now))
+        data['activity_feed'] = self._activity_feed(data['recent_matches'], data['upcoming_events'])
+        data['injured_players'] = [p for p in data['players'] if p.get('status') == 'injured']
+
+        timings['total'] = round((time.perf_counter() - started) * 1000, 1)
+        data['timings'] = timings
+        return data
+
+    @staticmethod
+    def _activity_feed(recent_matches, upcoming_events):
+        """Recent results and next events, most recent first."""
+        colors = {'win': 'green', 'draw': 'amber', 'loss': 'red'}
+        labels = {'win': 'Victoire', 'draw': 'Match nul', 'loss': 'Défaite'}
+        feed = []
+        for m in recent_matches[:5]:
+            score = m.get('score', {})
+            outcome = _outcome(m)
+            feed.append({
+                'type': 'match_result',
+                'icon': 'fa-futbol',
+                'color': colors[outcome],
+                'title': f"{score.get('home', 0)} - {score.get('away', 0)} vs {m.get('opponent', 'Adversaire')}",
+                'subtitle': labels[outcome],
+                'date': m.get('date'),
+                'link': f"/coach/match-center/{m['_id']}"
+            })
+        for e in upcoming_events[:3]:
+            feed.append({
+                'type': 'event',
+                'icon': 'fa-calendar-plus' if e.get('event_type') == 'training' else 'fa-flag',
+                'color': 'primary',
+                'title': e.get('title', 'Événement'),
+                'subtitle': e.get('event_type', 'event').capitalize(),
+                'date': e.get('date'),
+                'link': f"/coach/attendance/{e['_id']}"
+            })
+        # parse_date: legacy rows may still hold string dates
+        feed.sort(key=lambda x: parse_date(x.get('date')) or datetime.min, reverse=True)
+        return feed[:8]
@@ -0,0 +1,130 @@
+# FootLogic V2 - Date helpers (BSON-native date storage and range filters)
+
+from datetime import datetime, date, timedelta
+from zoneinfo import ZoneInfo
+
+# Stored dates are naive wall-clock times of the clubs' timezone, as entered
+# in the forms; aware inputs are converted to it before the tzinfo is dropped
+LOCAL_TIMEZONE = 'Europe/Paris'
+_LOCAL_TZ = ZoneInfo(LOCAL_TIMEZONE)
+
+# Date fields that must be stored as BSON dates, per collection
+# (used by scripts/migrate_dates.py and by the write paths of each service)
+DATE_FIELDS = {
+    'events': ['date'],
+    'matches': ['date'],
+    'training_sessions': ['date'],
+    'training_plans': ['start_date', 'end_date'],
+    'injuries': ['injury_date', 'expected_return', 'actual_return', 'cleared_date'],
+    'competitions': ['start_date', 'end_date'],
+    'clubs': ['last_activity'],
+}
+
+_STRING_FORMATS = ('%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y', '%Y-%m-%d %H:%M', '%d/%m/%Y %H:%M')
+
+
+def parse_date(value):
+    """Coerce a datetime/date/ISO string to a naive local (LOCAL_TIMEZONE) datetime.
+
+    Naive inputs are taken as local already. Returns None if unparseable.
+    """
+    if value is None or value == '':
+        return None
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(_LOCAL_TZ).replace(tzinfo=None)
+        return value
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    if not isinstance(value, str):
+        return None
+
+    text = value.strip()
+    try:
+        return parse_date(datetime.fromisoformat(text.replace('Z', '+00:00')))
+    except ValueError:
+        pass
+    for fmt in _STRING_FORMATS:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def date_range(start=None, end=None):
+    """Build an indexable half-open range filter {'$gte': start, '$lt': end}.
+
+    Bounds may be datetimes or strings; unparseable or missing bounds are
+    dropped. Returns None when neither bound is usable.
+    """
+    bounds = {}
+    start, end = parse_date(start), parse_date(end)
+    if start:
+        bounds['$gte'] = start
+    if end:
+        bounds['$lt'] = end
+    return bounds or None
+
+
+def window(days, start=None):
+    """(start, start + days) — e.g. window(7) for "the next seven days"."""
+    start = parse_date(start) or datetime.utcnow()
+    return start, start + timedelta(days=days)
+
+
+def month_bounds(year, month):
+    """First instant of the month and first instant of the next one."""
+    start = datetime(year, month, 1)
+    end = datetime(year + (month // 12), month % 12 + 1, 1)
+    return start, end
+
+
+def months_around(before, after, today=None):
+    """Window from the first day of `before` months ago to the end of `after` months ahead."""
+    today = parse_date(today) or datetime.utcnow()
+    index = today.year * 12 + today.month - 1
+    first, last = index - before, index + after
+    start, _ = month_bounds(first // 12, first % 12 + 1)
+    _, end = month_bounds(last // 12, last % 12 + 1)
+    return start, end
+
+
+SEASON_START_MONTH = 7
+
+
+def season_label(value=None):
+    """Season containing a date, as 'YYYY-YYYY' (seasons start on 1 July)."""
+    value = parse_date(value) or datetime.utcnow()
+    year = value.year if value.month >= SEASON_START_MONTH else value.year - 1
+    return f'{year}-{year + 1}'
+
+
+def season_bounds(label):
+    """(start, end) of a 'YYYY-YYYY' (or 'YYYY') season label. Returns None if invalid."""
+    try:
+        year = int(str(label).strip().split('-')[0])
+    except ValueError:
+        return None
+    return datetime(year, SEASON_START_MONTH, 1), datetime(year + 1, SEASON_START_MONTH, 1)
+
+
+def iso(value):
+    """ISO string for datetimes, passthrough for anything else (legacy string rows)."""
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+# Compound indexes backing club/team calendar and analytics range scans
+DATE_INDEXES = {
+    'events': [[('club_id', 1), ('date', 1)], [('team_id', 1), ('date', 1)]],
+    'matches': [[('club_id', 1), ('date', 1)], [('team_id', 1), ('date', 1)]],
+    'training_sessions': [[('club_id', 1), ('date', 1)], [('team_id', 1), ('date', 1)]],
+    'competitions': [[('club_id', 1), ('start_date', 1)]],
+    'clubs': [[('last_activity', 1)]],
+}
+
+
+def ensure_date_indexes(db):
+    for collection_name, indexes in DATE_INDEXES.items():
+        for keys in indexes:
+            db[collection_name].create_index(keys)
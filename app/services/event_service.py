@@ -2,6 +2,10 @@
 
 from bson import ObjectId
 from datetime import datetime
+from app.services.attendance_service import AttendanceService, SOURCE_EVENT
+from app.services.dates import parse_date, date_range
+from app.services.ics_service import IcsFeedService
+from app.services.recurrence_service import RecurrenceService, SOURCE_EVENT as SERIES_EVENT, parse_occurrence_id
 
 class EventService:
     """Service for event-related operations"""
@@ -9,13 +13,19 @@ class EventService:
     def __init__(self, db):
         self.db = db
         self.collection = db.events
+        self.attendance = AttendanceService(db)
+        self.recurrences = RecurrenceService(db)
 
     def get_all(self):
         """Get all events sorted by date"""
         return list(self.collection.find().sort('date', -1))
 
     def get_by_id(self, event_id):
-        """Get event by ID"""
+        """Get event by ID (occurrence ids of a recurring event included)"""
+        if parse_occurrence_id(event_id):
+            return self.recurrences.get_occurrence(event_id)
+        if not ObjectId.is_valid(str(event_id)):
+            return None
         return self.collection.find_one({'_id': ObjectId(event_id)})
 
     def get_by_club(self, club_id):
@@ -23,11 +33,28 @@ class EventService:
         return list(self.collection.find({'club_id': ObjectId(club_id)}).sort('date', -1))
 
     def get_upcoming(self, club_id, team_id=None, limit=10):
-        """Get upcoming events, optionally filtered by team"""
+        """Get upcoming events (recurring occurrences included), optionally filtered by team"""
+        now = datetime.utcnow()
         query = {
             'club_id': ObjectId(club_id),
-            'date': {'$gte': datetime.utcnow()}
+            'date': {'$gte': now}
         }
+        if team_id:
+            query['team_id'] = ObjectId(team_id)
+        events = list(self.collection.find(query).sort('date', 1).limit(limit))
+        occurrences = self.recurrences.expand(
+            SERIES_EVENT, club_id, now, team_ids=[team_id] if team_id else None, limit=limit
+        )
+        if not occurrences:
+            return events
+        return sorted(events + occurrences, key=lambda e: e['date'])[:limit]
+
+    def get_in_range(self, club_id, start=None, end=None, team_id=None, limit=0):
+        """Events whose date falls in [start, end), sorted by date (uses the club/date index)"""
+        query = {'club_id': ObjectId(club_id)}
+        bounds = date_range(start, end)
+        if bounds:
+            query['date'] = bounds
         if team_id:
             query['team_id'] = ObjectId(team_id)
         return list(self.collection.find(query).sort('date', 1).limit(limit))
@@ -48,11 +75,27 @@ class EventService:
 
     def create(self, club_id, title, event_type, date, **kwargs):
         """Create a new event"""
-        event = {
+        event = self._build(club_id, title, event_type, date, **kwargs)
+        result = self.collection.insert_one(event)
+        event['_id'] = result.inserted_id
+        self._on_change(event)
+        return event
+
+    def create_recurring(self, club_id, title, event_type, date, interval=1, until=None, count=None,
+                         exdates=None, **kwargs):
+        """Create a weekly (interval=1) or biweekly (interval=2) series stored once.
+
+        Occurrences are expanded on read and materialized on first attendance.
+        """
+        template = self._build(club_id, title, event_type, date, **kwargs)
+        return self.recurrences.create(SERIES_EVENT, template, date, interval, until, count, exdates)
+
+    def _build(self, club_id, title, event_type, date, **kwargs):
+        return {
             'club_id': ObjectId(club_id),
             'title': title,
             'type': event_type,
-            'date': datetime.fromisoformat(date) if isinstance(date, str) else date,
+            'date': parse_date(date) or date,
             'location': kwargs.get('location', ''),
             'description': kwargs.get('description', ''),
             'category': kwargs.get('category', ''),
@@ -64,9 +107,6 @@ class EventService:
             'created_by': ObjectId(kwargs['created_by']) if kwargs.get('created_by') else None,
             'created_at': datetime.utcnow()
         }
-        result = self.collection.insert_one(event)
-        event['_id'] = result.inserted_id
-        return event
 
     def update(self, event_id, data):
         """Update event data"""
@@ -83,32 +123,63 @@ class EventService:
                     
         # Convert date string to datetime object
         if 'date' in update_data and isinstance(update_data['date'], str):
-            try:
-                # Handle ISO format from frontend (e.g., 2023-10-27T10:00)
-                update_data['date'] = datetime.fromisoformat(update_data['date'].replace('Z', ''))
-            except ValueError:
-                pass
+            # Handle ISO format from frontend (e.g., 2023-10-27T10:00)
+            update_data['date'] = parse_date(update_data['date']) or update_data['date']
 
-        return self.collection.update_one(
-            {'_id': ObjectId(event_id)},
-            {'$set': update_data}
+        # Editing one occurrence of a series stores it, then edits the stored copy
+        event_id = self.recurrences.materialize(event_id)
+        if not event_id:
+            return None
+        before = self.collection.find_one_and_update(
+            {'_id': event_id},
+            {'$set': update_data},
+            projection={'club_id': 1, 'team_id': 1}
         )
+        if before:
+            self._on_change(before)
+            if 'team_id' in update_data:
+                self._on_change({**before, 'team_id': update_data['team_id']})
+        return before
 
     def set_attendance(self, event_id, player_id, status):
         """Set attendance status for a player"""
-        return self.collection.update_one(
-            {'_id': ObjectId(event_id)},
-            {'$set': {f'attendance.{str(player_id)}': status}}
-        )
+        return self.bulk_attendance(event_id, [{'player_id': player_id, 'status': status}])
+
+    def update_attendance(self, event_id, player_id, status, reason=''):
+        """Set attendance status with a reason (e.g. absence reported by a parent)"""
+        return self.bulk_attendance(event_id, [{'player_id': player_id, 'status': status, 'reason': reason}])
 
     def set_bulk_attendance(self, event_id, attendance_map):
         """Set attendance status for multiple players at once"""
-        updates = {f'attendance.{str(pid)}': status for pid, status in attendance_map.items()}
+        return self.bulk_attendance(
+            event_id, [{'player_id': pid, 'status': status} for pid, status in attendance_map.items()]
+        )
+
+    def bulk_attendance(self, event_id, records):
+        """Apply attendance records in one event write plus one bulk_write.
+
+        records = [{player_id, status, reason?}]
+        The embedded map is updated with dotted $set keys (idempotent, no
+        read-modify-write) and the attendance collection with upserts.
+        Returns counts from the attendance store, or None if nothing applies.
+        """
+        records = [r for r in records if r.get('player_id')]
+        updates = {f'attendance.{str(r["player_id"])}': r['status'] for r in records}
         if not updates:
             return None
-        return self.collection.update_one(
-            {'_id': ObjectId(event_id)},
-            {'$set': updates}
+        # Occurrences of a recurring series are stored on first attendance
+        event_id = self.recurrences.materialize(event_id)
+        if not event_id:
+            return None
+        event = self.collection.find_one_and_update(
+            {'_id': event_id},
+            {'$set': updates},
+            projection={'club_id': 1, 'team_id': 1, 'date': 1}
+        )
+        if not event:
+            return None
+        return self.attendance.bulk_upsert(
+            SOURCE_EVENT, event_id, records, context=AttendanceService.context_from(event)
         )
 
     def get_attendance(self, event_id):
@@ -153,14 +224,38 @@ class EventService:
 
     def set_match_status(self, event_id, status):
         """Set match status (live, finished, etc)"""
-        return self.collection.update_one(
+        event = self.collection.find_one_and_update(
             {'_id': ObjectId(event_id)},
-            {'$set': {'status': status}}
+            {'$set': {'status': status}},
+            projection={'club_id': 1, 'team_id': 1}
         )
+        if event:
+            self._on_change(event)
+        return event
 
     def delete(self, event_id):
-        """Delete an event"""
-        return self.collection.delete_one({'_id': ObjectId(event_id)})
+        """Delete an event; for an occurrence of a series, cancel that date"""
+        parsed = parse_occurrence_id(event_id)
+        if parsed:
+            if not self.recurrences.get_occurrence(event_id):
+                return None
+            series_id, date = parsed
+            stored = self.collection.find_one({'series_id': series_id, 'occurrence_date': date}, {'_id': 1})
+            if stored:
+                self.attendance.delete_for(SOURCE_EVENT, stored['_id'])
+                self.collection.delete_one({'_id': stored['_id']})
+            return self.recurrences.add_exception(series_id, date)
+        if not ObjectId.is_valid(str(event_id)):
+            return None
+        self.attendance.delete_for(SOURCE_EVENT, event_id)
+        event = self.collection.find_one_and_delete({'_id': ObjectId(event_id)}, projection={'club_id': 1, 'team_id': 1})
+        if event:
+            self._on_change(event)
+        return event
+
+    def _on_change(self, event):
+        """Invalidate the ICS feeds showing this event."""
+        IcsFeedService(self.db).invalidate(event.get('club_id'), event.get('team_id'))
 
     def add_attendee(self, event_id, player_id):
         """Alias for set_attendance with 'present' status"""
@@ -1,65 +1,212 @@
+import logging
 from datetime import datetime
 from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError, OperationFailure
+from app.services.feed_service import FeedService
+
+logger = logging.getLogger(__name__)
+
+# Top-level comments per page, and replies shown under each of them
+COMMENTS_PAGE = 20
+REPLIES_PREVIEW = 3
+MAX_PAGE = 100
+
+# Reaction types a post accepts; each one is a counter key (reaction_counts.<type>)
+REACTION_TYPES = ('like', 'love', 'fire', 'clap', 'laugh', 'wow')
 
 
 class FanEngagementService:
+    """Comments, reactions, polls and media for the fan feed.
+
+    Posts carry denormalized counters (`reaction_counts.<type>`, `likes`
+    for the 'like' type, and `comment_count`) so the feed can show them
+    without querying reactions or comments. A counter only moves when the
+    matching reaction/comment document was actually inserted or deleted;
+    the unique (post, user, type) index on reactions makes repeated or
+    concurrent requests harmless.
+
+    Comments are threaded through `parent_comment_id` and paged by `_id`;
+    each parent keeps a `reply_count`. Poll votes live in `poll_votes`
+    (unique per poll and user) while the poll keeps only the tallies.
+    """
+
+    _indexed = set()
+
     def __init__(self, db):
         self.db = db
+        # Author names resolved during this request (the service is built per request)
+        self._authors = {}
+        if db.name not in FanEngagementService._indexed:
+            try:
+                db.reactions.create_index([('post_id', 1), ('user_id', 1), ('type', 1)], unique=True)
+            except OperationFailure as exc:
+                # Legacy duplicate reactions: serve anyway, scripts/recount_post_counters.py
+                # removes them and builds the index
+                logger.warning('Unique reactions index not created: %s', exc)
+            db.comments.create_index([('post_id', 1), ('parent_comment_id', 1), ('_id', 1)])
+            db.comments.create_index([('parent_comment_id', 1), ('_id', 1)])
+            db.poll_votes.create_index([('poll_id', 1), ('user_id', 1)], unique=True)
+            FanEngagementService._indexed.add(db.name)
 
     # ---- Comments ----
 
-    def get_comments(self, post_id):
-        comments = list(self.db.comments.find({'post_id': ObjectId(post_id)}).sort('created_at', 1))
+    def get_comments(self, post_id, cursor=None, limit=COMMENTS_PAGE, replies=REPLIES_PREVIEW):
+        """A page of top-level comments, oldest first, each with its first replies.
+
+        Returns (comments, next_cursor); pass next_cursor back to get the
+        following page (None on the last one).
+        """
+        comments, next_cursor = self._page(
+            {'post_id': ObjectId(post_id), 'parent_comment_id': None}, cursor, limit)
+        previews = self._first_replies([c['_id'] for c in comments], replies) if replies else {}
+        for c in comments:
+            c['replies'] = previews.get(c['_id'], [])
+            c.setdefault('reply_count', 0)
+        self._add_authors(comments + [r for c in comments for r in c['replies']])
+        return comments, next_cursor
+
+    def get_replies(self, comment_id, cursor=None, limit=COMMENTS_PAGE):
+        """A page of replies to one comment, oldest first. Returns (replies, next_cursor)."""
+        replies, next_cursor = self._page({'parent_comment_id': ObjectId(comment_id)}, cursor, limit)
+        self._add_authors(replies)
+        return replies, next_cursor
+
+    def _page(self, query, cursor, limit):
+        limit = max(1, min(int(limit), MAX_PAGE))
+        if cursor:
+            query = {**query, '_id': {'$gt': ObjectId(cursor)}}
+        docs = list(self.db.comments.find(query).sort('_id', 1).limit(limit + 1))
+        if len(docs) > limit:
+            return docs[:limit], str(docs[limit - 1]['_id'])
+        return docs, None
+
+    def _first_replies(self, comment_ids, n):
+        """{comment_id: first n replies} for a page of comments, in one aggregation.
+
+        Each parent's replies come from a $lookup that walks the
+        (parent_comment_id, _id) index and stops after n, so a thread with
+        thousands of replies costs the same as one with n.
+        """
+        if not comment_ids:
+            return {}
+        return {g['_id']: g['replies'] for g in self.db.comments.aggregate([
+            {'$match': {'_id': {'$in': comment_ids}}},
+            {'$project': {'_id': 1}},
+            {'$lookup': {
+                'from': 'comments',
+                'let': {'parent': '$_id'},
+                'pipeline': [
+                    {'$match': {'$expr': {'$eq': ['$parent_comment_id', '$$parent']}}},
+                    {'$sort': {'_id': 1}},
+                    {'$limit': int(n)},
+                ],
+                'as': 'replies',
+            }},
+        ])}
+
+    def _add_authors(self, comments):
+        """Set author_name on comments, loading unknown authors with one $in query."""
+        missing = {c['author_id'] for c in comments if c.get('author_id') and c['author_id'] not in self._authors}
+        if missing:
+            for user in self.db.users.find({'_id': {'$in': list(missing)}}, {'profile': 1}):
+                profile = user.get('profile') or {}
+                self._authors[user['_id']] = f"{profile.get('first_name', '')} {profile.get('last_name', '')}"
+            self._authors.update({a: '' for a in missing if a not in self._authors})
         for c in comments:
-            c['_id'] = str(c['_id'])
-            c['post_id'] = str(c['post_id'])
-            c['author_id'] = str(c['author_id'])
-            if c.get('parent_comment_id'):
-                c['parent_comment_id'] = str(c['parent_comment_id'])
-            user = self.db.users.find_one({'_id': ObjectId(c['author_id'])}, {'profile': 1})
-            c['author_name'] = ''
-            if user and user.get('profile'):
-                c['author_name'] = f"{user['profile'].get('first_name', '')} {user['profile'].get('last_name', '')}"
-        return comments
+            c['author_name'] = self._authors.get(c.get('author_id'), '')
 
     def create_comment(self, post_id, author_id, content, parent_comment_id=None):
+        """Add a comment (or a reply) and bump the post's and parent's counters.
+
+        Raises ValueError if the parent is not a comment of the same post.
+        """
         doc = {
             'post_id': ObjectId(post_id),
             'author_id': ObjectId(author_id),
             'content': content,
-            'parent_comment_id': ObjectId(parent_comment_id) if parent_comment_id else None,
+            'parent_comment_id': None,
             'likes': 0,
             'created_at': datetime.utcnow(),
         }
+        if parent_comment_id:
+            if not ObjectId.is_valid(parent_comment_id) or not self.db.comments.find_one(
+                    {'_id': ObjectId(parent_comment_id), 'post_id': doc['post_id']}, {'_id': 1}):
+                raise ValueError('Parent comment not found in this post')
+            doc['parent_comment_id'] = ObjectId(parent_comment_id)
         result = self.db.comments.insert_one(doc)
+        self.db.posts.update_one({'_id': doc['post_id']}, {'$inc': {'comment_count': 1}})
+        FeedService(self.db).bump('post', doc['post_id'], {'comment_count': 1})
+        if doc['parent_comment_id']:
+            self.db.comments.update_one({'_id': doc['parent_comment_id']}, {'$inc': {'reply_count': 1}})
         return str(result.inserted_id)
 
     # ---- Reactions ----
 
     def toggle_reaction(self, post_id, user_id, reaction_type='like'):
-        existing = self.db.reactions.find_one({
-            'post_id': ObjectId(post_id),
-            'user_id': ObjectId(user_id),
-            'type': reaction_type,
-        })
-        if existing:
-            self.db.reactions.delete_one({'_id': existing['_id']})
-            return {'action': 'removed'}
-        self.db.reactions.insert_one({
-            'post_id': ObjectId(post_id),
-            'user_id': ObjectId(user_id),
-            'type': reaction_type,
-            'created_at': datetime.utcnow(),
-        })
-        return {'action': 'added'}
+        """Add the user's reaction, or remove it if it is already there."""
+        if self.set_reaction(post_id, user_id, reaction_type, True):
+            return {'action': 'added'}
+        self.set_reaction(post_id, user_id, reaction_type, False)
+        return {'action': 'removed'}
+
+    def set_reaction(self, post_id, user_id, reaction_type='like', active=True):
+        """Make the user's reaction present (or absent). Returns True if anything changed.
+
+        Raises ValueError for a type outside REACTION_TYPES.
+        """
+        if reaction_type not in REACTION_TYPES:
+            raise ValueError('Invalid reaction type')
+        key = {'post_id': ObjectId(post_id), 'user_id': ObjectId(user_id), 'type': reaction_type}
+        if active:
+            try:
+                self.db.reactions.insert_one({**key, 'created_at': datetime.utcnow()})
+            except DuplicateKeyError:
+                return False
+            delta = 1
+        else:
+            if not self.db.reactions.delete_one(key).deleted_count:
+                return False
+            delta = -1
+        inc = {f'reaction_counts.{reaction_type}': delta}
+        if reaction_type == 'like':
+            inc['likes'] = delta
+        self.db.posts.update_one({'_id': key['post_id']}, {'$inc': inc})
+        FeedService(self.db).bump('post', key['post_id'], inc)
+        return True
 
     def get_reactions_count(self, post_id):
-        pipeline = [
-            {'$match': {'post_id': ObjectId(post_id)}},
+        """{type: count} of a post, read from its counters."""
+        post = self.db.posts.find_one({'_id': ObjectId(post_id)}, {'reaction_counts': 1})
+        counts = (post or {}).get('reaction_counts') or {}
+        return {t: n for t, n in counts.items() if n > 0}
+
+    def recount(self, post_id):
+        """Recompute a post's counters, and its comments' reply counts, from its
+        reactions and comments (repair tool)."""
+        post_oid = ObjectId(post_id)
+        counts = {r['_id']: r['count'] for r in self.db.reactions.aggregate([
+            {'$match': {'post_id': post_oid}},
             {'$group': {'_id': '$type', 'count': {'$sum': 1}}}
-        ]
-        result = {r['_id']: r['count'] for r in self.db.reactions.aggregate(pipeline)}
-        return result
+        ])}
+        counters = {
+            'reaction_counts': counts,
+            'likes': counts.get('like', 0),
+            'comment_count': self.db.comments.count_documents({'post_id': post_oid}),
+        }
+        self.db.posts.update_one({'_id': post_oid}, {'$set': counters})
+        FeedService(self.db).set_data('post', post_oid, counters)
+
+        replies = {r['_id']: r['count'] for r in self.db.comments.aggregate([
+            {'$match': {'post_id': post_oid, 'parent_comment_id': {'$ne': None}}},
+            {'$group': {'_id': '$parent_comment_id', 'count': {'$sum': 1}}}
+        ])}
+        self.db.comments.update_many({'post_id': post_oid, '_id': {'$nin': list(replies)}},
+                                     {'$set': {'reply_count': 0}})
+        if replies:
+            self.db.comments.bulk_write([UpdateOne({'_id': cid}, {'$set': {'reply_count': n}})
+                                         for cid, n in replies.items()], ordered=False)
+        return counts
 
     # ---- Polls ----
 
@@ -68,7 +215,7 @@ class FanEngagementService:
             'club_id': ObjectId(club_id),
             'question': question,
             'options': [{'text': o, 'votes': 0} for o in options],
-            'voters': [],
+            'total_votes': 0,
             'created_at': datetime.utcnow(),
             'expires_at': datetime.utcnow() + __import__('datetime').timedelta(days=expires_days),
         }
@@ -76,26 +223,45 @@ class FanEngagementService:
         return str(result.inserted_id)
 
     def vote_poll(self, poll_id, option_index, user_id):
-        poll = self.db.polls.find_one({'_id': ObjectId(poll_id)})
+        """Record one vote per user (unique poll_votes entry) and bump the tallies."""
+        poll = self.db.polls.find_one({'_id': ObjectId(poll_id)}, {'options.text': 1})
         if not poll:
             return None
-        if str(user_id) in [str(v) for v in poll.get('voters', [])]:
-            return {'error': 'Déjà voté'}
         if option_index < 0 or option_index >= len(poll.get('options', [])):
             return {'error': 'Option invalide'}
+        try:
+            self.db.poll_votes.insert_one({
+                'poll_id': poll['_id'],
+                'user_id': ObjectId(user_id),
+                'option_index': option_index,
+                'created_at': datetime.utcnow(),
+            })
+        except DuplicateKeyError:
+            return {'error': 'Déjà voté'}
         self.db.polls.update_one(
-            {'_id': ObjectId(poll_id)},
-            {
-                '$inc': {f'options.{option_index}.votes': 1},
-                '$push': {'voters': ObjectId(user_id)}
-            }
+            {'_id': poll['_id']},
+            {'$inc': {f'options.{option_index}.votes': 1, 'total_votes': 1}}
         )
         return {'success': True}
 
-    def get_polls(self, club_id, limit=10):
-        polls = list(self.db.polls.find({'club_id': ObjectId(club_id)}).sort('created_at', -1).limit(limit))
+    def get_vote(self, poll_id, user_id):
+        """Option index the user voted for, or None."""
+        vote = self.db.poll_votes.find_one(
+            {'poll_id': ObjectId(poll_id), 'user_id': ObjectId(user_id)}, {'option_index': 1})
+        return vote['option_index'] if vote else None
+
+    def get_polls(self, club_id, limit=10, user_id=None):
+        """Latest polls with their tallies; `voted`/`my_vote` are set for user_id."""
+        polls = list(self.db.polls.find({'club_id': ObjectId(club_id)}, {'voters': 0})
+                     .sort('created_at', -1).limit(limit))
+        votes = {}
+        if user_id and polls:
+            votes = {v['poll_id']: v.get('option_index') for v in self.db.poll_votes.find(
+                {'poll_id': {'$in': [p['_id'] for p in polls]}, 'user_id': ObjectId(user_id)},
+                {'poll_id': 1, 'option_index': 1}
+            )}
         for p in polls:
-            p['_id'] = str(p['_id'])
-            p['club_id'] = str(p['club_id'])
-            p['voters'] = [str(v) for v in p.get('voters', [])]
+            p.setdefault('total_votes', sum(o.get('votes', 0) for o in p.get('options', [])))
+            p['voted'] = p['_id'] in votes
+            p['my_vote'] = votes.get(p['_id'])
         return polls
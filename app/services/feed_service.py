@@ -0,0 +1,237 @@
+# FootLogic V2 - Feed Service (materialized club and team timelines)
+
+from datetime import datetime
+from bson import ObjectId
+from pymongo import UpdateOne
+
+# Entries kept per timeline; older ones are trimmed on write
+FEED_CAP = 300
+
+FEED_PAGE = 20
+MAX_PAGE = 100
+
+EXCERPT_LENGTH = 280
+
+KINDS = ('post', 'match', 'announcement', 'media')
+
+# Roles that may read the timeline of any team of their club
+STAFF_ROLES = ('admin', 'coach', 'superadmin')
+
+
+def _excerpt(text):
+    text = (text or '').strip()
+    return text if len(text) <= EXCERPT_LENGTH else text[:EXCERPT_LENGTH].rstrip() + '…'
+
+
+def _key(date, source_id):
+    """Sort key of an entry: its publication time, made unique by the source id."""
+    if not isinstance(date, datetime):
+        date = datetime.utcnow()
+    return ObjectId(ObjectId.from_datetime(date).binary[:4] + ObjectId(source_id).binary[4:])
+
+
+class FeedService:
+    """Materialized news feed: one capped timeline per club and per team.
+
+    Posts, match results, announcements and media are fanned out on write.
+    Publishing a source upserts one entry per timeline that shows it (the
+    club's, plus its team's for team items or every team's for club-wide
+    items; team announcements only reach their team's timeline) holding
+    everything the feed displays, post counters included (FanEngagementService
+    keeps them in step through bump()). Entries are ordered by `key`, an
+    ObjectId built from the publication time, so a feed page is a single
+    range read on the (timeline, key) index. Each timeline keeps its latest
+    FEED_CAP entries; rebuild() recreates a club's timelines from the source
+    collections. Team timelines are readable by club staff and team members
+    only (can_read_team()).
+    """
+
+    _indexed = set()
+
+    def __init__(self, db):
+        self.db = db
+        self.collection = db.feed
+        if db.name not in FeedService._indexed:
+            self.collection.create_index([('timeline', 1), ('key', -1)])
+            self.collection.create_index([('ref', 1), ('timeline', 1)], unique=True)
+            FeedService._indexed.add(db.name)
+
+    @staticmethod
+    def _timeline(scope, scope_id):
+        return f'{scope}:{scope_id}'
+
+    # ---- Reads ----
+
+    def get_timeline(self, club_id, team_id=None, since=None, cursor=None, limit=FEED_PAGE, kinds=None):
+        """A page of the club's (or one of its teams') timeline, newest first.
+
+        `cursor` (a previous next_cursor) pages towards older entries;
+        `since` (the newest key a client has) only returns entries added
+        after it. Returns (entries, next_cursor).
+        """
+        limit = max(1, min(int(limit), MAX_PAGE))
+        query = {
+            'timeline': self._timeline('team', team_id) if team_id else self._timeline('club', club_id),
+            'club_id': ObjectId(club_id),
+        }
+        key = {}
+        if cursor:
+            key['$lt'] = ObjectId(cursor)
+        if since:
+            key['$gt'] = ObjectId(since)
+        if key:
+            query['key'] = key
+        if kinds:
+            query['kind'] = {'$in': list(kinds)}
+        entries = list(self.collection.find(query, {'timeline': 0, 'ref': 0}).sort('key', -1).limit(limit + 1))
+        if len(entries) > limit:
+            return entries[:limit], str(entries[limit - 1]['key'])
+        return entries, None
+
+    def can_read_team(self, user, team_id):
+        """Whether a JWT payload may read a team's timeline: club staff, or a
+        player of the team (directly or through a parent link)."""
+        team = self.db.teams.find_one({'_id': ObjectId(team_id)}, {'club_id': 1})
+        if not team or str(team.get('club_id')) != str(user.get('club_id')):
+            return False
+        if user.get('role') in STAFF_ROLES:
+            return True
+        if not ObjectId.is_valid(user.get('user_id') or ''):
+            return False
+        user_id = ObjectId(user['user_id'])
+        if self.db.users.count_documents({'_id': user_id, 'team_id': team['_id']}, limit=1):
+            return True
+        player_ids = [link['player_id'] for link in self.db.parent_links.find(
+            {'parent_id': user_id, 'status': 'active'}, {'player_id': 1})]
+        return bool(self.db.players.count_documents(
+            {'team_id': team['_id'], '$or': [{'user_id': user_id}, {'_id': {'$in': player_ids}}]}, limit=1))
+
+    # ---- Writes ----
+
+    def _timelines(self, club_id, team_id, club_wide=True):
+        if team_id:
+            team = [self._timeline('team', team_id)]
+            return [self._timeline('club', club_id)] + team if club_wide else team
+        teams = self.db.teams.find({'club_id': ObjectId(club_id)}, {'_id': 1})
+        return [self._timeline('club', club_id)] + [self._timeline('team', t['_id']) for t in teams]
+
+    def _publish(self, kind, source_id, club_id, team_id, date, data, club_wide=True):
+        """Upsert the entry of a source in every timeline showing it.
+
+        With club_wide=False a team item stays out of the club timeline.
+        """
+        ref = f'{kind}:{source_id}'
+        timelines = self._timelines(club_id, team_id, club_wide)
+        fields = {
+            'kind': kind,
+            'source_id': ObjectId(source_id),
+            'club_id': ObjectId(club_id),
+            'team_id': ObjectId(team_id) if team_id else None,
+            'key': _key(date, source_id),
+            'date': date,
+            'data': data,
+        }
+        self.collection.bulk_write(
+            [UpdateOne({'ref': ref, 'timeline': t}, {'$set': fields}, upsert=True) for t in timelines],
+            ordered=False,
+        )
+        # The source may have moved to another team
+        self.collection.delete_many({'ref': ref, 'timeline': {'$nin': timelines}})
+        for timeline in timelines:
+            self._trim(timeline)
+
+    def _trim(self, timeline):
+        beyond = list(self.collection.find({'timeline': timeline}, {'key': 1})
+                      .sort('key', -1).skip(FEED_CAP).limit(1))
+        if beyond:
+            self.collection.delete_many({'timeline': timeline, 'key': {'$lte': beyond[0]['key']}})
+
+    def remove(self, kind, source_id):
+        """Drop a source from every timeline."""
+        self.collection.delete_many({'ref': f'{kind}:{source_id}'})
+
+    def bump(self, kind, source_id, inc):
+        """Apply counter increments ({field: delta}) to the entries of a source."""
+        self.collection.update_many(
+            {'ref': f'{kind}:{source_id}'},
+            {'$inc': {f'data.{field}': delta for field, delta in inc.items()}},
+        )
+
+    def set_data(self, kind, source_id, fields):
+        """Overwrite some displayed fields ({field: value}) of the entries of a source."""
+        self.collection.update_many(
+            {'ref': f'{kind}:{source_id}'},
+            {'$set': {f'data.{field}': value for field, value in fields.items()}},
+        )
+
+    def publish_post(self, post):
+        self._publish('post', post['_id'], post['club_id'], post.get('team_id'), post.get('created_at'), {
+            'title': post.get('title', ''),
+            'excerpt': _excerpt(post.get('content')),
+            'image': post.get('image', ''),
+            'category': post.get('category', 'news'),
+            'author_id': post.get('author_id'),
+            'likes': post.get('likes', 0),
+            'reaction_counts': post.get('reaction_counts') or {},
+            'comment_count': post.get('comment_count', 0),
+        })
+
+    def sync_match(self, match, deleted=False):
+        """Show a match once it has a result; remove it otherwise."""
+        if deleted or match.get('status') != 'completed':
+            self.remove('match', match['_id'])
+            return
+        self._publish('match', match['_id'], match['club_id'], match.get('team_id'), match.get('date'), {
+            'opponent': match.get('opponent', ''),
+            'is_home': match.get('is_home', True),
+            'score': match.get('score') or {'home': 0, 'away': 0},
+            'competition': match.get('competition', ''),
+            'location': match.get('location', ''),
+        })
+
+    def publish_announcement(self, announcement):
+        """Club-wide and team announcements; role-targeted ones stay out of the feed.
+
+        Team announcements go to their team's timeline only: the club timeline
+        is readable by every member of the club, fans included.
+        """
+        target_type = announcement.get('target_type', 'all')
+        if target_type == 'team' and ObjectId.is_valid(announcement.get('target_id') or ''):
+            team_id = announcement['target_id']
+        elif target_type == 'all':
+            team_id = None
+        else:
+            return
+        self._publish('announcement', announcement['_id'], announcement['club_id'], team_id,
+                      announcement.get('sent_at'), {
+                          'subject': announcement.get('subject', ''),
+                          'excerpt': _excerpt(announcement.get('body')),
+                          'target_label': announcement.get('target_label', ''),
+                      }, club_wide=team_id is None)
+
+    def publish_media(self, media):
+        self._publish('media', media['_id'], media['club_id'], None, media.get('created_at'), {
+            'title': media.get('title', ''),
+            'media_type': media.get('media_type', 'photo'),
+            'url': media.get('url', ''),
+            'thumbnail_url': media.get('thumbnail_url', ''),
+            'category': media.get('category', ''),
+        })
+
+    def rebuild(self, club_id):
+        """Recreate every timeline of a club from posts, results, announcements and media."""
+        cid = ObjectId(club_id)
+        self.collection.delete_many({'club_id': cid})
+
+        def recent(collection, field, **query):
+            return self.db[collection].find({'club_id': cid, **query}).sort(field, -1).limit(FEED_CAP)
+
+        for post in recent('posts', 'created_at'):
+            self.publish_post(post)
+        for match in recent('matches', 'date', status='completed'):
+            self.sync_match(match)
+        for announcement in recent('announcements', 'sent_at'):
+            self.publish_announcement(announcement)
+        for media in recent('media', 'created_at'):
+            self.publish_media(media)
+        return self.collection.count_documents({'timeline': self._timeline('club', club_id)})
@@ -0,0 +1,204 @@
+# FootLogic V2 - Fixture Generator (round-robin and knockout scheduling)
+#
+# Pure planning functions: no database access, so they can be benchmarked and
+# tested on their own. CompetitionService.generate_fixtures turns the planned
+# fixtures into match documents and inserts them with insert_many.
+
+from datetime import datetime, timedelta
+from app.services.dates import parse_date
+
+BYE = None
+
+
+def round_robin_rounds(participants):
+    """Single round-robin with the circle method (Berger rotation).
+
+    Returns a list of rounds, each a list of (home, away) pairs. With an odd
+    number of participants one of them rests each round. The circle turns by
+    n/2 positions per round and the fixed participant alternates home and
+    away, so within a leg nobody plays more than two home or two away matches
+    in a row.
+    """
+    teams = list(participants)
+    if len(teams) < 2:
+        return []
+    if len(teams) % 2:
+        teams.insert(0, BYE)
+    n = len(teams)
+    fixed, rotating = teams[0], teams[1:]
+    shift = (n // 2) % (n - 1)
+
+    rounds = []
+    for r in range(n - 1):
+        lineup = [fixed] + rotating
+        pairs = []
+        for i in range(n // 2):
+            home, away = lineup[i], lineup[n - 1 - i]
+            if i == 0 and r % 2:
+                home, away = away, home
+            if home is not BYE and away is not BYE:
+                pairs.append((home, away))
+        rounds.append(pairs)
+        rotating = rotating[-shift:] + rotating[:-shift] if shift else rotating
+    return rounds
+
+
+def double_round_robin_rounds(participants):
+    """Both legs: the second half mirrors the first with home and away swapped."""
+    first = round_robin_rounds(participants)
+    return first + [[(away, home) for home, away in pairs] for pairs in first]
+
+
+def knockout_first_round(participants):
+    """First round of a seeded bracket (participants in seed order).
+
+    The bracket is padded to the next power of two and the top seeds receive
+    the byes. Returns one (home, away) slot per first-round tie, in bracket
+    order; `away` is BYE when `home` goes straight through.
+    """
+    teams = list(participants)
+    size = 1
+    while size < len(teams):
+        size *= 2
+    seeds = teams + [BYE] * (size - len(teams))
+    order = _seed_order(size)
+    slots = []
+    for i in range(0, size, 2):
+        home, away = seeds[order[i]], seeds[order[i + 1]]
+        slots.append((away, BYE) if home is BYE else (home, away))
+    return slots
+
+
+def _seed_order(size):
+    """Standard bracket positions (1 v 16, 8 v 9, ...) as 0-based seed indexes."""
+    order = [0]
+    while len(order) < size:
+        length = len(order) * 2
+        order = [x for seed in order for x in (seed, length - 1 - seed)]
+    return order
+
+
+class Scheduler:
+    """Assign dates to planned rounds under blackout and venue constraints.
+
+    Round r is played on start + r * interval_days, pushed by whole intervals
+    past blackout dates. A match is played at its home team's venue; when the
+    venue already hosts a match that day it moves up to `spread_days` later in
+    the week, then falls back to swapping home and away.
+    """
+
+    def __init__(self, start, interval_days=7, kickoff='15:00', venues=None, blackout_dates=None,
+                 spread_days=2):
+        start = parse_date(start) or datetime.utcnow()
+        hour, minute = (int(x) for x in str(kickoff).split(':'))
+        self.start = start.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        self.interval = timedelta(days=interval_days)
+        self.venues = venues or {}
+        self.blackout = {d.date() for d in (parse_date(x) for x in blackout_dates or []) if d}
+        self.spread_days = spread_days
+        self._busy = set()  # (venue, date)
+        self._next_slot = self.start
+
+    def round_date(self):
+        """Date of the next round, skipping blackout dates."""
+        date = self._next_slot
+        while date.date() in self.blackout:
+            date += self.interval
+        self._next_slot = date + self.interval
+        return date
+
+    def place(self, home, away, date):
+        """(home, away, date, venue) for a match, resolving venue clashes."""
+        for h, a in ((home, away), (away, home)):
+            venue = self.venues.get(h)
+            for offset in range(self.spread_days + 1):
+                day = date + timedelta(days=offset)
+                if day.date() in self.blackout:
+                    continue
+                if not venue or (venue, day.date()) not in self._busy:
+                    if venue:
+                        self._busy.add((venue, day.date()))
+                    return h, a, day, venue or ''
+        # Every option clashes: keep the original slot and let the club sort it out
+        return home, away, date, self.venues.get(home, '')
+
+    def restart(self):
+        """Start a new division from the first date; venue bookings are kept."""
+        self._next_slot = self.start
+
+
+def plan_league(participants, scheduler, double=True, division=''):
+    """Planned fixtures [{home, away, date, venue, round, leg, division}] for a league."""
+    rounds = double_round_robin_rounds(participants) if double else round_robin_rounds(participants)
+    half = len(rounds) // 2 if double else len(rounds)
+    fixtures = []
+    for index, pairs in enumerate(rounds):
+        date = scheduler.round_date()
+        for home, away in pairs:
+            home, away, day, venue = scheduler.place(home, away, date)
+            fixtures.append({
+                'home': home, 'away': away, 'date': day, 'venue': venue,
+                'round': index + 1, 'leg': 2 if index >= half else 1, 'division': division,
+            })
+    return fixtures
+
+
+def plan_knockout(slots, scheduler, round_number=1, division=''):
+    """Fixtures for one knockout round; `slots` as returned by knockout_first_round.
+
+    Returns (fixtures, byes) where byes maps slot index -> participant.
+    """
+    date = scheduler.round_date()
+    fixtures, byes = [], {}
+    for slot, (home, away) in enumerate(slots):
+        if away is BYE:
+            byes[slot] = home
+            continue
+        home, away, day, venue = scheduler.place(home, away, date)
+        fixtures.append({
+            'home': home, 'away': away, 'date': day, 'venue': venue,
+            'round': round_number, 'leg': 1, 'slot': slot, 'division': division,
+        })
+    return fixtures, byes
+
+
+def build_match_docs(club_id, competition, fixtures, participants):
+    """Match documents (MatchService.create shape) for planned fixtures.
+
+    `participants` maps key -> {'key', 'name', 'team_id'}. The club's own team
+    decides team_id / is_home / opponent; both sides are kept as home_key /
+    away_key for the standings.
+    """
+    now = datetime.utcnow()
+    docs = []
+    for fixture in fixtures:
+        home, away = participants[fixture['home']], participants[fixture['away']]
+        if home.get('team_id'):
+            team_id, opponent, is_home = home['team_id'], away['name'], True
+        elif away.get('team_id'):
+            team_id, opponent, is_home = away['team_id'], home['name'], False
+        else:
+            team_id, opponent, is_home = None, f"{home['name']} - {away['name']}", True
+        docs.append({
+            'club_id': club_id,
+            'opponent': opponent,
+            'date': fixture['date'],
+            'location': fixture['venue'],
+            'is_home': is_home,
+            'team_id': team_id,
+            'competition': competition.get('name', ''),
+            'competition_id': competition['_id'],
+            'home_key': home['key'], 'home_name': home['name'],
+            'away_key': away['key'], 'away_name': away['name'],
+            'round': fixture['round'],
+            'leg': fixture['leg'],
+            'slot': fixture.get('slot'),
+            'division': fixture['division'],
+            'score': {'home': 0, 'away': 0},
+            'status': 'scheduled',
+            'lineup': [],
+            'events': [],
+            'generated': True,
+            'created_at': now,
+        })
+    return docs
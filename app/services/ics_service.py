@@ -0,0 +1,231 @@
+# FootLogic V2 - iCalendar (ICS) Subscription Feeds
+
+import hashlib
+import secrets
+from datetime import datetime, timedelta
+from bson import ObjectId
+from app.services.calendar_service import CalendarService
+from app.services.dates import LOCAL_TIMEZONE, months_around
+
+SCOPE_USER = 'user'
+SCOPE_TEAM = 'team'
+
+# Rendered bodies are reused until an underlying write invalidates them;
+# the TTL only catches roster changes (a player moving team) for user feeds.
+RENDER_TTL_SECONDS = 6 * 3600
+
+# Default duration when the source has none (minutes)
+DEFAULT_DURATION = {'match': 120, 'event': 120, 'training': 90}
+
+PRODID = '-//FootLogic//Calendar//FR'
+
+# Dates are stored as naive local (club) times, see dates.parse_date
+CALENDAR_TIMEZONE = LOCAL_TIMEZONE
+
+VTIMEZONE = [
+    'BEGIN:VTIMEZONE',
+    f'TZID:{CALENDAR_TIMEZONE}',
+    'BEGIN:DAYLIGHT',
+    'TZOFFSETFROM:+0100',
+    'TZOFFSETTO:+0200',
+    'TZNAME:CEST',
+    'DTSTART:19700329T020000',
+    'RRULE:FREQ=YEARLY;BYMONTH=3;BYDAY=-1SU',
+    'END:DAYLIGHT',
+    'BEGIN:STANDARD',
+    'TZOFFSETFROM:+0200',
+    'TZOFFSETTO:+0100',
+    'TZNAME:CET',
+    'DTSTART:19701025T030000',
+    'RRULE:FREQ=YEARLY;BYMONTH=10;BYDAY=-1SU',
+    'END:STANDARD',
+    'END:VTIMEZONE',
+]
+
+
+def _escape(text):
+    """TEXT value escaping (RFC 5545 §3.3.11)."""
+    return (str(text or '').replace('\\', '\\\\').replace(';', '\\;')
+            .replace(',', '\\,').replace('\r\n', '\\n').replace('\n', '\\n'))
+
+
+def _fold(line):
+    """Fold content lines longer than 75 octets (RFC 5545 §3.1)."""
+    raw = line.encode('utf-8')
+    if len(raw) <= 75:
+        return line
+    parts, current = [], b''
+    for char in line:
+        encoded = char.encode('utf-8')
+        if len(current) + len(encoded) > (75 if not parts else 74):
+            parts.append(current.decode('utf-8'))
+            current = b''
+        current += encoded
+    parts.append(current.decode('utf-8'))
+    return '\r\n '.join(parts)
+
+
+def _stamp(value):
+    """UTC DATE-TIME (DTSTAMP)."""
+    return value.strftime('%Y%m%dT%H%M%SZ')
+
+
+def _local(value):
+    """;TZID parameter and value of a DATE-TIME in CALENDAR_TIMEZONE."""
+    return f";TZID={CALENDAR_TIMEZONE}:{value.strftime('%Y%m%dT%H%M%S')}"
+
+
+def render_ics(items, name, now=None):
+    """Render calendar feed items (CalendarService._to_item shape) as a VCALENDAR."""
+    now = now or datetime.utcnow()
+    lines = [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        f'PRODID:{PRODID}',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        f'X-WR-CALNAME:{_escape(name)}',
+        'X-PUBLISHED-TTL:PT15M',
+        f'X-WR-TIMEZONE:{CALENDAR_TIMEZONE}',
+        *VTIMEZONE,
+    ]
+    for item in items:
+        start = item.get('date')
+        if not isinstance(start, datetime):
+            continue
+        duration = item.get('duration') or DEFAULT_DURATION.get(item['type'], 120)
+        end = item.get('end_date') if isinstance(item.get('end_date'), datetime) else start + timedelta(minutes=int(duration))
+        description = item.get('description') or item.get('competition') or ''
+        lines += [
+            'BEGIN:VEVENT',
+            f"UID:{item['type']}-{item['id']}@footlogic",
+            f'DTSTAMP:{_stamp(now)}',
+            f'DTSTART{_local(start)}',
+            f'DTEND{_local(end)}',
+            f"SUMMARY:{_escape(item.get('title'))}",
+        ]
+        if item.get('location'):
+            lines.append(f"LOCATION:{_escape(item['location'])}")
+        if description:
+            lines.append(f'DESCRIPTION:{_escape(description)}')
+        lines.append(f"CATEGORIES:{item['type'].upper()}")
+        lines.append('STATUS:CANCELLED' if item.get('status') == 'cancelled' else 'STATUS:CONFIRMED')
+        lines.append('END:VEVENT')
+    lines.append('END:VCALENDAR')
+    return '\r\n'.join(_fold(line) for line in lines) + '\r\n'
+
+
+class IcsFeedService:
+    """Tokenized .ics subscription feeds, one document per feed in `calendar_feeds`.
+
+    The secret token in the URL replaces the JWT (calendar apps cannot send
+    one). The rendered body and its ETag are stored on the feed document, so a
+    poll is a single indexed read; match, event and training writes call
+    invalidate() to drop the bodies of the affected club/team feeds.
+    """
+
+    _indexed = set()
+
+    def __init__(self, db):
+        self.db = db
+        self.collection = db.calendar_feeds
+        if db.name not in IcsFeedService._indexed:
+            self.collection.create_index('token', unique=True)
+            self.collection.create_index([('owner_id', 1), ('scope', 1), ('team_id', 1)])
+            self.collection.create_index([('club_id', 1), ('team_ids', 1)])
+            IcsFeedService._indexed.add(db.name)
+
+    # ── Feed management ─────────────────────────────────────
+
+    def get_or_create(self, owner_id, club_id, scope=SCOPE_USER, team_id=None):
+        """Return the caller's feed for this scope, creating it (with a fresh token) if needed."""
+        query = {
+            'owner_id': ObjectId(owner_id),
+            'scope': scope,
+            'team_id': ObjectId(team_id) if scope == SCOPE_TEAM else None,
+        }
+        feed = self.collection.find_one(query)
+        if feed:
+            return feed
+        feed = {
+            **query,
+            'club_id': ObjectId(club_id),
+            'token': secrets.token_urlsafe(24),
+            'team_ids': [],
+            'body': None,
+            'etag': None,
+            'rendered_at': None,
+            'version': 0,
+            'created_at': datetime.utcnow(),
+        }
+        feed['_id'] = self.collection.insert_one(feed).inserted_id
+        return feed
+
+    def revoke(self, owner_id, token):
+        return self.collection.delete_one({'token': token, 'owner_id': ObjectId(owner_id)}).deleted_count > 0
+
+    # ── Serving ─────────────────────────────────────────────
+
+    def get_rendered(self, token):
+        """(body, etag) for a token, rendering only when the stored body was invalidated."""
+        feed = self.collection.find_one({'token': token})
+        if not feed:
+            return None, None
+        cutoff = datetime.utcnow() - timedelta(seconds=RENDER_TTL_SECONDS)
+        if feed.get('body') and feed.get('rendered_at') and feed['rendered_at'] >= cutoff:
+            return feed['body'], feed['etag']
+        return self.render(feed)
+
+    def render(self, feed):
+        team_ids, name = self._resolve(feed)
+        start, end = months_around(3, 12)
+        items = CalendarService(self.db).get_feed(
+            feed['club_id'], team_ids=team_ids or None, start=start, end=end
+        )
+        body = render_ics(items, name)
+        etag = hashlib.sha1(body.encode('utf-8')).hexdigest()
+        # Only store if nothing invalidated the feed while rendering
+        self.collection.update_one(
+            {'_id': feed['_id'], 'version': feed.get('version', 0)},
+            {'$set': {'body': body, 'etag': etag, 'rendered_at': datetime.utcnow(),
+                      'team_ids': [ObjectId(t) for t in team_ids]}}
+        )
+        return body, etag
+
+    def _resolve(self, feed):
+        """Team ids covered by a feed and its display name."""
+        if feed['scope'] == SCOPE_TEAM:
+            team = self.db.teams.find_one({'_id': feed['team_id']}, {'name': 1})
+            return [str(feed['team_id'])], (team or {}).get('name', 'Équipe')
+
+        user = self.db.users.find_one({'_id': feed['owner_id']}, {'role': 1}) or {}
+        role = user.get('role')
+        team_ids = []
+        if role == 'player':
+            player = self.db.players.find_one({'user_id': feed['owner_id']}, {'team_id': 1})
+            if player and player.get('team_id'):
+                team_ids = [player['team_id']]
+        elif role == 'parent':
+            from app.services.parent_link_service import ParentLinkService
+            team_ids = [p['team_id'] for p in ParentLinkService(self.db).get_linked_players(feed['owner_id'])
+                        if p.get('team_id')]
+        elif role == 'coach':
+            team_ids = self.db.teams.distinct('_id', {'coach_ids': feed['owner_id']})
+        # Admins and unresolved users get the whole club
+        return [str(t) for t in dict.fromkeys(team_ids)], 'FootLogic'
+
+    # ── Invalidation ────────────────────────────────────────
+
+    def invalidate(self, club_id, team_id=None):
+        """Drop rendered bodies affected by a write to a match, event or session.
+
+        Club-wide items (no team) and whole-club feeds (empty team_ids) are
+        always affected; team items only touch feeds covering that team.
+        """
+        if not club_id or not ObjectId.is_valid(str(club_id)):
+            return
+        query = {'club_id': ObjectId(str(club_id))}
+        if team_id and ObjectId.is_valid(str(team_id)):
+            query['team_ids'] = {'$in': [ObjectId(str(team_id)), []]}
+        # The version bump also discards a render that is in flight
+        self.collection.update_many(query, {'$set': {'body': None}, '$inc': {'version': 1}})
@@ -0,0 +1,131 @@
+# FootLogic V2 - Image Upload Pipeline (resized variants, WebP, no metadata)
+
+import io
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+logger = logging.getLogger(__name__)
+
+# Longest edge (px) of each generated variant
+VARIANTS = {'thumbnail': 160, 'card': 480, 'full': 1600}
+
+WEBP_QUALITY = 80
+JPEG_QUALITY = 85
+
+# Refuse decompression bombs (a 20 MB PNG can expand to gigabytes)
+MAX_PIXELS = 40_000_000
+
+# Seconds a request waits for its variants
+PROCESS_TIMEOUT = 30
+
+RASTER_EXTENSIONS = {'jpg', 'jpeg', 'png', 'webp'}
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+class ImageError(Exception):
+    """Raised when an upload cannot be decoded as an image."""
+
+
+def _get_pool():
+    # Spawned, not forked: the web worker is multi-threaded
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=2, mp_context=multiprocessing.get_context('spawn'))
+        return _pool
+
+
+def _discard_pool(pool):
+    """Drop a broken pool (a child died, e.g. killed for memory) so the next call starts a new one."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False)
+
+
+def render_variants(data):
+    """{variant: {format: bytes}} for an image (runs in the process pool).
+
+    Each variant is re-encoded as WebP plus JPEG (PNG when the image has
+    transparency). EXIF orientation is applied, then every metadata block
+    (EXIF, GPS, ICC, comments) is dropped since nothing is copied over.
+    """
+    from PIL import Image, ImageOps
+    Image.MAX_IMAGE_PIXELS = MAX_PIXELS
+
+    with Image.open(io.BytesIO(data)) as source:
+        image = ImageOps.exif_transpose(source)
+        alpha = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+        image = image.convert('RGBA' if alpha else 'RGB')
+    # Encoders fall back to image.info for some blocks (ICC profile in PNG)
+    image.info = {}
+
+    variants = {}
+    for name, edge in VARIANTS.items():
+        variant = image.copy()
+        variant.thumbnail((edge, edge), Image.LANCZOS)
+        webp, fallback = io.BytesIO(), io.BytesIO()
+        variant.save(webp, 'WEBP', quality=WEBP_QUALITY, method=4)
+        if alpha:
+            variant.save(fallback, 'PNG', optimize=True)
+        else:
+            variant.save(fallback, 'JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)
+        variants[name] = {'webp': webp.getvalue(), 'png' if alpha else 'jpg': fallback.getvalue()}
+    return variants
+
+
+def process_image(data, ext):
+    """Variants of an uploaded image, or None when they cannot be generated here.
+
+    None is returned for non-raster files (SVG) and when Pillow is not
+    installed; callers then keep the original file only.
+    """
+    if ext not in RASTER_EXTENSIONS:
+        return None
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        return None
+    # A broken pool is replaced and the image tried once more; if it breaks
+    # the new pool too, the image itself is the problem
+    for attempt in range(2):
+        pool = _get_pool()
+        try:
+            return pool.submit(render_variants, data).result(timeout=PROCESS_TIMEOUT)
+        except BrokenProcessPool as exc:
+            _discard_pool(pool)
+            logger.warning('Image worker died (attempt %d): %s', attempt + 1, exc)
+            error = exc
+        except Exception as exc:
+            logger.warning('Image processing failed: %s', exc)
+            raise ImageError('Image illisible') from exc
+    raise ImageError('Image illisible') from error
+
+
+def save_image(file_storage, uploads, ext, **owners):
+    """Store an uploaded image and its variants through an UploadService.
+
+    Returns {'url': <default URL>, 'variants': {variant: {format: URL}}}.
+    Blobs are content-addressed, so uploading the same image again stores
+    nothing new. Without variants (SVG, no Pillow) the original is stored
+    and every variant points to it. Raises ImageError for unreadable images.
+    `owners` (club_id, user_id, public) are passed to UploadService.save.
+    """
+    data = file_storage.read()
+
+    variants = process_image(data, ext)
+    if variants is None:
+        url = uploads.save(data, ext, **owners)['url']
+        return {'url': url, 'variants': {v: {ext: url} for v in VARIANTS}}
+
+    urls = {}
+    for variant, formats in variants.items():
+        urls[variant] = {fmt: uploads.save(content, fmt, **owners)['url'] for fmt, content in formats.items()}
+    fallback = next(fmt for fmt in urls['full'] if fmt != 'webp')
+    return {'url': urls['full'][fallback], 'variants': urls}
@@ -0,0 +1,198 @@
+# FootLogic V2 - Injury Analytics Service (aggregation-based)
+
+from bson import ObjectId
+from app.services.cache import GenerationCache
+
+MS_PER_DAY = 24 * 60 * 60 * 1000
+
+# Heatmaps are read on every injury screen but change only when an injury is logged/updated;
+# an injury write bumps the club's generation, which drops them on every worker
+_heatmap_cache = GenerationCache('injury_heatmap', ttl=300, maxsize=256)
+
+
+def as_date(field):
+    """Aggregation expression turning a BSON date or ISO string field into a date (or null)."""
+    return {'$switch': {
+        'branches': [
+            {'case': {'$eq': [{'$type': field}, 'date']}, 'then': field},
+            {'case': {'$eq': [{'$type': field}, 'string']},
+             'then': {'$dateFromString': {
+                 # Drop microseconds/offsets written by datetime.isoformat()
+                 'dateString': {'$substrCP': [field, 0, 19]},
+                 'onError': None,
+                 'onNull': None,
+             }}},
+        ],
+        'default': None,
+    }}
+
+
+# Whole days between injury_date and actual_return (null when either is unparseable)
+RECOVERY_DAYS = {'$floor': {'$divide': [
+    {'$subtract': [as_date('$actual_return'), as_date('$injury_date')]},
+    MS_PER_DAY,
+]}}
+
+BODY_PART = {'$cond': [{'$gt': [{'$ifNull': ['$body_part', '']}, '']}, '$body_part', 'unknown']}
+
+
+def _recovery_summary(days_field):
+    """$project fields computing count/mean/median from a sorted array of days."""
+    return {
+        'recovery_count': {'$size': days_field},
+        'mean_recovery_days': {'$avg': days_field},
+        'median_recovery_days': {'$let': {
+            'vars': {'n': {'$size': days_field}, 'mid': {'$toInt': {'$floor': {'$divide': [{'$size': days_field}, 2]}}}},
+            'in': {'$cond': [
+                {'$eq': ['$$n', 0]},
+                None,
+                {'$cond': [
+                    {'$eq': [{'$mod': ['$$n', 2]}, 1]},
+                    {'$arrayElemAt': [days_field, '$$mid']},
+                    {'$avg': [
+                        {'$arrayElemAt': [days_field, {'$subtract': ['$$mid', 1]}]},
+                        {'$arrayElemAt': [days_field, '$$mid']},
+                    ]},
+                ]},
+            ]},
+        }},
+    }
+
+
+class InjuryAnalyticsService:
+    """Club/team injury analytics computed in a single $facet pipeline."""
+
+    def __init__(self, db):
+        self.db = db
+        self.collection = db.injuries
+
+    # ── Cache ───────────────────────────────────────────────
+
+    def invalidate_club(self, club_id):
+        _heatmap_cache.bump(self.db, club_id)
+
+    def invalidate_team(self, team_id):
+        """Drop cached analytics of the club owning `team_id` (called on injury writes)."""
+        team = self.db.teams.find_one({'_id': ObjectId(team_id)}, {'club_id': 1}) if team_id else None
+        if team and team.get('club_id'):
+            self.invalidate_club(team['club_id'])
+        else:
+            _heatmap_cache.clear()
+
+    def get_heatmap(self, club_id, team_id=None):
+        """Cached wrapper around compute() for the coach heatmap endpoint."""
+        return _heatmap_cache.get_or_set(self.db, club_id, (str(team_id or ''),),
+                                         lambda: self.compute(club_id, team_id))
+
+    # ── Pipeline ────────────────────────────────────────────
+
+    def compute(self, club_id, team_id=None):
+        """Status counts, recovery mean/median, body part × month and recurrence for a club."""
+        # Only teams of the club, even when one is named
+        query = {'club_id': ObjectId(club_id)}
+        if team_id:
+            query['_id'] = ObjectId(team_id)
+        team_ids = self.db.teams.distinct('_id', query)
+        if not team_ids:
+            return self._format({})
+
+        resolved_days = [
+            {'$match': {'status': 'resolved'}},
+            {'$project': {'team_id': 1, 'days': RECOVERY_DAYS}},
+            {'$match': {'days': {'$gte': 0}}},
+            {'$sort': {'days': 1}},
+        ]
+        pipeline = [
+            {'$match': {'team_id': {'$in': team_ids}}},
+            {'$facet': {
+                'status': [
+                    {'$group': {'_id': {'team_id': '$team_id', 'status': '$status'}, 'count': {'$sum': 1}}},
+                ],
+                'team_recovery': resolved_days + [
+                    {'$group': {'_id': '$team_id', 'days': {'$push': '$days'}}},
+                    {'$project': _recovery_summary('$days')},
+                ],
+                'club_recovery': resolved_days + [
+                    {'$group': {'_id': None, 'days': {'$push': '$days'}}},
+                    {'$project': _recovery_summary('$days')},
+                ],
+                'heatmap': [
+                    {'$project': {
+                        'body_part': BODY_PART,
+                        'month': {'$dateToString': {'format': '%Y-%m', 'date': as_date('$injury_date')}},
+                    }},
+                    {'$match': {'month': {'$ne': None}}},
+                    {'$group': {'_id': {'body_part': '$body_part', 'month': '$month'}, 'count': {'$sum': 1}}},
+                ],
+                'recurrence': [
+                    {'$group': {'_id': {'player_id': '$player_id', 'body_part': BODY_PART}, 'count': {'$sum': 1}}},
+                    {'$group': {
+                        '_id': '$_id.player_id',
+                        'injuries': {'$sum': '$count'},
+                        'parts': {'$push': {'body_part': '$_id.body_part', 'count': '$count'}},
+                    }},
+                    {'$match': {'injuries': {'$gt': 1}}},
+                    {'$project': {
+                        'injuries': 1,
+                        'recurrent_body_parts': {'$map': {
+                            'input': {'$filter': {'input': '$parts', 'cond': {'$gt': ['$$this.count', 1]}}},
+                            'in': '$$this.body_part',
+                        }},
+                    }},
+                    {'$sort': {'injuries': -1}},
+                    {'$limit': 50},
+                ],
+            }},
+        ]
+        rows = list(self.collection.aggregate(pipeline))
+        return self._format(rows[0] if rows else {})
+
+    @staticmethod
+    def _recovery(row):
+        mean = row.get('mean_recovery_days') if row else None
+        median = row.get('median_recovery_days') if row else None
+        return {
+            'mean_recovery_days': round(mean, 1) if mean is not None else 0,
+            'median_recovery_days': round(median, 1) if median is not None else 0,
+        }
+
+    def _format(self, facets):
+        empty = {'total': 0, 'active': 0, 'recovering': 0, 'resolved': 0}
+        club = dict(empty)
+        teams = {}
+        for row in facets.get('status', []):
+            tid = str(row['_id'].get('team_id'))
+            status = row['_id'].get('status')
+            team = teams.setdefault(tid, dict(empty))
+            for bucket in (club, team):
+                bucket['total'] += row['count']
+                if status in bucket:
+                    bucket[status] += row['count']
+
+        club.update(self._recovery((facets.get('club_recovery') or [None])[0]))
+        for row in facets.get('team_recovery', []):
+            teams.setdefault(str(row['_id']), dict(empty)).update(self._recovery(row))
+        for team in teams.values():
+            team.setdefault('mean_recovery_days', 0)
+            team.setdefault('median_recovery_days', 0)
+
+        cells = [{
+            'body_part': row['_id']['body_part'],
+            'month': row['_id']['month'],
+            'count': row['count'],
+        } for row in facets.get('heatmap', [])]
+
+        return {
+            'club': club,
+            'teams': teams,
+            'heatmap': {
+                'body_parts': sorted({c['body_part'] for c in cells}),
+                'months': sorted({c['month'] for c in cells}),
+                'cells': sorted(cells, key=lambda c: (c['month'], c['body_part'])),
+            },
+            'recurrence': [{
+                'player_id': str(row['_id']),
+                'injuries': row['injuries'],
+                'recurrent_body_parts': row.get('recurrent_body_parts', []),
+            } for row in facets.get('recurrence', [])],
+        }
@@ -2,6 +2,9 @@
 
 from bson import ObjectId
 from datetime import datetime, timedelta
+from app.services.injury_analytics_service import InjuryAnalyticsService, RECOVERY_DAYS
+from app.services.player_snapshot_service import PlayerSnapshotService
+from app.services.dates import parse_date, iso
 
 
 # Severity → estimated recovery days
@@ -19,12 +22,14 @@ class InjuryService:
         self.db = db
         self.collection = db.injuries
         self.players = db.players
+        self.analytics = InjuryAnalyticsService(db)
+        self.snapshots = PlayerSnapshotService(db)
 
     # ── Injury Logging ──────────────────────────────────────
 
     def log_injury(self, player_id, coach_id, team_id, data):
         severity = data.get('severity', 'minor')
-        injury_date = data.get('injury_date', datetime.utcnow().isoformat())
+        injury_date = parse_date(data.get('injury_date')) or datetime.utcnow()
         expected_days = SEVERITY_DAYS.get(severity, 21)
 
         injury = {
@@ -36,7 +41,7 @@ class InjuryService:
             'severity': severity,
             'description': data.get('description', ''),
             'injury_date': injury_date,
-            'expected_return': data.get('expected_return') or self._calc_return(injury_date, expected_days),
+            'expected_return': parse_date(data.get('expected_return')) or self._calc_return(injury_date, expected_days),
             'actual_return': None,
             'status': 'active',              # active | recovering | resolved
             'medical_clearance': False,
@@ -52,20 +57,19 @@ class InjuryService:
             {'_id': ObjectId(player_id)},
             {'$set': {'status': 'injured', 'injury_id': result.inserted_id}}
         )
+        self.analytics.invalidate_team(team_id)
+        self.snapshots.invalidate_players([player_id])
         return str(result.inserted_id)
 
     def _calc_return(self, injury_date, days):
-        try:
-            dt = datetime.fromisoformat(injury_date) if isinstance(injury_date, str) else injury_date
-        except (ValueError, TypeError):
-            dt = datetime.utcnow()
-        return (dt + timedelta(days=days)).isoformat()
+        dt = parse_date(injury_date) or datetime.utcnow()
+        return dt + timedelta(days=days)
 
     # ── Recovery Tracking ───────────────────────────────────
 
     def update_recovery(self, injury_id, coach_id, data):
         note = {
-            'date': datetime.utcnow().isoformat(),
+            'date': datetime.utcnow(),
             'update': data.get('notes', ''),
             'status': data.get('status'),
             'updated_by': ObjectId(coach_id),
@@ -74,19 +78,23 @@ class InjuryService:
         if data.get('status'):
             update_fields['status'] = data['status']
         if data.get('expected_return'):
-            update_fields['expected_return'] = data['expected_return']
+            update_fields['expected_return'] = parse_date(data['expected_return'])
 
-        self.collection.update_one(
+        injury = self.collection.find_one_and_update(
             {'_id': ObjectId(injury_id)},
             {
                 '$push': {'recovery_notes': note},
                 '$set': update_fields,
-            }
+            },
+            projection={'team_id': 1, 'player_id': 1}
         )
+        if injury:
+            self.analytics.invalidate_team(injury.get('team_id'))
+            self.snapshots.invalidate_players([injury.get('player_id')])
         return True
 
     def clear_for_play(self, injury_id, cleared_by, date=None):
-        now = (date or datetime.utcnow().isoformat())
+        now = parse_date(date) or datetime.utcnow()
         injury = self.collection.find_one({'_id': ObjectId(injury_id)})
         if not injury:
             return False
@@ -107,6 +115,8 @@ class InjuryService:
             {'_id': injury['player_id']},
             {'$set': {'status': 'active'}, '$unset': {'injury_id': ''}}
         )
+        self.analytics.invalidate_team(injury.get('team_id'))
+        self.snapshots.invalidate_players([injury['player_id']])
         return True
 
     # ── Queries ─────────────────────────────────────────────
@@ -126,44 +136,46 @@ class InjuryService:
     # ── Statistics ──────────────────────────────────────────
 
     def get_injury_stats(self, team_id):
-        injuries = list(self.collection.find({'team_id': ObjectId(team_id)}))
-        active = [i for i in injuries if i.get('status') == 'active']
-        recovering = [i for i in injuries if i.get('status') == 'recovering']
-        resolved = [i for i in injuries if i.get('status') == 'resolved']
-
-        # Most common injury types
-        type_counts = {}
-        body_counts = {}
-        for i in injuries:
-            t = i.get('injury_type', 'other')
-            b = i.get('body_part', 'unknown')
-            type_counts[t] = type_counts.get(t, 0) + 1
-            body_counts[b] = body_counts.get(b, 0) + 1
-
-        # Avg recovery days for resolved
-        recovery_days = []
-        for i in resolved:
-            try:
-                start = datetime.fromisoformat(i['injury_date']) if isinstance(i['injury_date'], str) else i['injury_date']
-                end = datetime.fromisoformat(i['actual_return']) if isinstance(i['actual_return'], str) else i['actual_return']
-                recovery_days.append((end - start).days)
-            except (TypeError, ValueError, KeyError):
-                pass
+        pipeline = [
+            {'$match': {'team_id': ObjectId(team_id)}},
+            {'$facet': {
+                'status': [{'$group': {'_id': '$status', 'count': {'$sum': 1}}}],
+                'by_type': [{'$group': {'_id': {'$ifNull': ['$injury_type', 'other']}, 'count': {'$sum': 1}}}],
+                'by_body_part': [{'$group': {'_id': {'$ifNull': ['$body_part', 'unknown']}, 'count': {'$sum': 1}}}],
+                'active': [
+                    {'$match': {'status': 'active'}},
+                    {'$project': {'player_id': 1, 'injury_type': 1, 'body_part': 1, 'severity': 1,
+                                  'injury_date': 1, 'expected_return': 1}},
+                ],
+                'recovery': [
+                    {'$match': {'status': 'resolved'}},
+                    {'$project': {'days': RECOVERY_DAYS}},
+                    # Same filter as the analytics heatmap: unparseable dates and returns before the injury are left out
+                    {'$match': {'days': {'$gte': 0}}},
+                    {'$group': {'_id': None, 'avg': {'$avg': '$days'}}},
+                ],
+            }},
+        ]
+        rows = list(self.collection.aggregate(pipeline))
+        facets = rows[0] if rows else {}
+        status_counts = {r['_id']: r['count'] for r in facets.get('status', [])}
+        recovery = facets.get('recovery') or [{}]
+        avg_days = recovery[0].get('avg')
 
         return {
-            'total': len(injuries),
-            'active': len(active),
-            'recovering': len(recovering),
-            'resolved': len(resolved),
+            'total': sum(status_counts.values()),
+            'active': status_counts.get('active', 0),
+            'recovering': status_counts.get('recovering', 0),
+            'resolved': status_counts.get('resolved', 0),
             'active_injuries': [{
                 'player_id': str(i['player_id']),
                 'injury_type': i.get('injury_type'),
                 'body_part': i.get('body_part'),
                 'severity': i.get('severity'),
-                'injury_date': i.get('injury_date'),
-                'expected_return': i.get('expected_return'),
-            } for i in active],
-            'by_type': type_counts,
-            'by_body_part': body_counts,
-            'avg_recovery_days': round(sum(recovery_days) / len(recovery_days), 1) if recovery_days else 0,
+                'injury_date': iso(i.get('injury_date')),
+                'expected_return': iso(i.get('expected_return')),
+            } for i in facets.get('active', [])],
+            'by_type': {r['_id']: r['count'] for r in facets.get('by_type', [])},
+            'by_body_part': {r['_id']: r['count'] for r in facets.get('by_body_part', [])},
+            'avg_recovery_days': round(avg_days, 1) if avg_days is not None else 0,
         }
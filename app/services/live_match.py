@@ -0,0 +1,228 @@
+# FootLogic V2 - Live Match Feed (server-sent events fan-out)
+
+import json
+import logging
+import queue
+import secrets
+import threading
+import time
+from collections import deque
+from bson import ObjectId
+from app.services.dates import iso
+
+logger = logging.getLogger(__name__)
+
+# How often a watched match is re-read to pick up writes made by other workers
+POLL_SECONDS = 2
+
+# Comment line sent when nothing happened, so proxies keep the stream open
+HEARTBEAT_SECONDS = 15
+
+# A stream ends after this long; EventSource reconnects with Last-Event-ID
+STREAM_SECONDS = 600
+
+# Messages kept per match for Last-Event-ID replay, and per slow subscriber
+BACKLOG_SIZE = 100
+
+# Open streams per worker process (each one holds a worker thread)
+MAX_STREAMS = 24
+
+LIVE_FIELDS = {'score': 1, 'status': 1, 'events': 1, 'stats': 1}
+
+
+class LiveFeedFull(Exception):
+    """Raised when the worker already serves MAX_STREAMS live streams."""
+
+
+def live_state(match):
+    """The part of a match pushed to live subscribers (JSON-ready)."""
+    score = match.get('score') or {}
+    return {
+        'score': {'home': int(score.get('home') or 0), 'away': int(score.get('away') or 0)},
+        'status': match.get('status', 'scheduled'),
+        'events': [{
+            'type': e.get('type'),
+            'player_id': str(e['player_id']) if e.get('player_id') else None,
+            'minute': e.get('minute'),
+            'timestamp': iso(e.get('timestamp')),
+        } for e in match.get('events') or []],
+        'stats': match.get('stats') or {},
+    }
+
+
+def diff_states(old, new):
+    """[(event, data)] messages turning `old` into `new`."""
+    messages = []
+    if old['score'] != new['score'] or old['status'] != new['status']:
+        messages.append(('score', {**new['score'], 'status': new['status']}))
+    if new['events'] != old['events']:
+        count = len(old['events'])
+        if new['events'][:count] == old['events']:
+            messages.append(('timeline', {'events': new['events'][count:]}))
+        else:
+            # An event was edited or removed: send the whole timeline
+            messages.append(('timeline', {'events': new['events'], 'replace': True}))
+    if new['stats'] != old['stats']:
+        changed = {k: v for k, v in new['stats'].items() if old['stats'].get(k) != v}
+        messages.append(('stats', changed))
+    return messages
+
+
+def format_sse(event_id, event, data):
+    return f'id: {event_id}\nevent: {event}\ndata: {json.dumps(data, default=str)}\n\n'
+
+
+class _Channel:
+    """Fan-out state of one match: last known state, backlog and subscriber queues."""
+
+    def __init__(self, match_id, state):
+        self.match_id = match_id
+        self.state = state
+        # Event ids are '<epoch>-<seq>': a reconnect landing on another worker
+        # (or on a channel created after ours was dropped) gets a snapshot
+        self.epoch = secrets.token_hex(4)
+        self.seq = 0
+        self.backlog = deque(maxlen=BACKLOG_SIZE)
+        self.subscribers = set()
+        self.lock = threading.Lock()
+        self.stop = threading.Event()
+
+
+class Subscription:
+    """One client stream. Iterate events(); close() is called when the response ends."""
+
+    def __init__(self, hub, channel, last_event_id=None):
+        self.hub = hub
+        self.channel = channel
+        self.queue = queue.Queue(maxsize=BACKLOG_SIZE)
+        self.closed = False
+        # Set when the queue overflowed; the queue itself stays, events() may be reading it
+        self.dropped = False
+        with channel.lock:
+            self.initial = self._initial(last_event_id)
+            channel.subscribers.add(self)
+
+    def _initial(self, last_event_id):
+        """Backlog since Last-Event-ID when we still have it, else a full snapshot."""
+        channel = self.channel
+        epoch, _, seq = str(last_event_id or '').partition('-')
+        if epoch == channel.epoch and seq.isdigit() and int(seq) <= channel.seq:
+            last = int(seq)
+            oldest = channel.backlog[0][0] if channel.backlog else channel.seq + 1
+            if oldest <= last + 1:
+                return [self._message(m) for m in channel.backlog if m[0] > last]
+        return [self._message((channel.seq, 'snapshot', channel.state))]
+
+    def _message(self, message):
+        seq, event, data = message
+        return f'{self.channel.epoch}-{seq}', event, data
+
+    def push(self, message):
+        if self.dropped:
+            return
+        try:
+            self.queue.put_nowait(self._message(message))
+        except queue.Full:
+            # Too slow to keep up: end the stream, the client reconnects and gets a snapshot
+            self.dropped = True
+
+    def events(self):
+        yield f'retry: {POLL_SECONDS * 1000}\n\n'
+        for message in self.initial:
+            yield format_sse(*message)
+        deadline = time.monotonic() + STREAM_SECONDS
+        while time.monotonic() < deadline and not self.dropped:
+            try:
+                message = self.queue.get(timeout=HEARTBEAT_SECONDS)
+            except queue.Empty:
+                yield ': ping\n\n'
+                continue
+            yield format_sse(*message)
+            if message[1] == 'score' and message[2].get('status') == 'completed':
+                return
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.hub._leave(self)
+
+
+class LiveMatchHub:
+    """In-process fan-out of live match updates.
+
+    Each watched match has one channel holding the last known state; however
+    many clients follow it, the worker reads the match once on the first
+    subscription and then once per POLL_SECONDS (to see writes handled by other
+    workers). MatchService writes call publish() so subscribers on the same
+    worker are notified immediately. Only the differences (score, new timeline
+    events, changed stats) are sent.
+    """
+
+    def __init__(self, poll_seconds=POLL_SECONDS, max_streams=MAX_STREAMS):
+        self.poll_seconds = poll_seconds
+        self.max_streams = max_streams
+        self._channels = {}
+        self._lock = threading.Lock()
+        self._streams = 0
+
+    def subscribe(self, db, match_id, last_event_id=None):
+        """Open a stream on a match. Returns None if the match does not exist."""
+        with self._lock:
+            if self._streams >= self.max_streams:
+                raise LiveFeedFull()
+            channel = self._channels.get(str(match_id))
+            if channel is None:
+                match = db.matches.find_one({'_id': ObjectId(match_id)}, LIVE_FIELDS)
+                if not match:
+                    return None
+                channel = self._channels[str(match_id)] = _Channel(str(match_id), live_state(match))
+                if self.poll_seconds:
+                    threading.Thread(target=self._poll, args=(db, channel), daemon=True).start()
+            self._streams += 1
+            return Subscription(self, channel, last_event_id)
+
+    def _leave(self, subscription):
+        channel = subscription.channel
+        with self._lock:
+            self._streams -= 1
+            with channel.lock:
+                channel.subscribers.discard(subscription)
+                if channel.subscribers:
+                    return
+            channel.stop.set()
+            if self._channels.get(channel.match_id) is channel:
+                del self._channels[channel.match_id]
+
+    def publish(self, match):
+        """Push the changes of a written match to its subscribers (no-op when unwatched)."""
+        channel = self._channels.get(str(match['_id']))
+        if channel is not None:
+            self._update(channel, live_state(match))
+
+    def _update(self, channel, state):
+        with channel.lock:
+            for event, data in diff_states(channel.state, state):
+                channel.seq += 1
+                message = (channel.seq, event, data)
+                channel.backlog.append(message)
+                for subscriber in list(channel.subscribers):
+                    subscriber.push(message)
+            channel.state = state
+
+    def _poll(self, db, channel):
+        match_id = ObjectId(channel.match_id)
+        while not channel.stop.wait(self.poll_seconds):
+            try:
+                match = db.matches.find_one({'_id': match_id}, LIVE_FIELDS)
+            except Exception:
+                logger.exception('Live feed poll failed for match %s', channel.match_id)
+                continue
+            if match:
+                self._update(channel, live_state(match))
+
+    def stream_count(self):
+        return self._streams
+
+
+# Shared by every request of this worker process
+hub = LiveMatchHub()
@@ -2,6 +2,24 @@
 
 from bson import ObjectId
 from datetime import datetime
+from pymongo import ReturnDocument
+from app.services.cache import GenerationCache
+from app.services.dates import parse_date, date_range, season_bounds
+from app.services.player_snapshot_service import PlayerSnapshotService
+from app.services.ics_service import IcsFeedService
+from app.services.live_match import hub as live_hub
+from app.services.standings_service import StandingsService
+from app.services.feed_service import FeedService
+
+# Number of recent results in the season form guide
+FORM_LENGTH = 5
+
+# Goal-time buckets (minutes); stoppage time counts in the last one
+INTERVALS = ('0-15', '16-30', '31-45', '46-60', '61-75', '76-90+')
+
+# Season statistics per (club, team, season); a match write bumps the club's
+# generation, which drops them on every worker
+_stats_cache = GenerationCache('season_stats', ttl=300, maxsize=512)
 
 class MatchService:
     """Service for match-related operations"""
@@ -32,6 +50,18 @@ class MatchService:
             query['team_id'] = ObjectId(team_id)
         return list(self.collection.find(query).sort('date', 1).limit(limit))
 
+    def get_in_range(self, club_id, start=None, end=None, team_id=None, status=None, limit=0):
+        """Matches whose date falls in [start, end), sorted by date (uses the club/date index)"""
+        query = {'club_id': ObjectId(club_id)}
+        bounds = date_range(start, end)
+        if bounds:
+            query['date'] = bounds
+        if team_id:
+            query['team_id'] = ObjectId(team_id)
+        if status:
+            query['status'] = status
+        return list(self.collection.find(query).sort('date', 1).limit(limit))
+
     def get_completed(self, club_id, team_id=None, limit=10):
         """Get completed matches, optionally filtered by team"""
         query = {
@@ -47,9 +77,12 @@ class MatchService:
         match = {
             'club_id': ObjectId(club_id),
             'opponent': opponent,
-            'date': date,
+            'date': parse_date(date) or date,
             'location': kwargs.get('location', ''),
             'is_home': is_home,
+            'team_id': ObjectId(kwargs['team_id']) if kwargs.get('team_id') else None,
+            'competition': kwargs.get('competition', ''),
+            'competition_id': ObjectId(kwargs['competition_id']) if kwargs.get('competition_id') else None,
             'score': {'home': 0, 'away': 0},
             'status': kwargs.get('status', 'scheduled'),
             'lineup': [],
@@ -58,6 +91,9 @@ class MatchService:
         }
         result = self.collection.insert_one(match)
         match['_id'] = result.inserted_id
+        IcsFeedService(self.db).invalidate(match['club_id'], match['team_id'])
+        if match['status'] == 'completed':
+            FeedService(self.db).sync_match(match)
         return match
 
     def update(self, match_id, data):
@@ -71,25 +107,18 @@ class MatchService:
                 continue
                 
             # Convert known ID fields
-            if k in ['club_id', 'team_id', 'opponent_id'] and isinstance(v, str):
+            if k in ['club_id', 'team_id', 'opponent_id', 'competition_id'] and isinstance(v, str):
                 try:
                     clean_data[k] = ObjectId(v)
                 except:
                     clean_data[k] = v
             # Convert date strings
             elif k == 'date' and isinstance(v, str):
-                try:
-                    # Handle ISO format
-                    clean_data[k] = datetime.fromisoformat(v.replace('Z', '+00:00'))
-                except:
-                    clean_data[k] = v
+                clean_data[k] = parse_date(v) or v
             else:
                 clean_data[k] = v
 
-        return self.collection.update_one(
-            {'_id': ObjectId(match_id)},
-            {'$set': clean_data}
-        )
+        return self._apply(match_id, {'$set': clean_data})
 
     def set_score(self, match_id, home_score, away_score, status=None):
         """Update match score and optionally status"""
@@ -100,24 +129,15 @@ class MatchService:
         if status:
             update_data['status'] = status
 
-        return self.collection.update_one(
-            {'_id': ObjectId(match_id)},
-            {'$set': update_data}
-        )
+        return self._apply(match_id, {'$set': update_data})
 
     def start_match(self, match_id):
         """Set match status to live"""
-        return self.collection.update_one(
-            {'_id': ObjectId(match_id)},
-            {'$set': {'status': 'live'}}
-        )
+        return self._apply(match_id, {'$set': {'status': 'live'}})
 
     def finish_match(self, match_id):
         """Set match status to completed"""
-        return self.collection.update_one(
-            {'_id': ObjectId(match_id)},
-            {'$set': {'status': 'completed'}}
-        )
+        return self._apply(match_id, {'$set': {'status': 'completed'}})
 
     def set_lineup(self, match_id, player_ids):
         """Set match lineup"""
@@ -130,14 +150,11 @@ class MatchService:
         """Add match event (goal, assist, card, substitution)"""
         event = {
             'type': event_type,
-            'player_id': ObjectId(player_id),
+            'player_id': ObjectId(player_id) if player_id else None,
             'minute': minute,
             'timestamp': datetime.utcnow()
         }
-        return self.collection.update_one(
-            {'_id': ObjectId(match_id)},
-            {'$push': {'events': event}}
-        )
+        return self._apply(match_id, {'$push': {'events': event}})
 
     def get_lineup(self, match_id):
         """Get match lineup with player details"""
@@ -148,41 +165,99 @@ class MatchService:
         lineup_ids = match.get('lineup', [])
         return list(self.db.players.find({'_id': {'$in': lineup_ids}}))
 
-    def get_season_stats(self, club_id, team_id=None):
-        """Get season statistics for a club, optionally filtered by team"""
+    def get_season_stats(self, club_id, team_id=None, season=None):
+        """Season statistics for a club, optionally filtered by team.
+
+        `season` is a 'YYYY-YYYY' label (see dates.season_label); without it
+        every completed match counts. Totals, home/away splits, the last
+        FORM_LENGTH results and our goals per 15-minute interval come from one
+        aggregation, cached per (club, team, season) until a match changes.
+        """
+        return _stats_cache.get_or_set(
+            self.db, club_id, (str(team_id or ''), str(season or '')),
+            lambda: self._build_season_stats(club_id, team_id, season)
+        )
+
+    def _build_season_stats(self, club_id, team_id=None, season=None):
         query = {
             'club_id': ObjectId(club_id),
             'status': 'completed'
         }
         if team_id:
             query['team_id'] = ObjectId(team_id)
+        bounds = season_bounds(season) if season else None
+        if bounds:
+            query['date'] = date_range(*bounds)
+
+        is_home = {'$ifNull': ['$is_home', True]}
+        home_goals = {'$ifNull': ['$score.home', 0]}
+        away_goals = {'$ifNull': ['$score.away', 0]}
+        # Minute 1-15 -> 0, 16-30 -> 1, ... stoppage time -> last bucket
+        interval = {'$max': [0, {'$min': [
+            {'$floor': {'$divide': [{'$subtract': ['$events.minute', 1]}, 15]}}, len(INTERVALS) - 1
+        ]}]}
+
+        result = next(self.collection.aggregate([
+            {'$match': query},
+            {'$project': {
+                'date': 1,
+                'events': 1,
+                'is_home': is_home,
+                'gf': {'$cond': [is_home, home_goals, away_goals]},
+                'ga': {'$cond': [is_home, away_goals, home_goals]},
+            }},
+            {'$facet': {
+                'sides': [{'$group': {
+                    '_id': '$is_home',
+                    'played': {'$sum': 1},
+                    'wins': {'$sum': {'$cond': [{'$gt': ['$gf', '$ga']}, 1, 0]}},
+                    'draws': {'$sum': {'$cond': [{'$eq': ['$gf', '$ga']}, 1, 0]}},
+                    'losses': {'$sum': {'$cond': [{'$lt': ['$gf', '$ga']}, 1, 0]}},
+                    'goals_for': {'$sum': '$gf'},
+                    'goals_against': {'$sum': '$ga'},
+                }}],
+                'form': [
+                    {'$sort': {'date': -1}},
+                    {'$limit': FORM_LENGTH},
+                    {'$project': {'_id': 0, 'gf': 1, 'ga': 1}},
+                ],
+                'intervals': [
+                    {'$unwind': '$events'},
+                    {'$match': {'events.type': 'goal', 'events.minute': {'$gte': 0}}},
+                    {'$group': {'_id': interval, 'goals': {'$sum': 1}}},
+                ],
+            }},
+        ]), {})
+
+        sides = {True: self._stats_row({}), False: self._stats_row({})}
+        for row in result.get('sides', []):
+            sides[bool(row['_id'])] = self._stats_row(row)
+        stats = self._stats_row({
+            k: sides[True][k] + sides[False][k]
+            for k in ('played', 'wins', 'draws', 'losses', 'goals_for', 'goals_against')
+        })
+
+        goals = {int(row['_id']): row['goals'] for row in result.get('intervals', []) if row['_id'] is not None}
+        stats.update({
+            'season': season or '',
+            'home': sides[True],
+            'away': sides[False],
+            'form': ['W' if m['gf'] > m['ga'] else 'L' if m['gf'] < m['ga'] else 'D'
+                     for m in result.get('form', [])],
+            'goals_by_interval': [{'interval': label, 'goals': goals.get(i, 0)}
+                                  for i, label in enumerate(INTERVALS)],
+        })
+        return stats
 
-        matches = list(self.collection.find(query))
-
-        wins = draws = losses = goals_for = goals_against = 0
-
-        for m in matches:
-            score = m.get('score', {'home': 0, 'away': 0})
-            is_home = m.get('is_home', True)
-
-            our_goals = score['home'] if is_home else score['away']
-            their_goals = score['away'] if is_home else score['home']
-
-            goals_for += our_goals
-            goals_against += their_goals
-
-            if our_goals > their_goals:
-                wins += 1
-            elif our_goals < their_goals:
-                losses += 1
-            else:
-                draws += 1
-
+    @staticmethod
+    def _stats_row(row):
+        wins, draws = row.get('wins', 0), row.get('draws', 0)
+        goals_for, goals_against = row.get('goals_for', 0), row.get('goals_against', 0)
         return {
-            'played': len(matches),
+            'played': row.get('played', 0),
             'wins': wins,
             'draws': draws,
-            'losses': losses,
+            'losses': row.get('losses', 0),
             'goals_for': goals_for,
             'goals_against': goals_against,
             'goal_difference': goals_for - goals_against,
@@ -191,7 +266,35 @@ class MatchService:
 
     def delete(self, match_id):
         """Delete a match"""
-        return self.collection.delete_one({'_id': ObjectId(match_id)})
+        match = self.collection.find_one_and_delete({'_id': ObjectId(match_id)})
+        if match:
+            self._on_change(match, deleted=True)
+        return match
+
+    # ── Write hooks ───────────────────────────────────────
+
+    def _apply(self, match_id, update):
+        """Apply an update and run the change hooks. Returns the updated match (or None)."""
+        match = self.collection.find_one_and_update(
+            {'_id': ObjectId(match_id)}, update, return_document=ReturnDocument.AFTER
+        )
+        if match:
+            self._on_change(match)
+        return match
+
+    def _on_change(self, match, deleted=False):
+        """Update data derived from this match (stats, snapshots, ICS feeds, standings, live feed, news feed)."""
+        _stats_cache.bump(self.db, match.get('club_id'))
+        snapshots = PlayerSnapshotService(self.db)
+        if match.get('team_id'):
+            snapshots.invalidate_team(match['team_id'])
+        else:
+            snapshots.invalidate_club(match.get('club_id'))
+        IcsFeedService(self.db).invalidate(match.get('club_id'), match.get('team_id'))
+        StandingsService(self.db).apply(match, deleted=deleted)
+        FeedService(self.db).sync_match(match, deleted=deleted)
+        if not deleted:
+            live_hub.publish(match)
 
     # ── Excel helpers ─────────────────────────────────────
 
@@ -1,10 +1,18 @@
 from datetime import datetime
 from bson import ObjectId
+from app.services.feed_service import FeedService
+from app.services.search_service import SearchService
+from app.services.view_counter import views
 
 
 class MediaService:
+    _indexed = set()
+
     def __init__(self, db):
         self.db = db
+        if db.name not in MediaService._indexed:
+            db.media.create_index([('club_id', 1), ('views', -1)])
+            MediaService._indexed.add(db.name)
 
     def get_gallery(self, club_id, category=None, limit=30):
         query = {'club_id': ObjectId(club_id)}
@@ -24,9 +32,20 @@ class MediaService:
             return None
         item['_id'] = str(item['_id'])
         item['club_id'] = str(item['club_id'])
-        self.db.media.update_one({'_id': ObjectId(media_id)}, {'$inc': {'views': 1}})
+        views.record(self.db, 'media', media_id)
+        item['views'] = item.get('views', 0) + views.pending('media', media_id)
         return item
 
+    def get_top_viewed(self, club_id, limit=10):
+        """Most viewed media of a club (served by the club_id/views index)."""
+        items = list(self.db.media.find({'club_id': ObjectId(club_id)}).sort('views', -1).limit(limit))
+        for item in items:
+            item['_id'] = str(item['_id'])
+            item['club_id'] = str(item['club_id'])
+            if item.get('match_id'):
+                item['match_id'] = str(item['match_id'])
+        return items
+
     def upload_media(self, club_id, data):
         doc = {
             'club_id': ObjectId(club_id),
@@ -42,4 +61,6 @@ class MediaService:
             'created_at': datetime.utcnow(),
         }
         result = self.db.media.insert_one(doc)
+        SearchService(self.db).refresh('media', result.inserted_id)
+        FeedService(self.db).publish_media(doc)
         return str(result.inserted_id)
@@ -1,6 +1,10 @@
 # FootLogic V2 - Notification Service
 
 from datetime import datetime, timedelta
+from app.services.dates import parse_date, window
+
+# Dashboard alerts cover matches and events in the next week
+ALERT_HORIZON_DAYS = 7
 
 class NotificationService:
     def __init__(self, db):
@@ -111,23 +115,29 @@ class NotificationService:
         match_service = get_match_service()
         event_service = get_event_service()
 
-        now = datetime.utcnow()
+        now, horizon = window(ALERT_HORIZON_DAYS)
+        # Upcoming matches and events (next 7 days) — indexed range queries on BSON dates
+        upcoming_matches = match_service.get_in_range(club_id, now, horizon, team_id=team_id,
+                                                      status='scheduled', limit=10)
+        upcoming_events = event_service.get_in_range(club_id, now, horizon, team_id=team_id, limit=15)
+        return self.build_dashboard_alerts(upcoming_matches, upcoming_events, now)
+
+    @staticmethod
+    def build_dashboard_alerts(upcoming_matches, upcoming_events, now=None):
+        """Alerts for matches and events already fetched by the caller.
+
+        Items outside the next ALERT_HORIZON_DAYS are skipped, so the
+        dashboard can pass its own (longer) upcoming lists.
+        """
+        now, horizon = window(ALERT_HORIZON_DAYS, now)
         alerts = []
 
-        # Upcoming matches (next 7 days)
-        upcoming_matches = match_service.get_upcoming(club_id, team_id=team_id, limit=10)
         for match in upcoming_matches:
-            match_date = match.get('date')
-            if not match_date:
+            # Legacy rows may still hold string dates
+            match_date = parse_date(match.get('date')) or datetime.min
+            if not (now <= match_date < horizon):
                 continue
-            if isinstance(match_date, str):
-                try:
-                    match_date = datetime.fromisoformat(match_date)
-                except (ValueError, TypeError):
-                    continue
             delta = (match_date - now).total_seconds()
-            if delta < 0 or delta > 7 * 86400:
-                continue
             urgent = delta < 48 * 3600
             opponent = match.get('opponent', 'Adversaire')
             location = match.get('location', '')
@@ -144,20 +154,11 @@ class NotificationService:
                 'color': 'red',
             })
 
-        # Upcoming events (next 7 days)
-        upcoming_events = event_service.get_upcoming(club_id, team_id=team_id, limit=15)
         for event in upcoming_events:
-            event_date = event.get('date')
-            if not event_date:
+            event_date = parse_date(event.get('date')) or datetime.min
+            if not (now <= event_date < horizon):
                 continue
-            if isinstance(event_date, str):
-                try:
-                    event_date = datetime.fromisoformat(event_date)
-                except (ValueError, TypeError):
-                    continue
             delta = (event_date - now).total_seconds()
-            if delta < 0 or delta > 7 * 86400:
-                continue
 
             etype = event.get('event_type') or event.get('type', 'other')
             # Skip match-type events (already covered by match_service)
@@ -1,5 +1,7 @@
 from datetime import datetime
 from bson import ObjectId
+from app.services.attendance_service import AttendanceService
+from app.services.dates import iso
 
 
 class ParentMonitoringService:
@@ -7,28 +9,25 @@ class ParentMonitoringService:
         self.db = db
 
     def get_child_progress(self, player_id):
-        player = self.db.players.find_one({'_id': ObjectId(player_id)})
-        if not player:
-            return None
+        from app.services.player_snapshot_service import PlayerSnapshotService
+        return PlayerSnapshotService(self.db).get_progress(player_id)
+
+    def build_child_progress(self, player, injuries=None):
+        """Compute the progress payload from a player doc (used by PlayerSnapshotService)."""
+        player_id = player['_id']
         stats = player.get('stats', {})
         ratings = player.get('technical_ratings', {})
         physical = player.get('physical_records', [])
         matches_played = stats.get('matches_played', 0)
         goals = stats.get('goals', 0)
         assists = stats.get('assists', 0)
-        attendance_records = list(self.db.events.find(
-            {'attendance': {'$elemMatch': {'player_id': str(player['_id'])}}},
-            {'attendance.$': 1, 'type': 1, 'date': 1}
-        ).sort('date', -1).limit(20))
-        total_events = len(attendance_records)
-        present = sum(1 for e in attendance_records
-                      for a in e.get('attendance', [])
-                      if a.get('player_id') == str(player['_id']) and a.get('status') == 'present')
-        attendance_rate = round((present / total_events * 100) if total_events else 0, 1)
-        injuries = list(self.db.injuries.find(
-            {'player_id': ObjectId(player_id)},
-            {'_id': 1, 'injury_type': 1, 'body_part': 1, 'severity': 1, 'status': 1, 'injury_date': 1}
-        ).sort('injury_date', -1).limit(5))
+        attendance = AttendanceService(self.db).get_player_rate(player_id, limit=20)
+        attendance_rate = attendance['rate']
+        if injuries is None:
+            injuries = list(self.db.injuries.find(
+                {'player_id': ObjectId(player_id)},
+                {'_id': 1, 'injury_type': 1, 'body_part': 1, 'severity': 1, 'status': 1, 'injury_date': 1}
+            ).sort('injury_date', -1).limit(5))
         return {
             'player': {
                 'name': player.get('name', ''),
@@ -45,7 +44,7 @@ class ParentMonitoringService:
                 'body_part': i.get('body_part', ''),
                 'severity': i.get('severity', ''),
                 'status': i.get('status', ''),
-                'date': i.get('injury_date'),
+                'date': iso(i.get('injury_date')),
             } for i in injuries],
         }
 
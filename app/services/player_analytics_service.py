@@ -2,6 +2,7 @@
 
 from bson import ObjectId
 from datetime import datetime, timedelta
+from app.services.dates import iso
 
 
 class PlayerAnalyticsService:
@@ -16,8 +17,11 @@ class PlayerAnalyticsService:
 
     # ── Player Dashboard ────────────────────────────────────
 
-    def get_player_dashboard(self, player_id):
-        player = self.players.find_one({'_id': ObjectId(player_id)})
+    def get_player_dashboard(self, player_id, player=None, injuries=None):
+        """Build the dashboard payload. `player` / `injuries` (last 5) may be passed
+        in by PlayerSnapshotService to avoid reading them twice."""
+        if player is None:
+            player = self.players.find_one({'_id': ObjectId(player_id)})
         if not player:
             return None
 
@@ -56,7 +60,9 @@ class PlayerAnalyticsService:
         attendance_rate = round((attended / total_sessions * 100), 1) if total_sessions else 100.0
 
         # Injury summary
-        injury_list = list(self.injuries.find({'player_id': ObjectId(player_id)}).sort('injury_date', -1).limit(5))
+        if injuries is None:
+            injuries = list(self.injuries.find({'player_id': ObjectId(player_id)}).sort('injury_date', -1).limit(5))
+        injury_list = injuries
         active_injury = next((i for i in injury_list if i.get('status') == 'active'), None)
 
         return {
@@ -81,7 +87,7 @@ class PlayerAnalyticsService:
                 'active': {
                     'injury_type': active_injury.get('injury_type'),
                     'body_part': active_injury.get('body_part'),
-                    'expected_return': active_injury.get('expected_return'),
+                    'expected_return': iso(active_injury.get('expected_return')),
                 } if active_injury else None,
             },
             'matches_played': stats.get('matches_played', 0),
@@ -2,6 +2,9 @@
 
 from bson import ObjectId
 from datetime import datetime
+from app.services.player_snapshot_service import PlayerSnapshotService
+from app.services.autocomplete_service import AutocompleteService
+from app.services.search_service import SearchService
 
 class PlayerService:
     """Service for player-related operations"""
@@ -9,6 +12,9 @@ class PlayerService:
     def __init__(self, db):
         self.db = db
         self.collection = db.players
+        self.snapshots = PlayerSnapshotService(db)
+        self.search_index = SearchService(db)
+        self.autocomplete = AutocompleteService(db)
 
     def get_all(self):
         """Get all players"""
@@ -83,6 +89,8 @@ class PlayerService:
         }
         result = self.collection.insert_one(player)
         player['_id'] = result.inserted_id
+        self.search_index.refresh('players', player['_id'])
+        self.autocomplete.invalidate(club_id)
         return player
 
     def update(self, player_id, data):
@@ -106,52 +114,50 @@ class PlayerService:
                 except:
                     pass
         
-        return self.collection.update_one(
-            {'_id': ObjectId(player_id)},
-            {'$set': update_data}
-        )
+        result = self._update_player(player_id, {'$set': update_data})
+        self.search_index.refresh('players', player_id)
+        self.autocomplete.invalidate_for('players', player_id)
+        return result
 
     def update_stats(self, player_id, stats):
         """Update player statistics (goals, assist, etc)"""
-        return self.collection.update_one(
-            {'_id': ObjectId(player_id)},
-            {'$set': {'stats': stats}}
-        )
+        return self._update_player(player_id, {'$set': {'stats': stats}})
 
     def update_technical_ratings(self, player_id, ratings):
         """Update technical ratings (Pace, Shooting, etc)"""
-        return self.collection.update_one(
-            {'_id': ObjectId(player_id)},
-            {'$set': {'technical_ratings': ratings}}
-        )
+        return self._update_player(player_id, {'$set': {'technical_ratings': ratings}})
 
     def add_physical_record(self, player_id, record):
         """Add a physical record (Weight, VMA, etc) to history"""
         record['date'] = datetime.utcnow()
-        return self.collection.update_one(
-            {'_id': ObjectId(player_id)},
-            {'$push': {'physical_history': record}}
-        )
+        return self._update_player(player_id, {'$push': {'physical_history': record}})
 
     def add_evaluation(self, player_id, evaluation):
         """Add coach evaluation"""
         evaluation['date'] = datetime.utcnow()
         evaluation['id'] = str(ObjectId())
-        return self.collection.update_one(
-            {'_id': ObjectId(player_id)},
-            {'$push': {'evaluations': evaluation}}
-        )
+        return self._update_player(player_id, {'$push': {'evaluations': evaluation}})
 
     def set_status(self, player_id, status):
         """Set player status (active, injured, suspended)"""
-        return self.collection.update_one(
-            {'_id': ObjectId(player_id)},
-            {'$set': {'status': status}}
-        )
+        return self._update_player(player_id, {'$set': {'status': status}})
 
     def delete(self, player_id):
         """Delete a player"""
-        return self.collection.delete_one({'_id': ObjectId(player_id)})
+        self.snapshots.invalidate_players([player_id])
+        player = self.collection.find_one({'_id': ObjectId(player_id)}, {'club_id': 1})
+        result = self.collection.delete_one({'_id': ObjectId(player_id)})
+        # After the delete, so a concurrent rebuild cannot cache the deleted player
+        if player:
+            self.autocomplete.invalidate(player.get('club_id'))
+        self.search_index.refresh('players', player_id)
+        return result
+
+    def _update_player(self, player_id, update):
+        """Apply an update that feeds player dashboards and drop the cached snapshot"""
+        result = self.collection.update_one({'_id': ObjectId(player_id)}, update)
+        self.snapshots.invalidate_players([player_id])
+        return result
 
     # ROSTER PRO ACTIONS
     def update_documents(self, player_id, doc_type, status, filename=None):
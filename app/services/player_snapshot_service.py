@@ -0,0 +1,91 @@
+# FootLogic V2 - Player Dashboard Snapshot Service
+
+from bson import ObjectId
+from datetime import datetime, timedelta
+
+# Snapshots are rebuilt at most this often even without an invalidating write
+SNAPSHOT_TTL_SECONDS = 300
+
+
+class PlayerSnapshotService:
+    """Per-player dashboard snapshots shared by the player, parent and coach screens.
+
+    The player dashboard, the parent progress view and the coach player
+    analytics all derive from the same player doc, recent matches, training
+    counts and injuries. A snapshot stores both payloads in `player_snapshots`
+    (one doc per player, TTL index on built_at) so every worker serves them with
+    one indexed read. Writes that change the inputs delete the affected
+    snapshots: see invalidate_players / invalidate_team / invalidate_club.
+    """
+
+    _indexed = set()
+
+    def __init__(self, db):
+        self.db = db
+        self.collection = db.player_snapshots
+        if db.name not in PlayerSnapshotService._indexed:
+            self.collection.create_index('built_at', expireAfterSeconds=SNAPSHOT_TTL_SECONDS)
+            self.collection.create_index('team_id')
+            self.collection.create_index('club_id')
+            PlayerSnapshotService._indexed.add(db.name)
+
+    # ── Reads ───────────────────────────────────────────────
+
+    def get_snapshot(self, player_id):
+        """Return {'dashboard', 'progress'} for a player, rebuilding it when missing or expired."""
+        if not ObjectId.is_valid(str(player_id)):
+            return None
+        cutoff = datetime.utcnow() - timedelta(seconds=SNAPSHOT_TTL_SECONDS)
+        snapshot = self.collection.find_one({'_id': ObjectId(player_id), 'built_at': {'$gte': cutoff}})
+        if snapshot:
+            return snapshot
+        return self.rebuild(player_id)
+
+    def get_dashboard(self, player_id):
+        snapshot = self.get_snapshot(player_id)
+        return snapshot['dashboard'] if snapshot else None
+
+    def get_progress(self, player_id):
+        snapshot = self.get_snapshot(player_id)
+        return snapshot['progress'] if snapshot else None
+
+    def rebuild(self, player_id):
+        """Recompute and store the snapshot of a player."""
+        from app.services.player_analytics_service import PlayerAnalyticsService
+        from app.services.parent_monitoring_service import ParentMonitoringService
+
+        player = self.db.players.find_one({'_id': ObjectId(player_id)})
+        if not player:
+            return None
+        injuries = list(self.db.injuries.find({'player_id': player['_id']}).sort('injury_date', -1).limit(5))
+
+        # BSON dates keep milliseconds: truncate so the returned snapshot equals the stored one
+        now = datetime.utcnow()
+        snapshot = {
+            '_id': player['_id'],
+            'club_id': player.get('club_id'),
+            'team_id': player.get('team_id'),
+            'built_at': now.replace(microsecond=now.microsecond // 1000 * 1000),
+            'dashboard': PlayerAnalyticsService(self.db).get_player_dashboard(
+                player_id, player=player, injuries=injuries),
+            'progress': ParentMonitoringService(self.db).build_child_progress(player, injuries=injuries),
+        }
+        self.collection.replace_one({'_id': player['_id']}, snapshot, upsert=True)
+        return snapshot
+
+    # ── Invalidation ────────────────────────────────────────
+
+    def invalidate_players(self, player_ids):
+        """Attendance, injury, rating and profile writes for specific players."""
+        ids = [ObjectId(str(pid)) for pid in player_ids if pid and ObjectId.is_valid(str(pid))]
+        if ids:
+            self.collection.delete_many({'_id': {'$in': ids}})
+
+    def invalidate_team(self, team_id):
+        """Match and session writes affect every player of the team."""
+        if team_id and ObjectId.is_valid(str(team_id)):
+            self.collection.delete_many({'team_id': ObjectId(str(team_id))})
+
+    def invalidate_club(self, club_id):
+        if club_id and ObjectId.is_valid(str(club_id)):
+            self.collection.delete_many({'club_id': ObjectId(str(club_id))})
@@ -2,13 +2,25 @@
 
 from bson import ObjectId
 from datetime import datetime
+from app.services.fan_engagement_service import FanEngagementService
+from app.services.feed_service import FeedService
+from app.services.search_service import SearchService
+from app.services.text_search import ensure_text_index, search_text
+from app.services.view_counter import views
 
 class PostService:
     """Service for post/feed-related operations"""
+
+    _indexed = set()
     
     def __init__(self, db):
         self.db = db
         self.collection = db.posts
+        if db.name not in PostService._indexed:
+            ensure_text_index(self.collection, 'title', 'content', 'posts_text')
+            PostService._indexed.add(db.name)
+        self.search_index = SearchService(db)
+        self.feed = FeedService(db)
     
     def get_all(self, limit=50):
         """Get all posts sorted by date"""
@@ -41,34 +53,41 @@ class PostService:
             'image': kwargs.get('image', ''),
             'category': kwargs.get('category', 'news'),
             'likes': 0,
+            'reaction_counts': {},
+            'comment_count': 0,
             'comments': [],
             'created_at': datetime.utcnow()
         }
         result = self.collection.insert_one(post)
         post['_id'] = result.inserted_id
+        self.search_index.refresh('posts', post['_id'])
+        self.feed.publish_post(post)
         return post
     
     def update(self, post_id, data):
         """Update post data"""
         data['updated_at'] = datetime.utcnow()
-        return self.collection.update_one(
+        result = self.collection.update_one(
             {'_id': ObjectId(post_id)},
             {'$set': data}
         )
+        self.search_index.refresh('posts', post_id)
+        post = self.get_by_id(post_id)
+        if post:
+            self.feed.publish_post(post)
+        return result
     
-    def like(self, post_id):
-        """Increment like count"""
-        return self.collection.update_one(
-            {'_id': ObjectId(post_id)},
-            {'$inc': {'likes': 1}}
-        )
+    def record_view(self, post_id):
+        """Count a view (buffered, written in batches)"""
+        views.record(self.db, 'posts', post_id)
     
-    def unlike(self, post_id):
-        """Decrement like count"""
-        return self.collection.update_one(
-            {'_id': ObjectId(post_id)},
-            {'$inc': {'likes': -1}}
-        )
+    def like(self, post_id, user_id):
+        """Like a post once per user (a repeated like is ignored)"""
+        return FanEngagementService(self.db).set_reaction(post_id, user_id, 'like', True)
+    
+    def unlike(self, post_id, user_id):
+        """Remove the user's like (no-op if they had not liked the post)"""
+        return FanEngagementService(self.db).set_reaction(post_id, user_id, 'like', False)
     
     def add_comment(self, post_id, user_id, text):
         """Add a comment to a post"""
@@ -97,15 +116,15 @@ class PostService:
     
     def delete(self, post_id):
         """Delete a post"""
-        return self.collection.delete_one({'_id': ObjectId(post_id)})
+        result = self.collection.delete_one({'_id': ObjectId(post_id)})
+        self.search_index.refresh('posts', post_id)
+        self.feed.remove('post', post_id)
+        return result
     
     def search(self, club_id, query, limit=20):
-        """Search posts by title or content"""
-        return list(self.collection.find({
-            'club_id': ObjectId(club_id),
-            '$or': [
-                {'title': {'$regex': query, '$options': 'i'}},
-                {'content': {'$regex': query, '$options': 'i'}}
-            ]
-        }).sort('created_at', -1).limit(limit))
+        """Full-text search of a club's posts, best first (title above content, recent posts boosted).
+
+        "entr*" searches titles starting with "entr".
+        """
+        return search_text(self.collection, ObjectId(club_id), query, 'title', 'created_at', limit)
 
@@ -0,0 +1,267 @@
+# FootLogic V2 - Recurring Events Service
+
+from bson import ObjectId
+from datetime import datetime, timedelta
+from pymongo import ReturnDocument
+from app.services.dates import parse_date
+
+SOURCE_EVENT = 'event'
+SOURCE_TRAINING = 'training'
+
+# Collection holding the materialized occurrences of each source
+SOURCE_COLLECTIONS = {SOURCE_EVENT: 'events', SOURCE_TRAINING: 'training_sessions'}
+
+# Supported RRULE subset: FREQ=WEEKLY with INTERVAL 1 (weekly) or 2 (biweekly)
+INTERVALS = (1, 2)
+
+# How far ahead open-ended queries ("upcoming") expand a series
+UPCOMING_HORIZON_DAYS = 90
+
+_OCCURRENCE_FORMAT = '%Y%m%dT%H%M'
+
+
+def occurrence_id(series_id, date):
+    """Stable id of a not-yet-materialized occurrence: '<series_id>_<YYYYMMDDTHHMM>'."""
+    return f'{series_id}_{date.strftime(_OCCURRENCE_FORMAT)}'
+
+
+def parse_occurrence_id(value):
+    """(series ObjectId, occurrence datetime) or None when `value` is a plain document id."""
+    series_id, sep, stamp = str(value).partition('_')
+    if not sep or not ObjectId.is_valid(series_id):
+        return None
+    try:
+        return ObjectId(series_id), datetime.strptime(stamp, _OCCURRENCE_FORMAT)
+    except ValueError:
+        return None
+
+
+class RecurrenceService:
+    """Recurring events and training sessions stored once, as a series in `recurrences`.
+
+    A series holds the template document and a weekly/biweekly rule
+    (until/count, exception dates). Occurrences are expanded in memory only for
+    the queried window; one is written to `events` / `training_sessions`
+    (with series_id + occurrence_date) the first time attendance is recorded
+    on it, and from then on the stored document replaces the virtual one.
+    """
+
+    _indexed = set()
+
+    def __init__(self, db):
+        self.db = db
+        self.collection = db.recurrences
+        if db.name not in RecurrenceService._indexed:
+            self.collection.create_index([('club_id', 1), ('source', 1), ('dtstart', 1)])
+            for name in SOURCE_COLLECTIONS.values():
+                db[name].create_index(
+                    [('series_id', 1), ('occurrence_date', 1)],
+                    unique=True, partialFilterExpression={'series_id': {'$exists': True}}
+                )
+            RecurrenceService._indexed.add(db.name)
+
+    # ── Series ──────────────────────────────────────────────
+
+    def create(self, source, template, dtstart, interval=1, until=None, count=None, exdates=None):
+        """Store a series. `template` is the document each occurrence is built from."""
+        dtstart = parse_date(dtstart)
+        if source not in SOURCE_COLLECTIONS or not dtstart:
+            raise ValueError('Invalid source or start date')
+        if int(interval) not in INTERVALS:
+            raise ValueError('Only weekly (1) and biweekly (2) recurrences are supported')
+
+        template = {k: v for k, v in template.items() if k not in ('_id', 'date')}
+        series = {
+            'source': source,
+            'club_id': template.get('club_id'),
+            'team_id': ObjectId(str(template['team_id'])) if ObjectId.is_valid(str(template.get('team_id') or '')) else None,
+            'template': template,
+            'dtstart': dtstart,
+            'interval': int(interval),
+            'until': parse_date(until),
+            'count': int(count) if count else None,
+            'exdates': [d for d in (parse_date(x) for x in exdates or []) if d],
+            'created_at': datetime.utcnow(),
+        }
+        series['last_date'] = self._last_date(series)
+        series['_id'] = self.collection.insert_one(series).inserted_id
+        self._on_change(series)
+        return series
+
+    def get(self, series_id):
+        return self.collection.find_one({'_id': ObjectId(series_id)})
+
+    def add_exception(self, series_id, date):
+        """Cancel one occurrence of a series. Raises ValueError for an unparseable date."""
+        exdate = parse_date(date)
+        if not exdate:
+            raise ValueError('Invalid exception date')
+        series = self.collection.find_one_and_update(
+            {'_id': ObjectId(series_id)},
+            {'$addToSet': {'exdates': exdate}},
+            return_document=ReturnDocument.AFTER
+        )
+        if series:
+            self._on_change(series)
+        return series
+
+    def end(self, series_id, until):
+        """Stop a series after `until` (occurrences already materialized are kept)."""
+        series = self.get(series_id)
+        if not series:
+            return None
+        series['until'] = parse_date(until)
+        series['count'] = None
+        series['last_date'] = self._last_date(series)
+        self.collection.update_one(
+            {'_id': series['_id']},
+            {'$set': {'until': series['until'], 'count': None, 'last_date': series['last_date']}}
+        )
+        self._on_change(series)
+        return series
+
+    def delete(self, series_id):
+        series = self.collection.find_one_and_delete({'_id': ObjectId(series_id)})
+        if series:
+            self._on_change(series)
+        return series
+
+    # ── Expansion ───────────────────────────────────────────
+
+    @staticmethod
+    def _step(series):
+        return timedelta(weeks=series.get('interval', 1))
+
+    def _last_date(self, series):
+        if series.get('count'):
+            return series['dtstart'] + self._step(series) * (series['count'] - 1)
+        return series.get('until')
+
+    def occurrences(self, series, start, end):
+        """Occurrence datetimes of a series in [start, end), exceptions excluded.
+
+        Exceptions match by calendar day, so a date-only exception
+        ('2030-01-21', stored as midnight) cancels that day's occurrence.
+        """
+        step = self._step(series)
+        dtstart = series['dtstart']
+        index = 0
+        if start and start > dtstart:
+            index = -((dtstart - start) // step)  # ceil division
+        # Entries that are not dates (written before add_exception validated them) are ignored
+        exdates = {d.date() for d in series.get('exdates') or [] if isinstance(d, datetime)}
+        last = series.get('last_date')
+        while True:
+            current = dtstart + step * index
+            if (end and current >= end) or (last and current > last):
+                return
+            if current.date() not in exdates:
+                yield current
+            index += 1
+
+    def find_series(self, source, club_id, start, end, team_ids=None):
+        query = {
+            'club_id': ObjectId(club_id),
+            'source': source,
+            '$or': [{'last_date': None}, {'last_date': {'$gte': start}}],
+        }
+        if end:
+            query['dtstart'] = {'$lt': end}
+        if team_ids:
+            ids = [ObjectId(t) for t in team_ids if ObjectId.is_valid(str(t))]
+            query['team_id'] = {'$in': ids + [None]}
+        return list(self.collection.find(query))
+
+    def expand(self, source, club_id, start, end=None, team_ids=None, limit=None):
+        """Virtual occurrence documents for the window, sorted by date.
+
+        Occurrences already materialized in the source collection are left out
+        (the range query over that collection returns them).
+        """
+        start = parse_date(start) or datetime.utcnow()
+        end = parse_date(end) or start + timedelta(days=UPCOMING_HORIZON_DAYS)
+        series_list = self.find_series(source, club_id, start, end, team_ids)
+        if not series_list:
+            return []
+
+        materialized = {
+            (doc['series_id'], doc['occurrence_date'])
+            for doc in self.db[SOURCE_COLLECTIONS[source]].find(
+                {'series_id': {'$in': [s['_id'] for s in series_list]},
+                 'occurrence_date': {'$gte': start, '$lt': end}},
+                {'series_id': 1, 'occurrence_date': 1}
+            )
+        }
+        docs = []
+        for series in series_list:
+            for index, date in enumerate(self.occurrences(series, start, end)):
+                if limit and index >= limit:
+                    break
+                if (series['_id'], date) in materialized:
+                    continue
+                docs.append(self._virtual(series, date))
+        docs.sort(key=lambda d: d['date'])
+        return docs[:limit] if limit else docs
+
+    @staticmethod
+    def _virtual(series, date):
+        return {
+            **series['template'],
+            '_id': occurrence_id(series['_id'], date),
+            'date': date,
+            'series_id': series['_id'],
+            'occurrence_date': date,
+            'virtual': True,
+        }
+
+    def _occurrence_series(self, series_id, date):
+        """The series if `date` is one of its (non-cancelled) occurrences, else None."""
+        series = self.collection.find_one({'_id': series_id})
+        if not series or date not in set(self.occurrences(series, date, date + timedelta(minutes=1))):
+            return None
+        return series
+
+    def get_occurrence(self, value):
+        """Document of an occurrence id: the stored one once materialized, else the virtual one."""
+        parsed = parse_occurrence_id(value)
+        if not parsed:
+            return None
+        series_id, date = parsed
+        series = self._occurrence_series(series_id, date)
+        if not series:
+            return None
+        stored = self.db[SOURCE_COLLECTIONS[series['source']]].find_one(
+            {'series_id': series_id, 'occurrence_date': date}
+        )
+        return stored or self._virtual(series, date)
+
+    # ── Materialization ─────────────────────────────────────
+
+    def materialize(self, value):
+        """Return the stored document for an id, writing the occurrence first if it is virtual.
+
+        Plain document ids are returned unchanged (as ObjectId); unknown series
+        or dates that are not occurrences of the series return None.
+        """
+        parsed = parse_occurrence_id(value)
+        if not parsed:
+            return ObjectId(value) if ObjectId.is_valid(str(value)) else None
+        series_id, date = parsed
+        series = self._occurrence_series(series_id, date)
+        if not series:
+            return None
+
+        doc = self.db[SOURCE_COLLECTIONS[series['source']]].find_one_and_update(
+            {'series_id': series_id, 'occurrence_date': date},
+            {'$setOnInsert': {
+                **series['template'],
+                'date': date,
+                'created_at': datetime.utcnow(),
+            }},
+            upsert=True, return_document=ReturnDocument.AFTER, projection={'_id': 1}
+        )
+        return doc['_id']
+
+    def _on_change(self, series):
+        from app.services.ics_service import IcsFeedService
+        IcsFeedService(self.db).invalidate(series.get('club_id'), series.get('team_id'))
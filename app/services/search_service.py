@@ -0,0 +1,361 @@
+# FootLogic V2 - Search Service (in-process inverted indexes with BM25 ranking)
+
+import bisect
+import math
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Query words also match indexed terms they are a prefix of, with a lower weight
+MIN_PREFIX = 2
+PREFIX_WEIGHT = 0.6
+MAX_EXPANSIONS = 30
+
+# How often a worker asks Mongo whether another worker changed an index
+CHECK_SECONDS = 2
+
+# Full rebuild from the source collection, for writes that bypass the services
+REBUILD_SECONDS = 6 * 3600
+
+# In-memory indexes kept per worker (one per club and content type)
+MAX_INDEXES = 256
+
+# Entries re-read below the last seen counter: a write that took its number
+# before a concurrent one but stored its entry after it is picked up next time
+SEQ_LOOKBACK = 20
+
+PUBLIC = 'public'
+
+STOPWORDS = frozenset((
+    'a au aux avec c ce ces cet cette d dans de des du en et est il elle l la le les leur '
+    'lui ma mais me mes mon n ne nos notre nous on ou par pas pour qu que qui s sa se ses '
+    'son sont sur ta te tes ton un une vos votre vous y the of and'
+).split())
+
+_LIGATURES = str.maketrans({'œ': 'oe', 'æ': 'ae', 'ß': 'ss'})
+
+
+def fold(text):
+    """Lowercase and strip accents: 'Équipe Réserve' -> 'equipe reserve'."""
+    text = str(text or '').lower().translate(_LIGATURES)
+    return ''.join(c for c in unicodedata.normalize('NFKD', text) if not unicodedata.combining(c))
+
+
+def tokenize(text):
+    """Folded word tokens without French/English stopwords ("l'équipe" -> ['equipe'])."""
+    return [t for t in re.findall(r'[a-z0-9]+', fold(text)) if t not in STOPWORDS]
+
+
+def _get(doc, path):
+    for key in path.split('.'):
+        if not isinstance(doc, dict):
+            return None
+        doc = doc.get(key)
+    return doc
+
+
+def _text(doc, paths):
+    return ' '.join(str(_get(doc, p)) for p in paths if _get(doc, p) not in (None, '')).strip()
+
+
+# Indexed content types: source collection, weighted fields and display fields
+SOURCES = {
+    'posts': {
+        'collection': 'posts',
+        'fields': {'title': 3, 'content': 1, 'category': 1},
+        'title': ('title',), 'subtitle': ('category',),
+    },
+    'members': {
+        'collection': 'users',
+        'fields': {'profile.first_name': 3, 'profile.last_name': 3, 'role': 1},
+        'title': ('profile.first_name', 'profile.last_name'), 'subtitle': ('role',),
+    },
+    'players': {
+        'collection': 'players',
+        'fields': {'name': 3, 'position': 1, 'jersey_number': 2},
+        'title': ('name',), 'subtitle': ('position',),
+    },
+    'drills': {
+        'collection': 'drills',
+        'fields': {'name': 3, 'description': 1, 'category': 1, 'sub_category': 1},
+        'title': ('name',), 'subtitle': ('category',),
+    },
+    'media': {
+        'collection': 'media',
+        'fields': {'title': 3, 'description': 1, 'category': 1},
+        'title': ('title',), 'subtitle': ('media_type',),
+    },
+}
+
+
+def _club_key(kind, doc):
+    """Index a source document belongs to: its club, or PUBLIC for shared drills."""
+    if kind == 'drills' and doc.get('is_public'):
+        return PUBLIC
+    return str(doc['club_id']) if doc.get('club_id') else None
+
+
+def _source_query(kind, club_key):
+    if club_key == PUBLIC:
+        return {'is_public': True}
+    query = {'club_id': ObjectId(club_key)}
+    if kind == 'drills':
+        query['is_public'] = {'$ne': True}
+    return query
+
+
+def _projection(kind):
+    source = SOURCES[kind]
+    paths = set(source['fields']) | set(source['title']) | set(source['subtitle']) | {'club_id', 'is_public'}
+    return dict.fromkeys(paths, 1)
+
+
+def _entry(kind, doc):
+    """Stored search document for a source document (weighted term frequencies)."""
+    source = SOURCES[kind]
+    terms = {}
+    for path, weight in source['fields'].items():
+        for token in tokenize(_get(doc, path)):
+            terms[token] = terms.get(token, 0) + weight
+    return {
+        'kind': kind,
+        'club_key': _club_key(kind, doc),
+        'doc_id': str(doc['_id']),
+        'terms': terms,
+        'length': sum(terms.values()),
+        'title': _text(doc, source['title']),
+        'subtitle': _text(doc, source['subtitle']),
+    }
+
+
+class _Index:
+    """Inverted index of one content type of one club, held in worker memory."""
+
+    def __init__(self, club_key, kind):
+        self.club_key = club_key
+        self.kind = kind
+        self.lock = threading.Lock()
+        self.reset()
+        self.checked_at = 0.0
+
+    def reset(self, built_at=None):
+        self.postings = {}      # term -> {doc_id: tf}
+        self.doc_terms = {}     # doc_id -> {term: tf}
+        self.lengths = {}       # doc_id -> weighted length
+        self.stubs = {}         # doc_id -> (title, subtitle)
+        self.total_length = 0
+        self.vocabulary = []
+        self.vocabulary_dirty = False
+        self.seq = 0
+        self.built_at = built_at
+
+    def apply(self, entry):
+        """Add, replace or (deleted entries) remove one document."""
+        doc_id = entry['doc_id']
+        for term in self.doc_terms.pop(doc_id, {}):
+            docs = self.postings.get(term)
+            if docs is not None:
+                docs.pop(doc_id, None)
+                if not docs:
+                    del self.postings[term]
+                    self.vocabulary_dirty = True
+        self.total_length -= self.lengths.pop(doc_id, 0)
+        self.stubs.pop(doc_id, None)
+        if entry.get('deleted') or not entry['terms']:
+            return
+        for term, tf in entry['terms'].items():
+            if term not in self.postings:
+                self.postings[term] = {}
+                self.vocabulary_dirty = True
+            self.postings[term][doc_id] = tf
+        self.doc_terms[doc_id] = entry['terms']
+        self.lengths[doc_id] = entry['length']
+        self.total_length += entry['length']
+        self.stubs[doc_id] = (entry['title'], entry['subtitle'])
+
+    def _expand(self, token):
+        """[(term, weight)] matched by a query token: itself, then longer terms it prefixes."""
+        if self.vocabulary_dirty:
+            self.vocabulary = sorted(self.postings)
+            self.vocabulary_dirty = False
+        matches = [(token, 1.0)] if token in self.postings else []
+        if len(token) >= MIN_PREFIX:
+            start = bisect.bisect_right(self.vocabulary, token)
+            for term in self.vocabulary[start:start + MAX_EXPANSIONS]:
+                if not term.startswith(token):
+                    break
+                matches.append((term, PREFIX_WEIGHT))
+        return matches
+
+    def search(self, tokens):
+        """{doc_id: BM25 score} of the documents matching every query token."""
+        with self.lock:
+            n = len(self.lengths)
+            if not n:
+                return {}
+            avgdl = self.total_length / n
+            scores = None
+            for token in tokens:
+                token_scores = {}
+                for term, weight in self._expand(token):
+                    docs = self.postings[term]
+                    idf = math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+                    for doc_id, tf in docs.items():
+                        norm = tf + K1 * (1 - B + B * self.lengths[doc_id] / avgdl)
+                        score = weight * idf * tf * (K1 + 1) / norm
+                        if score > token_scores.get(doc_id, 0):
+                            token_scores[doc_id] = score
+                if scores is None:
+                    scores = token_scores
+                else:
+                    scores = {d: s + token_scores[d] for d, s in scores.items() if d in token_scores}
+                if not scores:
+                    return {}
+            return scores
+
+
+_indexes = OrderedDict()
+_registry_lock = threading.Lock()
+
+
+def _apply_local(entry):
+    """Apply a write to this worker's index right away (others pick it up by seq)."""
+    index = _indexes.get((entry['club_key'], entry['kind']))
+    if index is not None:
+        with index.lock:
+            index.apply(entry)
+
+
+def _get_index(club_key, kind):
+    key = (club_key, kind)
+    with _registry_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = _Index(club_key, kind)
+            while len(_indexes) > MAX_INDEXES:
+                _indexes.popitem(last=False)
+        else:
+            _indexes.move_to_end(key)
+        return index
+
+
+class SearchService:
+    """Club-wide search over posts, members, players, drills and media.
+
+    Each (club, content type) index is persisted in Mongo as one
+    `search_docs` entry per document (weighted term frequencies plus display
+    fields) and a `search_state` counter. Service writes call refresh(),
+    which updates the entry, bumps the counter and patches the local index;
+    every worker keeps the inverted index in memory and pulls the entries
+    written since its last check. An index older than REBUILD_SECONDS is rebuilt from its source
+    collection, which also picks up writes made outside the services.
+    """
+
+    _indexed = set()
+
+    def __init__(self, db):
+        self.db = db
+        self.docs = db.search_docs
+        self.state = db.search_state
+        if db.name not in SearchService._indexed:
+            self.docs.create_index([('club_key', 1), ('kind', 1), ('seq', 1)])
+            SearchService._indexed.add(db.name)
+
+    # ── Queries ─────────────────────────────────────────────
+
+    def search(self, club_id, q, types=None, limit=20):
+        """Ranked hits [{type, id, title, subtitle, score}] for a free-text query."""
+        tokens = list(dict.fromkeys(tokenize(q)))
+        if not tokens:
+            return []
+        hits = []
+        for kind in types or SOURCES:
+            scopes = [str(club_id), PUBLIC] if kind == 'drills' else [str(club_id)]
+            for club_key in scopes:
+                index = self._synced(club_key, kind)
+                for doc_id, score in index.search(tokens).items():
+                    title, subtitle = index.stubs.get(doc_id, ('', ''))
+                    hits.append({'type': kind, 'id': doc_id, 'title': title,
+                                 'subtitle': subtitle, 'score': round(score, 4)})
+        hits.sort(key=lambda h: (-h['score'], h['title']))
+        return hits[:limit]
+
+    def _synced(self, club_key, kind):
+        """In-memory index brought up to date with Mongo (checked every CHECK_SECONDS)."""
+        index = _get_index(club_key, kind)
+        if time.monotonic() - index.checked_at < CHECK_SECONDS:
+            return index
+        with index.lock:
+            if time.monotonic() - index.checked_at < CHECK_SECONDS:
+                return index
+            state = self.state.find_one({'_id': f'{club_key}:{kind}'}) or {}
+            built_at = state.get('built_at')
+            if not built_at or built_at < datetime.utcnow() - timedelta(seconds=REBUILD_SECONDS):
+                state = self.rebuild(club_key, kind)
+                built_at = state['built_at']
+            query = {'club_key': club_key, 'kind': kind}
+            if built_at != index.built_at:
+                index.reset(built_at)
+                self._load(index, query)
+            elif state.get('seq', 0) > index.seq:
+                self._load(index, {**query, 'seq': {'$gt': index.seq - SEQ_LOOKBACK}})
+            index.seq = state.get('seq', 0)
+            index.checked_at = time.monotonic()
+        return index
+
+    def _load(self, index, query):
+        for entry in self.docs.find(query, {'_id': 0}).sort('seq', 1):
+            index.apply(entry)
+
+    # ── Writes ──────────────────────────────────────────────
+
+    def _next_seq(self, club_key, kind):
+        return self.state.find_one_and_update(
+            {'_id': f'{club_key}:{kind}'}, {'$inc': {'seq': 1}},
+            upsert=True, return_document=ReturnDocument.AFTER
+        )['seq']
+
+    def refresh(self, kind, doc_id):
+        """Re-index one source document after a write (a missing document is removed)."""
+        source = SOURCES[kind]
+        doc = self.db[source['collection']].find_one({'_id': ObjectId(doc_id)}, _projection(kind))
+        previous = self.docs.find_one({'_id': f'{kind}:{doc_id}'}, {'club_key': 1})
+        entry = _entry(kind, doc) if doc else None
+
+        if previous and (entry is None or previous['club_key'] != entry['club_key']):
+            seq = self._next_seq(previous['club_key'], kind)
+            self.docs.update_one({'_id': f'{kind}:{doc_id}'},
+                                 {'$set': {'deleted': True, 'terms': {}, 'seq': seq}})
+            _apply_local({'kind': kind, 'club_key': previous['club_key'], 'doc_id': str(doc_id), 'deleted': True})
+        if entry and entry['club_key']:
+            seq = self._next_seq(entry['club_key'], kind)
+            self.docs.replace_one({'_id': f'{kind}:{doc_id}'}, {**entry, 'seq': seq, 'deleted': False},
+                                  upsert=True)
+            _apply_local(entry)
+
+    def rebuild(self, club_key, kind):
+        """Rebuild a (club, type) index from its source collection. Returns the new state."""
+        source = SOURCES[kind]
+        seq = self._next_seq(club_key, kind)
+        ops = []
+        for doc in self.db[source['collection']].find(_source_query(kind, club_key), _projection(kind)):
+            entry = _entry(kind, doc)
+            ops.append(UpdateOne({'_id': f"{kind}:{entry['doc_id']}"},
+                                 {'$set': {**entry, 'seq': seq, 'deleted': False}}, upsert=True))
+        if ops:
+            self.docs.bulk_write(ops, ordered=False)
+        self.docs.delete_many({'club_key': club_key, 'kind': kind, 'seq': {'$lt': seq}})
+        return self.state.find_one_and_update(
+            {'_id': f'{club_key}:{kind}'},
+            {'$set': {'built_at': datetime.utcnow().replace(microsecond=0)}},
+            return_document=ReturnDocument.AFTER
+        )
@@ -0,0 +1,262 @@
+# FootLogic V2 - Competition Standings Service
+
+import re
+from bson import ObjectId
+from datetime import datetime
+from pymongo.errors import DuplicateKeyError
+from app.services.cache import GenerationCache
+
+# Points per result
+POINTS = {'won': 3, 'drawn': 1, 'lost': 0}
+
+# Ranking keys applied in order, per competition type
+#   points / gd / gf / won: table columns (higher is better)
+#   h2h: points earned in the matches between the teams still tied
+TIEBREAKS = {
+    'league': ('points', 'gd', 'gf', 'won'),
+    'cup': ('points', 'gd', 'gf'),
+    'tournament': ('points', 'h2h', 'gd', 'gf'),
+    'friendly': ('points', 'gd', 'gf'),
+}
+
+FORM_LENGTH = 5
+COUNTERS = ('played', 'won', 'drawn', 'lost', 'gf', 'ga', 'points')
+
+# Rendered tables and form guides per competition; every applied result bumps the
+# competition's generation, which drops them on every worker
+_table_cache = GenerationCache('standings', ttl=60, maxsize=512)
+
+
+def participant_key(name):
+    """Stable key for an external team (no '.' or '$' so it can be a field name)."""
+    slug = re.sub(r'[^a-z0-9]+', '-', str(name or '').strip().lower()).strip('-')
+    return f'ext-{slug or "unknown"}'
+
+
+class StandingsService:
+    """League tables maintained incrementally from completed matches.
+
+    `standings_results` keeps the contribution of each completed match linked
+    to a competition (one doc per match, guarded by a revision number) and
+    `standings` one doc per competition with per-team counters. When a match
+    result changes only the difference is $inc'ed into the table; recompute()
+    rebuilds both from `matches`.
+    """
+
+    _indexed = set()
+
+    def __init__(self, db):
+        self.db = db
+        self.collection = db.standings
+        self.results = db.standings_results
+        if db.name not in StandingsService._indexed:
+            self.results.create_index([('competition_id', 1), ('date', -1)])
+            db.matches.create_index([('competition_id', 1), ('status', 1)])
+            StandingsService._indexed.add(db.name)
+
+    # ── Match → result ──────────────────────────────────────
+
+    def _sides(self, match):
+        """(home_key, home_name, away_key, away_name) of a match."""
+        if match.get('home_key') and match.get('away_key'):
+            return match['home_key'], match.get('home_name', ''), match['away_key'], match.get('away_name', '')
+
+        team_id = match.get('team_id')
+        team = self.db.teams.find_one({'_id': team_id}, {'name': 1}) if team_id else None
+        ours = (str(team_id) if team_id else 'club', (team or {}).get('name', 'Club'))
+        opponent = match.get('opponent', '')
+        theirs = (participant_key(opponent), opponent)
+        home, away = (ours, theirs) if match.get('is_home', True) else (theirs, ours)
+        return home[0], home[1], away[0], away[1]
+
+    def _result_for(self, match):
+        """Contribution of a match to its competition table, or None if it does not count."""
+        if not match or match.get('status') != 'completed' or not match.get('competition_id'):
+            return None
+        score = match.get('score') or {}
+        home_key, home_name, away_key, away_name = self._sides(match)
+        return {
+            'competition_id': match['competition_id'],
+            'home_key': home_key, 'home_name': home_name,
+            'away_key': away_key, 'away_name': away_name,
+            'home': int(score.get('home') or 0),
+            'away': int(score.get('away') or 0),
+            'date': match.get('date'),
+        }
+
+    @staticmethod
+    def _deltas(result, sign):
+        """Per-team counter deltas of one result: {key: {counter: n}}."""
+        out = {}
+        for key, gf, ga in ((result['home_key'], result['home'], result['away']),
+                            (result['away_key'], result['away'], result['home'])):
+            outcome = 'won' if gf > ga else 'lost' if gf < ga else 'drawn'
+            out[key] = {'played': sign, outcome: sign, 'gf': sign * gf, 'ga': sign * ga,
+                        'points': sign * POINTS[outcome]}
+        return out
+
+    # ── Incremental updates ─────────────────────────────────
+
+    def apply(self, match, deleted=False):
+        """Bring the tables in line with the current state of a match."""
+        new = None if deleted else self._result_for(match)
+        for _ in range(3):
+            old = self.results.find_one({'_id': match['_id']})
+            if self._same(old, new):
+                return
+            if self._swap(match['_id'], old, new):
+                if old:
+                    self._inc(old, -1)
+                if new:
+                    self._inc(new, +1)
+                return
+        # Lost the race three times: rebuild what we touched
+        for result in (old, new):
+            if result:
+                self.recompute(result['competition_id'])
+
+    @staticmethod
+    def _same(old, new):
+        if old is None or new is None:
+            return old is new
+        return all(old.get(k) == v for k, v in new.items())
+
+    def _swap(self, match_id, old, new):
+        """Replace the stored result, only if nobody changed it since we read it."""
+        if old is None:
+            try:
+                self.results.insert_one({'_id': match_id, 'rev': 1, **new})
+                return True
+            except DuplicateKeyError:
+                return False
+        guard = {'_id': match_id, 'rev': old['rev']}
+        if new is None:
+            return self.results.delete_one(guard).deleted_count == 1
+        return self.results.replace_one(guard, {'rev': old['rev'] + 1, **new}).matched_count == 1
+
+    def _inc(self, result, sign):
+        inc, names = {}, {}
+        for key, counters in self._deltas(result, sign).items():
+            for counter, value in counters.items():
+                inc[f'rows.{key}.{counter}'] = inc.get(f'rows.{key}.{counter}', 0) + value
+        names[f"rows.{result['home_key']}.name"] = result['home_name']
+        names[f"rows.{result['away_key']}.name"] = result['away_name']
+        self.collection.update_one(
+            {'_id': result['competition_id']},
+            {'$inc': inc, '$set': {**names, 'updated_at': datetime.utcnow()}},
+            upsert=True
+        )
+        self.invalidate(result['competition_id'])
+
+    # ── Full recompute ──────────────────────────────────────
+
+    def recompute(self, competition_id):
+        """Rebuild results and table of a competition from its completed matches."""
+        competition_id = ObjectId(competition_id)
+        matches = self.db.matches.find({'competition_id': competition_id, 'status': 'completed'})
+        results = [{'_id': m['_id'], 'rev': 1, **self._result_for(m)} for m in matches]
+
+        rows = {}
+        for result in results:
+            for key, counters in self._deltas(result, 1).items():
+                row = rows.setdefault(key, {c: 0 for c in COUNTERS})
+                for counter, value in counters.items():
+                    row[counter] += value
+            rows[result['home_key']]['name'] = result['home_name']
+            rows[result['away_key']]['name'] = result['away_name']
+
+        self.results.delete_many({'$or': [
+            {'competition_id': competition_id},
+            {'_id': {'$in': [r['_id'] for r in results]}},
+        ]})
+        if results:
+            self.results.insert_many(results)
+        self.collection.replace_one(
+            {'_id': competition_id},
+            {'rows': rows, 'updated_at': datetime.utcnow()},
+            upsert=True
+        )
+        self.invalidate(competition_id)
+        return len(results)
+
+    # ── Reads ───────────────────────────────────────────────
+
+    def invalidate(self, competition_id):
+        _table_cache.bump(self.db, str(competition_id))
+
+    def get_table(self, competition_id):
+        """Ranked rows [{rank, key, name, played, won, drawn, lost, gf, ga, gd, points, form}]."""
+        return _table_cache.get_or_set(self.db, str(competition_id), ('table',),
+                                       lambda: self._build_table(ObjectId(competition_id)))
+
+    def get_form_guide(self, competition_id):
+        """Last FORM_LENGTH results per team, most recent first: {key: ['W', 'D', 'L', ...]}."""
+        return _table_cache.get_or_set(self.db, str(competition_id), ('form',),
+                                       lambda: self._build_form(ObjectId(competition_id)))
+
+    def _build_form(self, competition_id):
+        form = {}
+        cursor = self.results.find({'competition_id': competition_id}).sort('date', -1)
+        for result in cursor:
+            for key, gf, ga in ((result['home_key'], result['home'], result['away']),
+                                (result['away_key'], result['away'], result['home'])):
+                letters = form.setdefault(key, [])
+                if len(letters) < FORM_LENGTH:
+                    letters.append('W' if gf > ga else 'L' if gf < ga else 'D')
+        return form
+
+    def _build_table(self, competition_id):
+        doc = self.collection.find_one({'_id': competition_id}) or {}
+        competition = self.db.competitions.find_one({'_id': competition_id}, {'type': 1}) or {}
+        rules = TIEBREAKS.get(competition.get('type'), TIEBREAKS['league'])
+
+        rows = []
+        for key, row in (doc.get('rows') or {}).items():
+            if not row.get('played'):
+                continue
+            row = {**{c: row.get(c, 0) for c in COUNTERS}, 'key': key, 'name': row.get('name', key)}
+            row['gd'] = row['gf'] - row['ga']
+            rows.append(row)
+
+        rows = self._rank(competition_id, rows, rules)
+        form = self._build_form(competition_id)
+        for rank, row in enumerate(rows, start=1):
+            row['rank'] = rank
+            row['form'] = form.get(row['key'], [])
+        return rows
+
+    def _rank(self, competition_id, rows, rules):
+        """Sort rows by the rules; 'h2h' is resolved within groups tied on the previous keys."""
+        if 'h2h' not in rules:
+            return sorted(rows, key=lambda r: tuple(-r[k] for k in rules) + (r['name'],))
+
+        split = rules.index('h2h')
+        before, after = rules[:split], rules[split + 1:]
+        groups = {}
+        for row in rows:
+            groups.setdefault(tuple(row[k] for k in before), []).append(row)
+
+        ranked = []
+        for _, group in sorted(groups.items(), key=lambda item: tuple(-v for v in item[0])):
+            if len(group) > 1:
+                h2h = self._head_to_head(competition_id, {r['key'] for r in group})
+                for row in group:
+                    row['h2h'] = h2h.get(row['key'], 0)
+            else:
+                group[0]['h2h'] = 0
+            ranked += sorted(group, key=lambda r: (-r['h2h'],) + tuple(-r[k] for k in after) + (r['name'],))
+        for row in ranked:
+            row.pop('h2h', None)
+        return ranked
+
+    def _head_to_head(self, competition_id, keys):
+        points = dict.fromkeys(keys, 0)
+        cursor = self.results.find({
+            'competition_id': competition_id,
+            'home_key': {'$in': list(keys)},
+            'away_key': {'$in': list(keys)},
+        })
+        for result in cursor:
+            for key, counters in self._deltas(result, 1).items():
+                points[key] += counters['points']
+        return points
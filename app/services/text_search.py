@@ -0,0 +1,84 @@
+# FootLogic V2 - MongoDB Text Search ($text with recency ranking)
+
+import re
+from datetime import datetime
+
+TEXT_LANGUAGE = 'french'
+
+# Best textScore matches re-ranked with the recency boost
+CANDIDATES = 200
+
+# A document this old keeps half of its text score
+RECENCY_HALF_LIFE_DAYS = 30
+
+_WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def ensure_text_index(collection, title_field, content_field, name):
+    """Text index on (club_id, title, content), title weighted above content.
+
+    club_id is an equality prefix, so a search only walks the club's keys.
+    """
+    collection.create_index(
+        [('club_id', 1), (title_field, 'text'), (content_field, 'text')],
+        weights={title_field: 10, content_field: 3},
+        default_language=TEXT_LANGUAGE,
+        name=name,
+    )
+
+
+def text_terms(query):
+    """User input as plain $search words.
+
+    Quotes and leading '-' would turn words into phrases and negations, so
+    only the words themselves are kept.
+    """
+    return ' '.join(_WORD_RE.findall(query or ''))
+
+
+def prefix_of(query):
+    """The prefix of a prefix query ("entr*"), or None."""
+    query = (query or '').strip()
+    if query.endswith('*') and query.rstrip('*').strip():
+        return query.rstrip('*').strip()
+    return None
+
+
+def search_text(collection, club_id, query, title_field, date_field, limit=20):
+    """Club documents matching `query`, best first.
+
+    Matches are scored with textScore times a recency factor that halves
+    every RECENCY_HALF_LIFE_DAYS. A prefix query ("entr*"), or a single word
+    that $text cannot find (a word still being typed), falls back to an
+    anchored, case-insensitive regex on the title, newest first.
+    """
+    prefix = prefix_of(query)
+    if prefix is None:
+        terms = text_terms(query)
+        if not terms:
+            return []
+        hits = _text_search(collection, club_id, terms, date_field, limit)
+        if hits or ' ' in terms:
+            return hits
+        prefix = terms
+    return list(collection.find({
+        'club_id': club_id,
+        title_field: {'$regex': '^' + re.escape(prefix), '$options': 'i'},
+    }).sort(date_field, -1).limit(limit))
+
+
+def _text_search(collection, club_id, terms, date_field, limit):
+    now = datetime.utcnow()
+    half_life_ms = RECENCY_HALF_LIFE_DAYS * 86400 * 1000
+    age_ms = {'$max': [0, {'$subtract': [now, {'$ifNull': [f'${date_field}', now]}]}]}
+    return list(collection.aggregate([
+        {'$match': {'club_id': club_id, '$text': {'$search': terms, '$language': TEXT_LANGUAGE}}},
+        {'$sort': {'score': {'$meta': 'textScore'}}},
+        {'$limit': CANDIDATES},
+        {'$addFields': {'score': {'$multiply': [
+            {'$meta': 'textScore'},
+            {'$pow': [0.5, {'$divide': [age_ms, half_life_ms]}]},
+        ]}}},
+        {'$sort': {'score': -1}},
+        {'$limit': limit},
+    ]))
@@ -2,6 +2,13 @@
 
 from bson import ObjectId
 from datetime import datetime, timedelta
+from pymongo import UpdateOne
+from app.services.attendance_service import AttendanceService, SOURCE_TRAINING
+from app.services.player_snapshot_service import PlayerSnapshotService
+from app.services.dates import parse_date
+from app.services.ics_service import IcsFeedService
+from app.services.search_service import SearchService
+from app.services.recurrence_service import RecurrenceService, SOURCE_TRAINING as SERIES_TRAINING
 
 
 class TrainingService:
@@ -12,6 +19,8 @@ class TrainingService:
         self.plans = db.training_plans
         self.sessions = db.training_sessions
         self.drills = db.drills
+        self.attendance = AttendanceService(db)
+        self.recurrences = RecurrenceService(db)
 
     # ── Training Plans ──────────────────────────────────────
 
@@ -22,8 +31,8 @@ class TrainingService:
             'coach_id': ObjectId(coach_id),
             'name': data['name'],
             'type': data.get('type', 'weekly'),          # weekly | monthly | seasonal
-            'start_date': data.get('start_date'),
-            'end_date': data.get('end_date'),
+            'start_date': parse_date(data.get('start_date')),
+            'end_date': parse_date(data.get('end_date')),
             'focus_area': data.get('focus_area', 'mixed'),  # technical | tactical | physical | mixed
             'description': data.get('description', ''),
             'status': 'active',
@@ -44,14 +53,23 @@ class TrainingService:
     def update_plan(self, plan_id, data):
         allowed = {'name', 'type', 'start_date', 'end_date', 'focus_area', 'description', 'status'}
         update = {k: v for k, v in data.items() if k in allowed}
+        for field in ('start_date', 'end_date'):
+            if field in update:
+                update[field] = parse_date(update[field])
         if update:
             update['updated_at'] = datetime.utcnow()
             self.plans.update_one({'_id': ObjectId(plan_id)}, {'$set': update})
         return True
 
     def delete_plan(self, plan_id):
+        session_ids = self.sessions.distinct('_id', {'plan_id': ObjectId(plan_id)})
+        if session_ids:
+            self.attendance.collection.delete_many({'source': SOURCE_TRAINING, 'ref_id': {'$in': session_ids}})
         self.sessions.delete_many({'plan_id': ObjectId(plan_id)})
-        self.plans.delete_one({'_id': ObjectId(plan_id)})
+        self.recurrences.collection.delete_many({'source': SERIES_TRAINING, 'template.plan_id': ObjectId(plan_id)})
+        plan = self.plans.find_one_and_delete({'_id': ObjectId(plan_id)})
+        if session_ids and plan:
+            IcsFeedService(self.db).invalidate(plan.get('club_id'), plan.get('team_id'))
         return True
 
     # ── Training Sessions ───────────────────────────────────
@@ -60,12 +78,31 @@ class TrainingService:
         plan = self.get_plan(plan_id)
         if not plan:
             return None
-        session = {
-            'plan_id': ObjectId(plan_id),
+        session = self._build_session(plan, coach_id, data)
+        result = self.sessions.insert_one(session)
+        IcsFeedService(self.db).invalidate(session['club_id'], session['team_id'])
+        return str(result.inserted_id)
+
+    def create_recurring_sessions(self, plan_id, coach_id, data, interval=1, until=None, count=None, exdates=None):
+        """Weekly/biweekly sessions stored once as a series (see RecurrenceService).
+
+        Returns the series id, or None if the plan does not exist.
+        """
+        plan = self.get_plan(plan_id)
+        if not plan:
+            return None
+        template = self._build_session(plan, coach_id, data)
+        until = until or plan.get('end_date')
+        series = self.recurrences.create(SERIES_TRAINING, template, data.get('date'), interval, until, count, exdates)
+        return str(series['_id'])
+
+    def _build_session(self, plan, coach_id, data):
+        return {
+            'plan_id': plan['_id'],
             'team_id': plan['team_id'],
             'club_id': plan['club_id'],
             'coach_id': ObjectId(coach_id),
-            'date': data.get('date'),
+            'date': parse_date(data.get('date')),
             'duration': data.get('duration', 90),        # minutes
             'location': data.get('location', ''),
             'focus': data.get('focus', 'mixed'),
@@ -76,8 +113,6 @@ class TrainingService:
             'status': 'planned',                          # planned | completed | cancelled
             'created_at': datetime.utcnow(),
         }
-        result = self.sessions.insert_one(session)
-        return str(result.inserted_id)
 
     def get_sessions(self, plan_id=None, team_id=None, limit=20):
         query = {}
@@ -94,49 +129,81 @@ class TrainingService:
         allowed = {'date', 'duration', 'location', 'focus', 'drills',
                     'coach_notes', 'training_load', 'status'}
         update = {k: v for k, v in data.items() if k in allowed}
+        if 'date' in update:
+            update['date'] = parse_date(update['date'])
         if update:
             update['updated_at'] = datetime.utcnow()
-            self.sessions.update_one({'_id': ObjectId(session_id)}, {'$set': update})
+            session = self.sessions.find_one_and_update(
+                {'_id': ObjectId(session_id)}, {'$set': update}, projection={'club_id': 1, 'team_id': 1}
+            )
+            if session and 'status' in update:
+                # Completed-session counts feed the player dashboards
+                PlayerSnapshotService(self.db).invalidate_team(session.get('team_id'))
+            if session and update.keys() & {'date', 'duration', 'location', 'status'}:
+                IcsFeedService(self.db).invalidate(session.get('club_id'), session.get('team_id'))
         return True
 
     def mark_attendance(self, session_id, player_id, status, reason=None, rating=None):
-        session = self.get_session(session_id)
-        if not session:
-            return False
-        attendance = session.get('attendance', [])
-        # Update existing or append
-        found = False
-        for a in attendance:
-            if str(a.get('player_id')) == str(player_id):
-                a['status'] = status
-                a['reason'] = reason
-                a['rating'] = rating
-                found = True
-                break
-        if not found:
-            attendance.append({
-                'player_id': ObjectId(player_id),
-                'status': status,
-                'reason': reason,
-                'rating': rating,
-            })
-        self.sessions.update_one(
-            {'_id': ObjectId(session_id)},
-            {'$set': {'attendance': attendance, 'updated_at': datetime.utcnow()}}
-        )
-        return True
+        return self.bulk_attendance(session_id, [{
+            'player_id': player_id,
+            'status': status,
+            'reason': reason,
+            'rating': rating,
+        }]) is not None
 
     def bulk_attendance(self, session_id, records):
-        """records = [{player_id, status, reason?, rating?}]"""
+        """records = [{player_id, status, reason?, rating?}]
+
+        Applied as a single bulk_write: per player, an arrayFilters $set for an
+        existing row and a $push guarded by `$ne` for a new one. Re-sending the
+        same batch is a no-op and concurrent coaches never overwrite each
+        other's rows. Returns counts from the attendance store, or None if the
+        session does not exist.
+        """
+        # Occurrences of a recurring series are stored on first attendance
+        session_id = self.recurrences.materialize(session_id)
+        if not session_id:
+            return None
+        session = self.sessions.find_one(
+            {'_id': session_id}, {'club_id': 1, 'team_id': 1, 'date': 1}
+        )
+        if not session:
+            return None
+
+        now = datetime.utcnow()
+        normalized = []
+        ops = []
         for rec in records:
-            self.mark_attendance(
-                session_id,
-                rec['player_id'],
-                rec['status'],
-                rec.get('reason'),
-                rec.get('rating'),
-            )
-        return True
+            if not rec.get('player_id'):
+                continue
+            row = {
+                'player_id': ObjectId(rec['player_id']),
+                'status': rec['status'],
+                'reason': rec.get('reason'),
+                'rating': rec.get('rating'),
+            }
+            normalized.append(row)
+            ops.append(UpdateOne(
+                {'_id': session['_id'], 'attendance.player_id': row['player_id']},
+                {'$set': {
+                    'attendance.$[a].status': row['status'],
+                    'attendance.$[a].reason': row['reason'],
+                    'attendance.$[a].rating': row['rating'],
+                    'updated_at': now,
+                }},
+                array_filters=[{'a.player_id': row['player_id']}],
+            ))
+            ops.append(UpdateOne(
+                {'_id': session['_id'], 'attendance.player_id': {'$ne': row['player_id']}},
+                {'$push': {'attendance': row}, '$set': {'updated_at': now}},
+            ))
+        if not ops:
+            return {'matched': 0, 'modified': 0, 'upserted': 0}
+
+        self.sessions.bulk_write(ops, ordered=True)
+        return self.attendance.bulk_upsert(
+            SOURCE_TRAINING, session_id, normalized, context=AttendanceService.context_from(session)
+        )
 
     # ── Drill Library ───────────────────────────────────────
 
@@ -172,6 +239,7 @@ class TrainingService:
             'created_at': datetime.utcnow(),
         }
         result = self.drills.insert_one(drill)
+        SearchService(self.db).refresh('drills', result.inserted_id)
         return str(result.inserted_id)
 
     def update_drill(self, drill_id, data):
@@ -182,6 +250,7 @@ class TrainingService:
         if update:
             update['updated_at'] = datetime.utcnow()
             self.drills.update_one({'_id': ObjectId(drill_id)}, {'$set': update})
+            SearchService(self.db).refresh('drills', drill_id)
         return True
 
     # ── Training Load ───────────────────────────────────────
@@ -191,7 +260,7 @@ class TrainingService:
         cutoff = datetime.utcnow() - timedelta(weeks=weeks)
         pipeline = [
             {'$match': {
-                'date': {'$gte': cutoff.isoformat()},
+                'date': {'$gte': cutoff},
                 'attendance.player_id': ObjectId(player_id),
                 'status': 'completed',
             }},
@@ -0,0 +1,184 @@
+# FootLogic V2 - Content-Addressed Upload Store
+
+import hashlib
+import hmac
+import mimetypes
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from bson import ObjectId
+
+# <sha256>.<ext>
+KEY_RE = re.compile(r'^[0-9a-f]{64}\.[a-z0-9]{1,5}$')
+
+URL_PREFIX = '/api/files'
+
+# Hashed blobs never change, so public ones can be cached for good
+PUBLIC_CACHE = 'public, max-age=31536000, immutable'
+PRIVATE_CACHE = 'private, no-cache'
+
+# Roles that may read every private file of their club
+STAFF_ROLES = {'admin', 'coach', 'superadmin'}
+
+# Lifetime of a signed link to a private file (opened by a plain <a href>)
+SIGNED_URL_SECONDS = 300
+
+
+def blob_key(data, ext):
+    """Storage key of some bytes: their SHA-256 plus the file extension."""
+    return f'{hashlib.sha256(data).hexdigest()}.{ext.lower()}'
+
+
+def is_valid_key(key):
+    return bool(KEY_RE.match(key or ''))
+
+
+def _signature(key, expires, secret):
+    return hmac.new(secret.encode(), f'{key}:{expires}'.encode(), hashlib.sha256).hexdigest()
+
+
+def signed_url(key, secret, expires_in=SIGNED_URL_SECONDS):
+    """URL of a private file that works without a token until it expires."""
+    expires = int(time.time()) + expires_in
+    return f'{URL_PREFIX}/{key}?expires={expires}&sig={_signature(key, expires, secret)}'
+
+
+def check_signature(key, expires, sig, secret):
+    """Whether `sig` was issued by signed_url() for this key and has not expired."""
+    try:
+        expires = int(expires)
+    except (TypeError, ValueError):
+        return False
+    return expires >= time.time() and hmac.compare_digest(_signature(key, expires, secret), sig or '')
+
+
+class LocalBlobStore:
+    """Blobs on the local filesystem under <root>/ab/cd/<sha256>.<ext>.
+
+    Keys are content hashes, so blobs are immutable. Writing bytes that are
+    already stored is a no-op; new blobs are written to a temporary file
+    then renamed, so readers never see partial files.
+    """
+
+    def __init__(self, root):
+        self.root = root
+
+    @staticmethod
+    def relative_path(key):
+        """Path of the blob below the store root, as used by X-Accel-Redirect."""
+        digest = key.split('.', 1)[0]
+        return f'{digest[:2]}/{digest[2:4]}/{key}'
+
+    def path(self, key):
+        return os.path.join(self.root, *self.relative_path(key).split('/'))
+
+    def exists(self, key):
+        return os.path.exists(self.path(key))
+
+    def put(self, data, ext):
+        """Store the bytes (once) and return their key."""
+        key = blob_key(data, ext)
+        path = self.path(key)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f'{path}.tmp{os.getpid()}-{threading.get_ident()}'
+            with open(tmp, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, path)
+        return key
+
+
+class UploadService:
+    """Uploaded files: bytes in a LocalBlobStore, ownership in the `uploads` collection.
+
+    Identical files share one blob and one document; every club and user
+    that uploaded it is added to it. Public blobs (logos, photos) can be
+    read by anyone; private ones (player documents) only by their owners
+    and the staff of their clubs.
+    """
+
+    def __init__(self, db, store):
+        self.db = db
+        self.collection = db.uploads
+        self.store = store
+
+    def save(self, data, ext, club_id=None, user_id=None, public=True):
+        """Store bytes and record who uploaded them. Returns {'key', 'url', 'size'}."""
+        key = self.store.put(data, ext)
+        update = {
+            '$setOnInsert': {
+                'size': len(data),
+                'content_type': mimetypes.guess_type(key)[0] or 'application/octet-stream',
+                'created_at': datetime.utcnow(),
+            },
+        }
+        owners = {}
+        if club_id:
+            owners['club_ids'] = ObjectId(club_id)
+        if user_id:
+            owners['user_ids'] = ObjectId(user_id)
+        if owners:
+            update['$addToSet'] = owners
+        # Once a blob has been published it stays readable by anyone
+        if public:
+            update['$set'] = {'public': True}
+        else:
+            update['$setOnInsert']['public'] = False
+        self.collection.update_one({'_id': key}, update, upsert=True)
+        return {'key': key, 'url': self.url(key), 'size': len(data)}
+
+    def save_file(self, file_storage, ext, **owners):
+        return self.save(file_storage.read(), ext, **owners)
+
+    def get(self, key):
+        if not is_valid_key(key):
+            return None
+        return self.collection.find_one({'_id': key})
+
+    def can_read(self, upload, user):
+        """Whether a JWT payload (or None) may download this upload."""
+        if upload.get('public'):
+            return True
+        if not user:
+            return False
+        if user.get('role') == 'superadmin':
+            return True
+        if user.get('user_id') and ObjectId.is_valid(user['user_id']) \
+                and ObjectId(user['user_id']) in upload.get('user_ids', []):
+            return True
+        club_id = user.get('club_id')
+        return (user.get('role') in STAFF_ROLES and bool(club_id) and ObjectId.is_valid(club_id)
+                and ObjectId(club_id) in upload.get('club_ids', []))
+
+    @staticmethod
+    def url(key):
+        return f'{URL_PREFIX}/{key}'
+
+
+def send_blob(store, upload):
+    """Response for an authorized download.
+
+    With UPLOAD_ACCEL set to 'x-accel' (nginx) or 'x-sendfile' (Apache,
+    lighttpd) Flask only answers with headers and the web server sends the
+    file itself; otherwise Flask streams it (send_file lets gunicorn use
+    sendfile() too).
+    """
+    from flask import Response, current_app, send_file
+
+    key = upload['_id']
+    cache = PUBLIC_CACHE if upload.get('public') else PRIVATE_CACHE
+    accel = current_app.config.get('UPLOAD_ACCEL')
+    if accel == 'x-accel':
+        response = Response(content_type=upload['content_type'])
+        prefix = current_app.config.get('UPLOAD_ACCEL_PREFIX', '/_uploads/')
+        response.headers['X-Accel-Redirect'] = prefix.rstrip('/') + '/' + store.relative_path(key)
+    elif accel == 'x-sendfile':
+        response = Response(content_type=upload['content_type'])
+        response.headers['X-Sendfile'] = os.path.abspath(store.path(key))
+    else:
+        response = send_file(store.path(key), mimetype=upload['content_type'], etag=key.split('.', 1)[0],
+                             conditional=True)
+    response.headers['Cache-Control'] = cache
+    return response
@@ -1,14 +1,36 @@
 # FootLogic V2 - User Service (Authentication & Users)
 
+import re
 from werkzeug.security import check_password_hash, generate_password_hash
 from bson import ObjectId
+from app.services.autocomplete_service import AutocompleteService
+from app.services.search_service import SearchService
+
+# Sort keys accepted by list_members ('-' prefix for descending)
+MEMBER_SORTS = {
+    'name': [('profile.last_name', 1), ('profile.first_name', 1)],
+    'email': [('email', 1)],
+    'role': [('role', 1), ('profile.last_name', 1)],
+    'status': [('account_status', 1), ('profile.last_name', 1)],
+    'created_at': [('created_at', 1)],
+}
+
+MAX_PER_PAGE = 200
 
 class UserService:
     """Service for user-related operations"""
 
+    _indexed = set()
+
     def __init__(self, db):
         self.db = db
         self.collection = db.users
+        if db.name not in UserService._indexed:
+            # Default member list order (list_members sort='name')
+            self.collection.create_index([('club_id', 1), ('profile.last_name', 1), ('profile.first_name', 1), ('_id', 1)])
+            UserService._indexed.add(db.name)
+        self.search_index = SearchService(db)
+        self.autocomplete = AutocompleteService(db)
 
     def get_all(self):
         """Get all users"""
@@ -58,6 +80,8 @@ class UserService:
         }
         result = self.collection.insert_one(user)
         user['_id'] = result.inserted_id
+        self.search_index.refresh('members', user['_id'])
+        self.autocomplete.invalidate(club_id)
         return user
 
     def create_pending_user(self, email, role='player', club_id=None, profile=None):
@@ -100,10 +124,13 @@ class UserService:
 
     def update_profile(self, user_id, profile_data):
         """Update user profile"""
-        return self.collection.update_one(
+        result = self.collection.update_one(
             {'_id': ObjectId(user_id)},
             {'$set': {'profile': profile_data}}
         )
+        self.search_index.refresh('members', user_id)
+        self.autocomplete.invalidate_for('users', user_id)
+        return result
 
     def get_users_by_club(self, club_id):
         """Get all users for a club"""
@@ -115,7 +142,13 @@ class UserService:
 
     def delete(self, user_id):
         """Delete a user"""
-        return self.collection.delete_one({'_id': ObjectId(user_id)})
+        user = self.collection.find_one({'_id': ObjectId(user_id)}, {'club_id': 1})
+        result = self.collection.delete_one({'_id': ObjectId(user_id)})
+        # After the delete, so a concurrent rebuild cannot cache the deleted member
+        if user:
+            self.autocomplete.invalidate(user.get('club_id'))
+        self.search_index.refresh('members', user_id)
+        return result
 
     def search_members(self, club_id, search='', role='', team_id='', status=''):
         """Search club members with optional filters.
@@ -160,6 +193,100 @@ class UserService:
 
         return members
 
+    def _member_scope(self, club_id, search='', team_id=''):
+        """Club + text search + team filter, shared by the page and its facet counts."""
+        clauses = [{'club_id': ObjectId(club_id) if isinstance(club_id, str) else club_id}]
+        # Every word must match the email, first name or last name
+        for word in str(search or '').split():
+            pattern = re.compile(re.escape(word), re.IGNORECASE)
+            clauses.append({'$or': [
+                {'email': pattern},
+                {'profile.first_name': pattern},
+                {'profile.last_name': pattern},
+            ]})
+        if team_id and ObjectId.is_valid(team_id):
+            player_user_ids = self.db.players.distinct('user_id', {'team_id': ObjectId(team_id)})
+            clauses.append({'$or': [{'team_id': ObjectId(team_id)}, {'_id': {'$in': player_user_ids}}]})
+        return clauses[0] if len(clauses) == 1 else {'$and': clauses}
+
+    def list_members(self, club_id, search='', role='', team_id='', status='', sort='name',
+                     page=1, per_page=None):
+        """One page of club members with role/status facet counts.
+
+        Filters, search and sort run in MongoDB; player profiles are joined
+        ($lookup) for the returned page only. The page is its own aggregation,
+        streamed by cursor (the sort can use the club/name index and no single
+        result document has to hold every member); the counts come from one
+        $facet. Facet counts ignore their own filter (role counts apply the
+        status filter and vice versa) so the filter UI can show what each
+        choice would return. Without per_page every matching member is returned.
+
+        Returns {'items', 'total', 'page', 'per_page', 'facets': {'role', 'status'}}.
+        """
+        role_filter = {'role': role} if role else {}
+        status_filter = {'account_status': status} if status else {}
+        keys = MEMBER_SORTS.get(str(sort).lstrip('-'), MEMBER_SORTS['name'])
+        direction = -1 if str(sort).startswith('-') else 1
+        page = max(1, int(page or 1))
+        per_page = min(int(per_page), MAX_PER_PAGE) if per_page else 0
+
+        scope = self._member_scope(club_id, search, team_id)
+
+        items = [
+            {'$match': {'$and': [scope, role_filter, status_filter]}},
+            {'$sort': dict([(k, d * direction) for k, d in keys] + [('_id', direction)])},
+        ]
+        if per_page:
+            items += [{'$skip': (page - 1) * per_page}, {'$limit': per_page}]
+        items += [
+            {'$project': {'password_hash': 0}},
+            {'$lookup': {'from': 'players', 'localField': '_id', 'foreignField': 'user_id', 'as': 'players'}},
+        ]
+        members = list(self.collection.aggregate(items))
+
+        result = next(self.collection.aggregate([
+            {'$match': scope},
+            {'$facet': {
+                'total': [{'$match': {**role_filter, **status_filter}}, {'$count': 'n'}],
+                'role': [{'$match': status_filter}, {'$group': {'_id': '$role', 'n': {'$sum': 1}}}],
+                'status': [{'$match': role_filter}, {'$group': {'_id': '$account_status', 'n': {'$sum': 1}}}],
+            }},
+        ]), {})
+
+        for member in members:
+            players = member.pop('players', [])
+            if players:
+                member['player_data'] = self._player_data(players[0])
+        return {
+            'items': members,
+            'total': result['total'][0]['n'] if result.get('total') else 0,
+            'page': page,
+            'per_page': per_page,
+            'facets': {
+                name: {str(row['_id'] or ''): row['n'] for row in result.get(name, [])}
+                for name in ('role', 'status')
+            },
+        }
+
+    @staticmethod
+    def _player_data(player):
+        birth_date = player.get('birth_date')
+        if birth_date:
+            birth_date = birth_date.isoformat() if hasattr(birth_date, 'isoformat') else str(birth_date)
+        return {
+            'player_id': str(player['_id']),
+            'team_id': str(player.get('team_id', '')) if player.get('team_id') else '',
+            'jersey_number': player.get('jersey_number'),
+            'position': player.get('position'),
+            'photo': player.get('photo'),
+            'birth_date': birth_date,
+            'height': player.get('height'),
+            'weight': player.get('weight'),
+            'documents': player.get('documents', {}),
+            'license_number': player.get('license_number'),
+            'status': player.get('status', 'active')
+        }
+
 
 # Role-based access helpers
 ROLE_PERMISSIONS = {
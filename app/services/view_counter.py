@@ -0,0 +1,89 @@
+# FootLogic V2 - Buffered View Counters
+
+import atexit
+import logging
+import threading
+from collections import Counter
+from bson import ObjectId
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+# Pending increments are written at least this often...
+FLUSH_SECONDS = 5
+
+# ...or as soon as this many views are waiting
+MAX_PENDING = 500
+
+
+class ViewCounter:
+    """In-process buffer for view/open counters.
+
+    record() only bumps an in-memory counter per (collection, field, id);
+    a background thread writes them with one unordered bulk_write per
+    collection every FLUSH_SECONDS, or earlier once MAX_PENDING views are
+    waiting. A popular document therefore gets one $inc per flush instead
+    of one per view. Pending views are flushed at interpreter exit; if a
+    flush fails they are kept for the next one.
+    """
+
+    def __init__(self, flush_seconds=FLUSH_SECONDS, max_pending=MAX_PENDING):
+        self.flush_seconds = flush_seconds
+        self.max_pending = max_pending
+        self.db = None
+        self._pending = {}      # (collection, field) -> Counter({doc_id: n})
+        self._count = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def record(self, db, collection, doc_id, field='views', n=1):
+        """Count `n` views of a document; written to Mongo on the next flush."""
+        with self._lock:
+            self.db = db
+            self._pending.setdefault((collection, field), Counter())[ObjectId(doc_id)] += n
+            self._count += n
+            if self._thread is None and self.flush_seconds:
+                self._thread = threading.Thread(target=self._run, name='view-counter', daemon=True)
+                self._thread.start()
+            if self._count >= self.max_pending:
+                self._wake.set()
+
+    def pending(self, collection, doc_id, field='views'):
+        """Views of a document recorded but not flushed yet."""
+        with self._lock:
+            return self._pending.get((collection, field), {}).get(ObjectId(doc_id), 0)
+
+    def flush(self):
+        """Write every pending increment now. Returns the number of documents updated."""
+        with self._lock:
+            pending, self._pending, self._count = self._pending, {}, 0
+            db = self.db
+        if not pending or db is None:
+            return 0
+        written = 0
+        for (collection, field), counts in pending.items():
+            ops = [UpdateOne({'_id': doc_id}, {'$inc': {field: n}}) for doc_id, n in counts.items()]
+            try:
+                db[collection].bulk_write(ops, ordered=False)
+                written += len(ops)
+            except Exception:
+                logger.exception('View counter flush failed for %s.%s', collection, field)
+                with self._lock:
+                    self._pending.setdefault((collection, field), Counter()).update(counts)
+                    self._count += sum(counts.values())
+        return written
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('View counter flush failed')
+
+
+# Shared by every request of this worker process
+views = ViewCounter()
+atexit.register(views.flush)
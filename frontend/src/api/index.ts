@@ -38,6 +38,14 @@ export const eventsApi = {
   upcoming: (params?: { club_id?: string; team_id?: string }) =>
     client.get<Event[]>('/calendar/upcoming', { params }),
 
+  // Merged matches/events/trainings for one window (e.g. the visible month)
+  calendar: (params: { start: string; end: string; team_id?: string; types?: string }) =>
+    client.get('/calendar', { params }),
+
+  // Tokenized .ics subscription URL for phone calendars
+  calendarFeed: (data: { scope: 'user' | 'team'; team_id?: string }) =>
+    client.post('/calendar/feeds', data),
+
   getAll: (params?: { club_id?: string }) =>
     client.get<Event[]>('/events', { params }),
 
@@ -61,6 +69,44 @@ export const postsApi = {
   create: (data: object) => client.post('/posts', data),
 }
 
+// ─── Files ───────────────────────────────────────────────────────────────────
+export const filesApi = {
+  // Private uploads need a token, which plain links never send: open them
+  // through a short-lived signed URL instead. Other URLs open as-is.
+  open: async (url: string) => {
+    if (!url.startsWith('/api/files/')) {
+      window.open(url, '_blank', 'noopener')
+      return
+    }
+    // Opened before the request so popup blockers allow it
+    const win = window.open('', '_blank')
+    try {
+      const { data } = await client.get<{ url: string }>(`${url.slice('/api'.length)}/link`)
+      if (win) win.location.href = data.url
+      else window.location.href = data.url
+    } catch (err) {
+      win?.close()
+      throw err
+    }
+  },
+}
+
+// ─── Feed ────────────────────────────────────────────────────────────────────
+export const feedApi = {
+  // Older pages with cursor (next_cursor), new entries with since (latest)
+  get: (params?: { team_id?: string; types?: string; limit?: number; cursor?: string; since?: string }) =>
+    client.get('/feed', { params }),
+}
+
+// ─── Search ──────────────────────────────────────────────────────────────────
+export const searchApi = {
+  search: (q: string, types?: string[], limit?: number) =>
+    client.get('/search', { params: { q, types: types?.join(','), limit } }),
+
+  members: (q: string, types?: ('member' | 'player')[], limit?: number) =>
+    client.get('/autocomplete/members', { params: { q, types: types?.join(','), limit } }),
+}
+
 // ─── Players ─────────────────────────────────────────────────────────────────
 export const playersApi = {
   getAll: (params?: { club_id?: string; team_id?: string }) =>
@@ -198,7 +244,8 @@ export const coachApi = {
 // ─── Admin ───────────────────────────────────────────────────────────────────
 export const adminApi = {
   dashboard: () => client.get('/admin/dashboard'),
-  members: () => client.get('/admin/members'),
+  members: (params?: { q?: string; role?: string; status?: string; team_id?: string; sort?: string; page?: number; per_page?: number }) =>
+    client.get('/admin/members', { params }),
   addMember: (data: object) => client.post('/admin/members', data),
   updateMember: (id: string, data: object) => client.put(`/admin/members/${id}`, data),
   deleteMember: (id: string) => client.delete(`/admin/members/${id}`),
@@ -217,7 +264,7 @@ export const adminApi = {
   cancelSubscription: () => client.delete('/admin/subscription'),
   invite: (data: object) => client.post('/admin/invite', data),
   resetPassword: (id: string) => client.post(`/admin/members/${id}/reset-password`),
-  announcements: () => client.get('/admin/announcements'),
+  announcements: (q?: string) => client.get('/admin/announcements', { params: { q } }),
   createAnnouncement: (data: object) => client.post('/admin/announcement', data),
   emailCampaigns: () => client.get('/admin/email/campaigns'),
   createEmailCampaign: (data: object) => client.post('/admin/email/campaigns', data),
@@ -385,7 +432,10 @@ export const isyApi = {
 
 // ─── Fan ─────────────────────────────────────────────────────────────────────
 export const fanApi = {
-  comments: (postId: string) => client.get(`/fan/comments/${postId}`),
+  comments: (postId: string, params?: { cursor?: string; limit?: number; replies?: number }) =>
+    client.get(`/fan/comments/${postId}`, { params }),
+  commentReplies: (commentId: string, params?: { cursor?: string; limit?: number }) =>
+    client.get(`/fan/comments/${commentId}/replies`, { params }),
   createComment: (postId: string, data: object) => client.post(`/fan/comments/${postId}`, data),
   toggleReaction: (postId: string, data?: object) => client.post(`/fan/reactions/${postId}`, data),
   polls: () => client.get('/fan/polls'),
@@ -393,9 +443,12 @@ export const fanApi = {
   votePoll: (pollId: string, optionIndex: number) => client.post(`/fan/polls/${pollId}/vote`, { option_index: optionIndex }),
   media: (params?: { category?: string }) => client.get('/fan/media', { params }),
   mediaDetail: (id: string) => client.get(`/fan/media/${id}`),
+  topMedia: (limit?: number) => client.get('/fan/media/top', { params: { limit } }),
   uploadMedia: (data: object) => client.post('/fan/media', data),
   // Public match endpoints
   matchTimeline: (matchId: string) => client.get(`/matches/${matchId}/timeline`),
   matchStats: (matchId: string) => client.get(`/matches/${matchId}/stats`),
+  // Server-sent events: snapshot, score, timeline and stats messages
+  matchLive: (matchId: string) => new EventSource(`${client.defaults.baseURL}/matches/${matchId}/live`),
   matchFixtures: (clubId: string) => client.get(`/matches/fixtures/${clubId}`),
 }
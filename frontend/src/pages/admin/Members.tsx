@@ -1,5 +1,5 @@
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query'
-import { adminApi } from '../../api'
+import { adminApi, filesApi } from '../../api'
 import { useTeam } from '../../contexts/TeamContext'
 import { useState, useCallback, useRef, useEffect } from 'react'
 import { Users, UserPlus, Trash2, Search, Mail, Sprout, Edit3, Key, X, CheckCircle2, XCircle, Shield, Camera, FileText, AlertTriangle, Upload } from 'lucide-react'
@@ -718,14 +718,13 @@ export default function Members() {
                           </div>
                           <div className="flex items-center gap-2">
                             {file && (
-                              <a
-                                href={file}
-                                target="_blank"
-                                rel="noopener noreferrer"
+                              <button
+                                type="button"
+                                onClick={() => filesApi.open(file)}
                                 className="btn-secondary text-xs flex-1"
                               >
                                 Voir
-                              </a>
+                              </button>
                             )}
                             <button
                               type="button"
@@ -1,5 +1,5 @@
 import { useQuery, useQueryClient } from '@tanstack/react-query'
-import { playerApi } from '../../api'
+import { playerApi, filesApi } from '../../api'
 import { useState, useRef } from 'react'
 import { FolderKanban, FileText, Upload, CheckCircle, AlertCircle, ExternalLink, Loader2 } from 'lucide-react'
 
@@ -91,10 +91,10 @@ export default function Documents() {
                     <p className="text-xs text-gray-500">le {doc.uploaded_at}</p>
                   )}
                   {doc.url && (
-                    <a href={doc.url} target="_blank" rel="noreferrer"
+                    <button type="button" onClick={() => filesApi.open(doc.url)}
                       className="inline-flex items-center gap-1 text-xs text-pitch-400 hover:text-pitch-300 transition-colors mt-1">
                       <ExternalLink size={11} /> Voir le document
-                    </a>
+                    </button>
                   )}
                 </div>
               ) : (
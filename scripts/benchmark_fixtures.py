@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the fixture generator (no database needed).
+
+Plans a multi-division double round-robin plus a knockout bracket with venue
+and blackout constraints, builds the match documents that
+CompetitionService.generate_fixtures would insert_many, and reports timings.
+Exits non-zero if a run exceeds --budget seconds.
+"""
+
+from bson import ObjectId
+import argparse
+import time
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.fixture_generator import (
+    Scheduler, plan_league, plan_knockout, knockout_first_round, build_match_docs,
+)
+
+
+def run(divisions, teams, venues, cup_size):
+    club_id = ObjectId()
+    competition = {'_id': ObjectId(), 'name': 'Benchmark'}
+    participants = {
+        f'd{d}-t{t}': {'key': f'd{d}-t{t}', 'name': f'Team {d}.{t}', 'team_id': None}
+        for d in range(divisions) for t in range(teams)
+    }
+    scheduler = Scheduler(
+        '2030-09-07', kickoff='15:00',
+        venues={key: f'Stade {i % venues}' for i, key in enumerate(participants)},
+        blackout_dates=['2030-12-21', '2030-12-28', '2031-01-04'],
+    )
+
+    docs = []
+    for d in range(divisions):
+        scheduler.restart()
+        keys = [f'd{d}-t{t}' for t in range(teams)]
+        fixtures = plan_league(keys, scheduler, double=True, division=f'D{d}')
+        docs += build_match_docs(club_id, competition, fixtures, participants)
+
+    scheduler.restart()
+    cup = list(participants)[:cup_size]
+    fixtures, _ = plan_knockout(knockout_first_round(cup), scheduler, 1, 'Coupe')
+    docs += build_match_docs(club_id, competition, fixtures, participants)
+    return docs
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark fixture generation')
+    parser.add_argument('--divisions', type=int, default=8)
+    parser.add_argument('--teams', type=int, default=24, help='teams per division')
+    parser.add_argument('--venues', type=int, default=40, help='shared venues')
+    parser.add_argument('--cup-size', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--budget', type=float, default=1.0, help='max seconds per run')
+    args = parser.parse_args()
+
+    timings = []
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        docs = run(args.divisions, args.teams, args.venues, args.cup_size)
+        timings.append(time.perf_counter() - started)
+
+    print(f"{args.divisions} divisions x {args.teams} teams + {args.cup_size}-team cup: {len(docs)} matches")
+    print(f"  best {min(timings) * 1000:.1f} ms, worst {max(timings) * 1000:.1f} ms over {args.repeat} runs")
+    sys.exit(0 if max(timings) < args.budget else 1)
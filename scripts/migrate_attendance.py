@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Migration script to copy embedded attendance into the `attendance` collection.
+
+Events store attendance as a {player_id: status} map, training sessions as a
+list of {player_id, status, reason, rating}, and some legacy events as a list
+of {player_id: str, status}. Every shape is upserted into one record per
+(source, ref_id, player_id), so the script can be re-run safely.
+"""
+
+from pymongo import MongoClient
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.attendance_service import AttendanceService, SOURCE_EVENT, SOURCE_TRAINING
+
+
+def _records_from(attendance):
+    """Normalize any embedded attendance shape to [{player_id, status, ...}]"""
+    if isinstance(attendance, dict):
+        return [{'player_id': pid, 'status': status} for pid, status in attendance.items()]
+    records = []
+    for item in attendance or []:
+        if isinstance(item, dict) and item.get('player_id'):
+            rec = {'player_id': item['player_id'], 'status': item.get('status', 'present')}
+            for key in ('reason', 'rating'):
+                if item.get(key) is not None:
+                    rec[key] = item[key]
+            records.append(rec)
+        elif isinstance(item, str):
+            records.append({'player_id': item, 'status': 'present'})
+    return records
+
+
+def _migrate(collection, source, service):
+    docs = collection.find(
+        {'attendance': {'$exists': True, '$nin': [{}, [], None]}},
+        {'attendance': 1, 'club_id': 1, 'team_id': 1, 'date': 1}
+    )
+    totals = {'docs': 0, 'matched': 0, 'modified': 0, 'upserted': 0}
+    for doc in docs:
+        counts = service.bulk_upsert(
+            source, doc['_id'], _records_from(doc['attendance']),
+            context=AttendanceService.context_from(doc)
+        )
+        totals['docs'] += 1
+        for key, value in counts.items():
+            totals[key] += value
+    return totals
+
+
+def migrate_attendance(mongo_uri='mongodb://mongodb:27017/', db_name='footapp'):
+    """Copy events/training_sessions attendance into the attendance collection"""
+
+    try:
+        client = MongoClient(mongo_uri)
+        db = client[db_name]
+        service = AttendanceService(db)
+
+        for collection, source in ((db.events, SOURCE_EVENT), (db.training_sessions, SOURCE_TRAINING)):
+            totals = _migrate(collection, source, service)
+            print(f"  ✓ {collection.name}: {totals['docs']} document(s), "
+                  f"{totals['upserted']} inserted, {totals['modified']} updated")
+
+        print("\n✓ Migration complete.")
+        client.close()
+        return True
+
+    except Exception as e:
+        print(f"✗ Migration failed: {e}", file=sys.stderr)
+        return False
+
+
+if __name__ == '__main__':
+    mongo_uri = os.getenv('MONGO_URI', 'mongodb://mongodb:27017/')
+    db_name = os.getenv('DB_NAME', 'footapp')
+
+    print(f"Migrating attendance in {db_name} at {mongo_uri}")
+    success = migrate_attendance(mongo_uri, db_name)
+    sys.exit(0 if success else 1)
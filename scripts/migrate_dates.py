@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Migration script converting string date fields to BSON dates.
+
+Walks every (collection, field) listed in app.services.dates.DATE_FIELDS in
+_id order, converting string values in batches with one bulk_write each. The
+last processed _id is checkpointed in `migration_checkpoints`, so an
+interrupted run resumes where it stopped. Unparseable values are left as-is
+and reported. Use --reset to start over from the first document.
+"""
+
+from pymongo import MongoClient, UpdateOne
+import argparse
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.dates import DATE_FIELDS, ensure_date_indexes, parse_date
+
+CHECKPOINT_PREFIX = 'dates'
+
+
+def migrate_field(db, collection_name, field, batch_size=500, reset=False):
+    """Convert one field of one collection. Returns (converted, skipped)."""
+    checkpoints = db.migration_checkpoints
+    checkpoint_id = f'{CHECKPOINT_PREFIX}:{collection_name}.{field}'
+    if reset:
+        checkpoints.delete_one({'_id': checkpoint_id})
+    checkpoint = checkpoints.find_one({'_id': checkpoint_id}) or {}
+    last_id = checkpoint.get('last_id')
+
+    collection = db[collection_name]
+    converted = skipped = 0
+    while True:
+        query = {field: {'$type': 'string'}}
+        if last_id is not None:
+            query['_id'] = {'$gt': last_id}
+        batch = list(collection.find(query, {field: 1}).sort('_id', 1).limit(batch_size))
+        if not batch:
+            break
+
+        ops = []
+        for doc in batch:
+            raw = doc.get(field)
+            parsed = parse_date(raw)
+            if parsed is not None:
+                ops.append(UpdateOne({'_id': doc['_id'], field: raw}, {'$set': {field: parsed}}))
+            elif raw == '':
+                ops.append(UpdateOne({'_id': doc['_id'], field: ''}, {'$set': {field: None}}))
+            else:
+                skipped += 1
+                print(f"    ! {collection_name}.{field} {doc['_id']}: unparseable '{raw}'")
+        if ops:
+            converted += collection.bulk_write(ops, ordered=False).modified_count
+
+        last_id = batch[-1]['_id']
+        checkpoints.update_one(
+            {'_id': checkpoint_id},
+            {'$set': {'last_id': last_id, 'converted': converted, 'skipped': skipped}},
+            upsert=True
+        )
+    return converted, skipped
+
+
+def migrate_dates(mongo_uri='mongodb://mongodb:27017/', db_name='footapp', batch_size=500, reset=False):
+    """Convert every string date field listed in DATE_FIELDS"""
+
+    try:
+        client = MongoClient(mongo_uri)
+        db = client[db_name]
+
+        for collection_name, fields in DATE_FIELDS.items():
+            for field in fields:
+                converted, skipped = migrate_field(db, collection_name, field, batch_size, reset)
+                print(f"  ✓ {collection_name}.{field}: {converted} converted, {skipped} skipped")
+
+        ensure_date_indexes(db)
+        print("  ✓ date range indexes ensured")
+
+        print("\n✓ Migration complete.")
+        client.close()
+        return True
+
+    except Exception as e:
+        print(f"✗ Migration failed (re-run to resume from the last checkpoint): {e}", file=sys.stderr)
+        return False
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Convert string date fields to BSON dates')
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--reset', action='store_true', help='ignore saved checkpoints')
+    args = parser.parse_args()
+
+    mongo_uri = os.getenv('MONGO_URI', 'mongodb://mongodb:27017/')
+    db_name = os.getenv('DB_NAME', 'footapp')
+
+    print(f"Migrating date fields in {db_name} at {mongo_uri}")
+    success = migrate_dates(mongo_uri, db_name, args.batch_size, args.reset)
+    sys.exit(0 if success else 1)
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Migration script to move embedded poll voters into the `poll_votes` collection.
+
+Polls used to keep a `voters` array of user ids. Each voter becomes one
+poll_votes entry (the chosen option was never stored, so option_index is
+None), `total_votes` is set from the option tallies and the array is
+removed. Existing entries are left alone, so the script can be re-run safely.
+"""
+
+from pymongo import MongoClient, UpdateOne
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.fan_engagement_service import FanEngagementService
+
+
+def migrate_poll_votes(mongo_uri='mongodb://mongodb:27017/', db_name='footapp'):
+    """Copy polls.voters into poll_votes and drop the arrays"""
+
+    try:
+        client = MongoClient(mongo_uri)
+        db = client[db_name]
+        FanEngagementService(db)  # creates the unique (poll_id, user_id) index
+
+        polls = 0
+        votes = 0
+        for poll in db.polls.find({'voters': {'$exists': True}}, {'voters': 1, 'options': 1, 'created_at': 1}):
+            ops = [UpdateOne(
+                {'poll_id': poll['_id'], 'user_id': voter},
+                {'$setOnInsert': {'option_index': None, 'created_at': poll.get('created_at')}},
+                upsert=True
+            ) for voter in poll.get('voters') or []]
+            if ops:
+                votes += db.poll_votes.bulk_write(ops, ordered=False).upserted_count
+            db.polls.update_one({'_id': poll['_id']}, {
+                '$set': {'total_votes': sum(o.get('votes', 0) for o in poll.get('options', []))},
+                '$unset': {'voters': ''},
+            })
+            polls += 1
+
+        print(f"  ✓ {polls} poll(s), {votes} vote(s) inserted")
+        print("\n✓ Migration complete.")
+        client.close()
+        return True
+
+    except Exception as e:
+        print(f"✗ Migration failed: {e}", file=sys.stderr)
+        return False
+
+
+if __name__ == '__main__':
+    mongo_uri = os.getenv('MONGO_URI', 'mongodb://mongodb:27017/')
+    db_name = os.getenv('DB_NAME', 'footapp')
+
+    print(f"Migrating poll votes in {db_name} at {mongo_uri}")
+    success = migrate_poll_votes(mongo_uri, db_name)
+    sys.exit(0 if success else 1)
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Rebuild the materialized news feed timelines.
+
+Feed entries are normally written by the services when posts, match results,
+announcements and media are created or changed. This script recreates the
+club timeline and every team timeline of one club (--club <id>) or of all
+clubs from the source collections. Run it once after deploying the feed, and
+after creating a team so its timeline gets the club's history.
+"""
+
+from pymongo import MongoClient
+from bson import ObjectId
+import argparse
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.feed_service import FeedService
+
+
+def rebuild_feeds(mongo_uri='mongodb://mongodb:27017/', db_name='footapp', club_id=None):
+    """Recreate the timelines of one or every club"""
+
+    try:
+        client = MongoClient(mongo_uri)
+        db = client[db_name]
+        service = FeedService(db)
+
+        club_ids = [ObjectId(club_id)] if club_id else db.clubs.distinct('_id')
+        for cid in club_ids:
+            count = service.rebuild(cid)
+            print(f"  {cid}: {count} entries")
+
+        print(f"✓ {len(club_ids)} club feeds rebuilt.")
+        client.close()
+        return True
+
+    except Exception as e:
+        print(f"✗ Rebuild failed: {e}", file=sys.stderr)
+        return False
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Rebuild club and team news feed timelines')
+    parser.add_argument('--club', help='only this club id')
+    args = parser.parse_args()
+
+    mongo_uri = os.getenv('MONGO_URI', 'mongodb://mongodb:27017/')
+    db_name = os.getenv('DB_NAME', 'footapp')
+
+    print(f"Rebuilding news feeds in {db_name} at {mongo_uri}")
+    success = rebuild_feeds(mongo_uri, db_name, args.club)
+    sys.exit(0 if success else 1)
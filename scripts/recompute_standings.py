@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Rebuild competition standings from completed matches.
+
+Tables are normally maintained incrementally by MatchService (set_score,
+finish_match, update, delete). This script recomputes them from scratch, for
+one competition (--competition <id>) or for all of them, e.g. after a bulk
+import or a manual fix in the database.
+"""
+
+from pymongo import MongoClient
+from bson import ObjectId
+import argparse
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.standings_service import StandingsService
+
+
+def recompute_standings(mongo_uri='mongodb://mongodb:27017/', db_name='footapp', competition_id=None):
+    """Recompute one or every competition table"""
+
+    try:
+        client = MongoClient(mongo_uri)
+        db = client[db_name]
+        service = StandingsService(db)
+
+        if competition_id:
+            competition_ids = [ObjectId(competition_id)]
+        else:
+            competition_ids = db.competitions.distinct('_id')
+
+        for cid in competition_ids:
+            count = service.recompute(cid)
+            print(f"  ✓ {cid}: {count} completed matches")
+
+        print(f"\n✓ {len(competition_ids)} competition tables rebuilt.")
+        client.close()
+        return True
+
+    except Exception as e:
+        print(f"✗ Recompute failed: {e}", file=sys.stderr)
+        return False
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Rebuild competition standings from matches')
+    parser.add_argument('--competition', help='only this competition id')
+    args = parser.parse_args()
+
+    mongo_uri = os.getenv('MONGO_URI', 'mongodb://mongodb:27017/')
+    db_name = os.getenv('DB_NAME', 'footapp')
+
+    print(f"Recomputing standings in {db_name} at {mongo_uri}")
+    success = recompute_standings(mongo_uri, db_name, args.competition)
+    sys.exit(0 if success else 1)
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Rebuild the denormalized reaction and comment counters of posts and comments.
+
+Counters (reaction_counts, likes, comment_count, and the reply_count of each
+comment) are normally maintained by FanEngagementService when reactions and
+comments are written. This script recomputes them from the reactions and
+comments collections, for one post (--post <id>) or for all of them. Run it
+once after deploying the counters: likes recorded before then were anonymous
+increments and are replaced by the number of actual 'like' reactions, and
+comments written before threading get their reply_count.
+
+Before recounting it deletes duplicate reactions (same post, user and type,
+left by the old read-then-write toggle) and creates the unique
+(post_id, user_id, type) index, which cannot be built while they exist.
+Deploy order: run this script from the new release (e.g.
+`docker compose run --rm web python scripts/recount_post_counters.py`)
+before starting the new web containers. Until it has run, the app still
+starts but logs a warning and works without the unique index.
+"""
+
+from pymongo import MongoClient
+from bson import ObjectId
+import argparse
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.fan_engagement_service import FanEngagementService
+
+
+def dedupe_reactions(db):
+    """Keep the oldest of each (post, user, type) reaction and delete the others"""
+    removed = 0
+    for group in db.reactions.aggregate([
+        {'$sort': {'_id': 1}},
+        {'$group': {
+            '_id': {'post_id': '$post_id', 'user_id': '$user_id', 'type': '$type'},
+            'ids': {'$push': '$_id'},
+            'count': {'$sum': 1},
+        }},
+        {'$match': {'count': {'$gt': 1}}},
+    ], allowDiskUse=True):
+        removed += db.reactions.delete_many({'_id': {'$in': group['ids'][1:]}}).deleted_count
+    return removed
+
+
+def recount_post_counters(mongo_uri='mongodb://mongodb:27017/', db_name='footapp', post_id=None):
+    """Recompute the counters of one or every post"""
+
+    try:
+        client = MongoClient(mongo_uri)
+        db = client[db_name]
+        removed = dedupe_reactions(db)
+        if removed:
+            print(f"✓ {removed} duplicate reactions removed.")
+        # Builds the unique reactions index now that it can succeed
+        db.reactions.create_index([('post_id', 1), ('user_id', 1), ('type', 1)], unique=True)
+        service = FanEngagementService(db)
+
+        if post_id:
+            post_ids = [ObjectId(post_id)]
+        else:
+            post_ids = db.posts.distinct('_id')
+
+        for pid in post_ids:
+            service.recount(pid)
+
+        print(f"✓ {len(post_ids)} posts recounted.")
+        client.close()
+        return True
+
+    except Exception as e:
+        print(f"✗ Recount failed: {e}", file=sys.stderr)
+        return False
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Rebuild post reaction and comment counters')
+    parser.add_argument('--post', help='only this post id')
+    args = parser.parse_args()
+
+    mongo_uri = os.getenv('MONGO_URI', 'mongodb://mongodb:27017/')
+    db_name = os.getenv('DB_NAME', 'footapp')
+
+    print(f"Recounting post counters in {db_name} at {mongo_uri}")
+    success = recount_post_counters(mongo_uri, db_name, args.post)
+    sys.exit(0 if success else 1)
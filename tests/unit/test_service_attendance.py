@@ -0,0 +1,87 @@
+"""Tests for AttendanceService."""
+from datetime import datetime
+
+
+def get_service(app):
+    with app.app_context():
+        from app.services import get_attendance_service
+        return get_attendance_service()
+
+
+def test_event_attendance_is_mirrored(app, seed_club, seed_team, seed_player):
+    """set_bulk_attendance should upsert records into the attendance collection."""
+    with app.app_context():
+        from app.services import get_event_service
+        events = get_event_service()
+        event = events.create(str(seed_club['_id']), 'Séance', 'training', datetime.utcnow(),
+                              team_id=seed_team['_id'])
+        events.set_bulk_attendance(str(event['_id']), {str(seed_player['_id']): 'present'})
+        events.set_bulk_attendance(str(event['_id']), {str(seed_player['_id']): 'absent'})
+
+        svc = get_service(app)
+        att = svc.get_for('event', str(event['_id']))
+        assert att == {str(seed_player['_id']): 'absent'}
+
+
+def test_bulk_upsert_is_idempotent(app, seed_club, seed_player):
+    """Re-sending the same records should not create duplicates."""
+    with app.app_context():
+        from bson import ObjectId
+        svc = get_service(app)
+        ref_id = ObjectId()
+        records = [{'player_id': str(seed_player['_id']), 'status': 'present'}]
+        first = svc.bulk_upsert('training', ref_id, records)
+        second = svc.bulk_upsert('training', ref_id, records)
+        assert first['upserted'] == 1
+        assert second['upserted'] == 0
+        assert svc.collection.count_documents({'ref_id': ref_id}) == 1
+
+
+def test_player_and_team_rates(app, seed_club, seed_team, seed_player):
+    """Rates should count attended records and ignore pending RSVPs."""
+    with app.app_context():
+        from bson import ObjectId
+        svc = get_service(app)
+        context = {'club_id': seed_club['_id'], 'team_id': seed_team['_id'], 'date': datetime.utcnow()}
+        pid = str(seed_player['_id'])
+        for status in ('present', 'late', 'absent', 'convoked'):
+            svc.record('event', ObjectId(), pid, status, context=context)
+
+        rate = svc.get_player_rate(pid)
+        assert rate['total'] == 3
+        assert rate['attended'] == 2
+        assert rate['rate'] == 66.7
+
+        team = svc.get_team_rates(str(seed_team['_id']))
+        assert team[pid]['total'] == 3
+
+
+def test_training_bulk_attendance_single_row_per_player(app, seed_club, seed_team, seed_coach, seed_player):
+    """bulk_attendance should update rows in place and stay idempotent."""
+    with app.app_context():
+        from app.services import get_training_service
+        svc = get_training_service()
+        plan_id = svc.create_plan(str(seed_club['_id']), str(seed_team['_id']),
+                                  str(seed_coach['_id']), {'name': 'Plan'})
+        session_id = svc.create_session(plan_id, str(seed_coach['_id']), {'date': datetime.utcnow()})
+        pid = str(seed_player['_id'])
+
+        svc.bulk_attendance(session_id, [{'player_id': pid, 'status': 'present'}])
+        counts = svc.bulk_attendance(session_id, [{'player_id': pid, 'status': 'late', 'rating': 7}])
+        assert counts['upserted'] == 0
+
+        session = svc.get_session(session_id)
+        assert len(session['attendance']) == 1
+        assert session['attendance'][0]['status'] == 'late'
+        assert session['attendance'][0]['rating'] == 7
+
+
+def test_team_rates_route_is_limited_to_own_club(app, db, client, seed_team, seed_coach):
+    """Coaches only get rates for teams of their club."""
+    from bson import ObjectId
+    other = db.teams.insert_one({'club_id': ObjectId(), 'name': 'Ailleurs'}).inserted_id
+    with app.test_request_context():
+        from app.routes.api import generate_token
+        headers = {'Authorization': f'Bearer {generate_token(seed_coach)}'}
+    assert client.get(f'/api/coach/attendance/rates?team_id={other}', headers=headers).status_code == 404
+    assert client.get(f"/api/coach/attendance/rates?team_id={seed_team['_id']}", headers=headers).status_code == 200
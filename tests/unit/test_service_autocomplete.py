@@ -0,0 +1,106 @@
+"""Tests for AutocompleteService (per-club prefix trie)."""
+from bson import ObjectId
+
+
+def get_service(app):
+    with app.app_context():
+        from app.services import get_autocomplete_service
+        return get_autocomplete_service()
+
+
+def _names(results):
+    return [r['name'] for r in results]
+
+
+def test_complete_matches_name_prefixes_without_accents(app, seed_club):
+    """Each query word must prefix a folded first or last name token."""
+    with app.app_context():
+        from app.services import get_user_service
+        users = get_user_service()
+        users.create('a@x.fr', 'pw', role='player', club_id=seed_club['_id'],
+                     profile={'first_name': 'Élodie', 'last_name': 'Martin'})
+        users.create('b@x.fr', 'pw', role='coach', club_id=seed_club['_id'],
+                     profile={'first_name': 'Marc', 'last_name': 'Durand'})
+        users.create('c@x.fr', 'pw', role='player', club_id=ObjectId(),
+                     profile={'first_name': 'Marco', 'last_name': 'Ailleurs'})
+        svc = get_service(app)
+
+        assert _names(svc.complete(seed_club['_id'], 'elo')) == ['Élodie Martin']
+        assert _names(svc.complete(seed_club['_id'], 'mar')) == ['Élodie Martin', 'Marc Durand']
+        assert _names(svc.complete(seed_club['_id'], 'mar coach')) == ['Marc Durand']
+        assert svc.complete(seed_club['_id'], 'zz') == []
+
+
+def test_delete_invalidates_after_the_document_is_gone(app, db, seed_club, seed_player, monkeypatch):
+    """The version bump follows the delete, so a rebuild racing it cannot keep the deleted entry."""
+    with app.app_context():
+        from app.services import get_player_service, get_user_service
+        from app.services.autocomplete_service import AutocompleteService
+        seen = []
+        invalidate = AutocompleteService.invalidate
+
+        def spy(self, club_id):
+            seen.append((club_id, db.players.count_documents({'_id': seed_player['_id']}),
+                         db.users.count_documents({'_id': seed_player['user_id']})))
+            invalidate(self, club_id)
+        monkeypatch.setattr(AutocompleteService, 'invalidate', spy)
+
+        get_player_service().delete(str(seed_player['_id']))
+        get_user_service().delete(str(seed_player['user_id']))
+        assert seen == [(seed_club['_id'], 0, 1), (seed_club['_id'], 0, 0)]
+
+
+def test_complete_ranks_exact_tokens_first_and_limits(app, seed_club):
+    """Whole-word matches come before prefix matches; limit caps the results."""
+    with app.app_context():
+        from app.services import get_user_service
+        users = get_user_service()
+        users.create('a@x.fr', 'pw', club_id=seed_club['_id'], profile={'first_name': 'Leo', 'last_name': 'Blanc'})
+        users.create('b@x.fr', 'pw', club_id=seed_club['_id'], profile={'first_name': 'Anne', 'last_name': 'Leon'})
+        users.create('c@x.fr', 'pw', club_id=seed_club['_id'], profile={'first_name': 'Lea', 'last_name': 'Petit'})
+        svc = get_service(app)
+
+        assert _names(svc.complete(seed_club['_id'], 'leo')) == ['Leo Blanc', 'Anne Leon']
+        assert len(svc.complete(seed_club['_id'], 'le', limit=2)) == 2
+
+
+def test_complete_players_by_jersey_and_position(app, seed_club, seed_player):
+    """Players are found by jersey number and position; members carry their jersey."""
+    with app.app_context():
+        svc = get_service(app)
+        players = svc.complete(seed_club['_id'], '10', types=('player',))
+        assert [(p['name'], p['jersey_number']) for p in players] == [('Player User', 10)]
+        assert _names(svc.complete(seed_club['_id'], 'mil', types=('player',))) == ['Player User']
+
+        members = svc.complete(seed_club['_id'], '10', types=('member',))
+        assert [m['id'] for m in members] == [str(seed_player['user_id'])]
+
+
+def test_writes_invalidate_the_trie(app, seed_club):
+    """Creating, renaming and deleting players is reflected immediately."""
+    with app.app_context():
+        from app.services import get_player_service
+        svc = get_service(app)
+        assert svc.complete(seed_club['_id'], 'zidane') == []
+
+        players = get_player_service()
+        player = players.create(seed_club['_id'], 5, 'MID', 'Zinedine Zidane')
+        assert _names(svc.complete(seed_club['_id'], 'zidane')) == ['Zinedine Zidane']
+
+        players.update(player['_id'], {'first_name': 'Zinedine', 'last_name': 'Zizou'})
+        assert svc.complete(seed_club['_id'], 'zidane') == []
+        assert _names(svc.complete(seed_club['_id'], 'ziz')) == ['Zinedine Zizou']
+
+        players.delete(player['_id'])
+        assert svc.complete(seed_club['_id'], 'ziz') == []
+
+
+def test_messaging_member_search_uses_autocomplete(coach_client, seed_admin, seed_player_user):
+    """/messages/members/search returns matching members, never the caller."""
+    resp = coach_client.get('/messages/members/search?q=adm')
+    assert resp.status_code == 200
+    assert [m['name'] for m in resp.get_json()] == ['Admin User']
+
+    everyone = coach_client.get('/messages/members/search').get_json()
+    assert {m['role'] for m in everyone} == {'admin', 'player'}
+    assert set(everyone[0]) == {'id', 'name', 'role', 'initials'}
@@ -0,0 +1,47 @@
+"""Tests for CalendarService."""
+
+from datetime import datetime
+
+
+def test_feed_merges_sources_by_date(app, seed_club, seed_team):
+    """Matches, events and sessions in the window come back as one date-sorted feed."""
+    with app.app_context():
+        from app.services import get_calendar_service, get_match_service, get_event_service
+        club_id = str(seed_club['_id'])
+        team_id = str(seed_team['_id'])
+        get_match_service().create(club_id, 'FC Rival', datetime(2030, 3, 10), team_id=team_id)
+        get_event_service().create(club_id, 'Réunion', 'meeting', datetime(2030, 3, 5))
+        get_event_service().create(club_id, 'Hors fenêtre', 'other', datetime(2030, 5, 1))
+
+        items = get_calendar_service().get_feed(club_id, [team_id], '2030-03-01', '2030-04-01')
+        assert [i['type'] for i in items] == ['event', 'match']
+        assert items[1]['title'] == 'vs FC Rival'
+
+
+def test_types_filter(app, seed_club):
+    """Only the requested sources are queried."""
+    with app.app_context():
+        from app.services import get_calendar_service, get_event_service
+        club_id = str(seed_club['_id'])
+        get_event_service().create(club_id, 'Tournoi', 'tournament', datetime(2030, 6, 2))
+        sources = get_calendar_service().fetch(club_id, start='2030-06-01', end='2030-07-01', types=('match',))
+        assert list(sources) == ['match']
+        assert sources['match'] == []
+
+
+def test_upcoming_lists_scheduled_matches_only(app, client, seed_club, seed_coach):
+    """/calendar/upcoming leaves out live, completed and cancelled matches, as before."""
+    with app.app_context():
+        from app.services import get_match_service
+        from app.routes.api import generate_token
+        matches = get_match_service()
+        club_id = str(seed_club['_id'])
+        matches.create(club_id, 'FC Rival', datetime(2030, 3, 10))
+        played = matches.create(club_id, 'AS Voisin', datetime(2030, 3, 17))
+        matches.set_score(str(played['_id']), 1, 0, status='live')
+        with app.test_request_context():
+            headers = {'Authorization': f'Bearer {generate_token(seed_coach)}'}
+
+    data = client.get('/api/calendar/upcoming', headers=headers).get_json()['data']
+    assert [m['opponent'] for m in data['matches']] == ['FC Rival']
+    assert [i['opponent'] for i in data['items'] if i['type'] == 'match'] == ['FC Rival']
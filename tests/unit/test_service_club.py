@@ -62,3 +62,18 @@ def test_get_stats(app, seed_club):
         assert 'players' in stats
         assert 'events' in stats
         assert 'matches' in stats
+
+
+def test_dashboard_counts(app, seed_club, seed_admin, seed_coach, seed_team):
+    """Counts come from a role x status $group and count_documents."""
+    with app.app_context():
+        from app.services import get_user_service
+        svc = get_service(app)
+        club_id = str(seed_club['_id'])
+        get_user_service().create_pending_user('invite@test.com', role='player', club_id=club_id)
+
+        counts = svc.get_dashboard_counts(club_id)
+        assert counts['total_members'] == 3
+        assert counts['role_counts'] == {'admin': 1, 'coach': 1, 'player': 1}
+        assert counts['pending_invitations'] == 1
+        assert counts['total_teams'] == 1
@@ -0,0 +1,43 @@
+"""Tests for CoachDashboardService."""
+
+from datetime import datetime, timedelta
+
+
+def test_dashboard_sections_share_upcoming_lists(app, seed_club, seed_team):
+    """Alerts are derived from the upcoming lists; every section is timed."""
+    with app.app_context():
+        from app.services import get_coach_dashboard_service, get_match_service, get_event_service
+        club_id, team_id = str(seed_club['_id']), str(seed_team['_id'])
+        soon = datetime.utcnow() + timedelta(days=2)
+        get_match_service().create(club_id, 'FC Rival', soon, team_id=team_id)
+        get_match_service().create(club_id, 'Plus tard', soon + timedelta(days=20), team_id=team_id)
+        get_event_service().create(club_id, 'Réunion', 'meeting', soon, team_id=seed_team['_id'])
+
+        data = get_coach_dashboard_service().build(club_id, team_id=team_id)
+        assert [m['opponent'] for m in data['upcoming_matches']] == ['FC Rival', 'Plus tard']
+        assert sorted(a['title'] for a in data['alerts']) == ['Match vs FC Rival', 'Réunion']
+        assert {'players', 'upcoming_matches', 'season_stats', 'alerts', 'total'} <= set(data['timings'])
+
+
+def test_coach_dashboard_page_sends_server_timing(coach_client):
+    response = coach_client.get('/coach/dashboard')
+    assert response.status_code == 200
+    assert 'total;dur=' in response.headers['Server-Timing']
+
+
+def test_legacy_string_dates_are_sorted_and_alerted():
+    """Rows still holding string dates neither break the feed sort nor the alerts."""
+    from bson import ObjectId
+    from app.services.dashboard_service import CoachDashboardService
+    from app.services.notification_service import NotificationService
+    now = datetime(2030, 3, 1, 12, 0)
+    match = {'_id': ObjectId(), 'opponent': 'FC Rival', 'score': {'home': 2, 'away': 1},
+             'date': datetime(2030, 2, 20)}
+    legacy_match = {'_id': ObjectId(), 'opponent': 'Ancien', 'score': {'home': 0, 'away': 0}, 'date': '2030-02-25'}
+    event = {'_id': ObjectId(), 'title': 'Réunion', 'event_type': 'meeting', 'date': '2030-03-02 18:00'}
+
+    feed = CoachDashboardService._activity_feed([match, legacy_match], [event, {**event, 'date': None}])
+    assert [item['title'] for item in feed][:3] == ['Réunion', '0 - 0 vs Ancien', '2 - 1 vs FC Rival']
+
+    alerts = NotificationService.build_dashboard_alerts([{**legacy_match, 'date': '2030-03-03'}], [event], now=now)
+    assert sorted(a['title'] for a in alerts) == ['Match vs Ancien', 'Réunion']
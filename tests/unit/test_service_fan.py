@@ -0,0 +1,218 @@
+"""Tests for FanEngagementService (reactions, comments, polls)."""
+import threading
+
+from bson import ObjectId
+
+
+def get_service(app):
+    with app.app_context():
+        from app.services import get_fan_engagement_service
+        return get_fan_engagement_service()
+
+
+def _post(app, seed_club, seed_admin):
+    with app.app_context():
+        from app.services import get_post_service
+        return get_post_service().create(str(seed_club['_id']), str(seed_admin['_id']), 'Match', 'Compte rendu')
+
+
+def test_toggle_reaction_maintains_counters(app, db, seed_club, seed_admin, seed_coach):
+    """Toggling adds then removes the reaction and keeps per-type counters in step."""
+    post = _post(app, seed_club, seed_admin)
+    with app.app_context():
+        svc = get_service(app)
+        assert svc.toggle_reaction(post['_id'], seed_admin['_id'])['action'] == 'added'
+        assert svc.toggle_reaction(post['_id'], seed_coach['_id'])['action'] == 'added'
+        assert svc.toggle_reaction(post['_id'], seed_coach['_id'], 'fire')['action'] == 'added'
+        assert svc.get_reactions_count(post['_id']) == {'like': 2, 'fire': 1}
+
+        assert svc.toggle_reaction(post['_id'], seed_coach['_id'])['action'] == 'removed'
+        stored = db.posts.find_one({'_id': post['_id']})
+        assert stored['reaction_counts'] == {'like': 1, 'fire': 1}
+        assert stored['likes'] == 1
+        assert db.reactions.count_documents({'post_id': post['_id']}) == 2
+
+
+def test_set_reaction_is_idempotent(app, seed_club, seed_admin):
+    """Repeated or concurrent adds count once; removing twice never goes negative."""
+    post = _post(app, seed_club, seed_admin)
+    with app.app_context():
+        svc = get_service(app)
+        threads = [threading.Thread(target=svc.set_reaction, args=(post['_id'], seed_admin['_id'], 'like', True))
+                   for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert svc.get_reactions_count(post['_id']) == {'like': 1}
+
+        assert svc.set_reaction(post['_id'], seed_admin['_id'], 'like', False) is True
+        assert svc.set_reaction(post['_id'], seed_admin['_id'], 'like', False) is False
+        assert svc.get_reactions_count(post['_id']) == {}
+
+
+def test_unknown_reaction_types_are_rejected(app, db, client, seed_club, seed_admin):
+    """Types outside REACTION_TYPES never reach the counters."""
+    post = _post(app, seed_club, seed_admin)
+    with app.test_request_context():
+        from app.routes.api import generate_token
+        headers = {'Authorization': f'Bearer {generate_token(seed_admin)}'}
+    for bad in ('', '$inc', 'a.b', 3, 'anything'):
+        response = client.post(f"/api/fan/reactions/{post['_id']}", json={'type': bad}, headers=headers)
+        assert response.status_code == 400
+    assert db.reactions.count_documents({}) == 0
+    assert client.post(f"/api/fan/reactions/{post['_id']}", json={'type': 'fire'},
+                       headers=headers).get_json()['data']['counts'] == {'fire': 1}
+
+
+def test_legacy_duplicate_reactions_do_not_break_the_service(app, db, seed_club, seed_admin, monkeypatch):
+    """Duplicates only skip the unique index; the recount script removes them so it can be built."""
+    import importlib.util
+    import os
+    from app.services.fan_engagement_service import FanEngagementService
+    post = _post(app, seed_club, seed_admin)
+    db.reactions.drop()
+    db.reactions.insert_many([
+        {'post_id': post['_id'], 'user_id': seed_admin['_id'], 'type': 'like'} for _ in range(3)
+    ] + [{'post_id': post['_id'], 'user_id': seed_admin['_id'], 'type': 'fire'}])
+    monkeypatch.setattr(FanEngagementService, '_indexed', set())
+    FanEngagementService(db)
+
+    path = os.path.join(os.path.dirname(__file__), '..', '..', 'scripts', 'recount_post_counters.py')
+    spec = importlib.util.spec_from_file_location('recount_post_counters', path)
+    script = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(script)
+    assert script.dedupe_reactions(db) == 2
+    assert db.reactions.count_documents({}) == 2
+    db.reactions.create_index([('post_id', 1), ('user_id', 1), ('type', 1)], unique=True)
+
+
+def test_comment_count_and_recount(app, db, seed_club, seed_admin):
+    """create_comment bumps comment_count; recount rebuilds every counter."""
+    post = _post(app, seed_club, seed_admin)
+    with app.app_context():
+        svc = get_service(app)
+        svc.create_comment(post['_id'], seed_admin['_id'], 'Bravo')
+        svc.create_comment(post['_id'], seed_admin['_id'], 'Allez !')
+        svc.set_reaction(post['_id'], seed_admin['_id'], 'like', True)
+        assert db.posts.find_one({'_id': post['_id']})['comment_count'] == 2
+
+        db.posts.update_one({'_id': post['_id']}, {'$set': {'likes': 40, 'comment_count': 0}})
+        assert svc.recount(post['_id']) == {'like': 1}
+        stored = db.posts.find_one({'_id': post['_id']})
+        assert (stored['likes'], stored['comment_count']) == (1, 2)
+
+
+def test_recount_backfills_reply_counts(app, db, seed_club, seed_admin):
+    """Replies written before reply_count existed are counted by recount."""
+    post = _post(app, seed_club, seed_admin)
+    with app.app_context():
+        svc = get_service(app)
+        parent = svc.create_comment(post['_id'], seed_admin['_id'], 'Bravo')
+        lonely = svc.create_comment(post['_id'], seed_admin['_id'], 'Allez !')
+        svc.create_comment(post['_id'], seed_admin['_id'], 'Merci', parent)
+        db.comments.insert_one({'post_id': post['_id'], 'author_id': seed_admin['_id'], 'content': 'Ancien',
+                                'parent_comment_id': ObjectId(parent)})
+        db.comments.update_many({}, {'$unset': {'reply_count': ''}})
+
+        svc.recount(post['_id'])
+        assert db.comments.find_one({'_id': ObjectId(parent)})['reply_count'] == 2
+        assert db.comments.find_one({'_id': ObjectId(lonely)})['reply_count'] == 0
+
+
+def test_reply_parent_must_belong_to_the_post(app, db, client, seed_club, seed_admin):
+    """A reply cannot hang under (and bump) a comment of another post."""
+    post = _post(app, seed_club, seed_admin)
+    other = _post(app, seed_club, seed_admin)
+    with app.app_context():
+        svc = get_service(app)
+        foreign = svc.create_comment(other['_id'], seed_admin['_id'], 'Ailleurs')
+    with app.test_request_context():
+        from app.routes.api import generate_token
+        headers = {'Authorization': f'Bearer {generate_token(seed_admin)}'}
+    for parent in (foreign, 'not-an-id'):
+        response = client.post(f"/api/fan/comments/{post['_id']}",
+                               json={'content': 'Réponse', 'parent_comment_id': parent}, headers=headers)
+        assert response.status_code == 400
+    assert db.comments.find_one({'_id': ObjectId(foreign)}).get('reply_count', 0) == 0
+    assert db.comments.count_documents({'post_id': post['_id']}) == 0
+
+
+def test_comments_are_paged_with_reply_previews(app, db, seed_club, seed_admin, seed_coach):
+    """Top-level comments come in cursor pages, each with its first replies and reply_count."""
+    post = _post(app, seed_club, seed_admin)
+    with app.app_context():
+        svc = get_service(app)
+        top = [svc.create_comment(post['_id'], seed_admin['_id'], f'Commentaire {i}') for i in range(5)]
+        for i in range(4):
+            svc.create_comment(post['_id'], seed_coach['_id'], f'Réponse {i}', parent_comment_id=top[0])
+
+        page, cursor = svc.get_comments(post['_id'], limit=3, replies=2)
+        assert [c['content'] for c in page] == ['Commentaire 0', 'Commentaire 1', 'Commentaire 2']
+        assert page[0]['reply_count'] == 4
+        assert [r['content'] for r in page[0]['replies']] == ['Réponse 0', 'Réponse 1']
+        assert page[0]['author_name'] == 'Admin User'
+        assert page[0]['replies'][0]['author_name'] == 'Coach User'
+        assert page[1]['replies'] == [] and page[1]['reply_count'] == 0
+
+        page, cursor = svc.get_comments(post['_id'], cursor=cursor, limit=3)
+        assert [c['content'] for c in page] == ['Commentaire 3', 'Commentaire 4']
+        assert cursor is None
+
+        replies, cursor = svc.get_replies(top[0], limit=3)
+        assert [r['content'] for r in replies] == ['Réponse 0', 'Réponse 1', 'Réponse 2']
+        replies, cursor = svc.get_replies(top[0], cursor=cursor)
+        assert [r['content'] for r in replies] == ['Réponse 3'] and cursor is None
+        assert db.posts.find_one({'_id': post['_id']})['comment_count'] == 9
+
+
+def test_comment_authors_cached_per_service(app, db, seed_club, seed_admin):
+    """Authors resolved once are reused by the same (per-request) service instance."""
+    post = _post(app, seed_club, seed_admin)
+    with app.app_context():
+        svc = get_service(app)
+        for i in range(3):
+            svc.create_comment(post['_id'], seed_admin['_id'], f'Message {i}')
+        svc.get_comments(post['_id'])
+        assert svc._authors == {seed_admin['_id']: 'Admin User'}
+
+        db.users.update_one({'_id': seed_admin['_id']}, {'$set': {'profile.first_name': 'Renamed'}})
+        page, _ = svc.get_comments(post['_id'])
+        assert {c['author_name'] for c in page} == {'Admin User'}
+        page, _ = get_service(app).get_comments(post['_id'])
+        assert {c['author_name'] for c in page} == {'Renamed User'}
+
+
+def test_vote_poll_once_per_user(app, db, seed_club, seed_admin, seed_coach):
+    """Votes go to poll_votes; a second vote is refused and tallies stay exact."""
+    with app.app_context():
+        svc = get_service(app)
+        poll_id = svc.create_poll(seed_club['_id'], 'Homme du match ?', ['Paul', 'Yanis'])
+
+        assert svc.vote_poll(poll_id, 1, seed_admin['_id']) == {'success': True}
+        assert svc.vote_poll(poll_id, 0, seed_admin['_id']) == {'error': 'Déjà voté'}
+        assert svc.vote_poll(poll_id, 5, seed_coach['_id']) == {'error': 'Option invalide'}
+        assert svc.vote_poll(poll_id, 1, seed_coach['_id']) == {'success': True}
+
+        assert svc.get_vote(poll_id, seed_admin['_id']) == 1
+        poll = db.polls.find_one()
+        assert [o['votes'] for o in poll['options']] == [0, 2]
+        assert poll['total_votes'] == 2
+        assert 'voters' not in poll
+        assert db.poll_votes.count_documents({}) == 2
+
+
+def test_get_polls_flags_current_user_without_voters(app, seed_club, seed_admin, seed_coach):
+    """get_polls reports whether the caller voted and never returns voter lists."""
+    with app.app_context():
+        svc = get_service(app)
+        voted = svc.create_poll(seed_club['_id'], 'Maillot ?', ['Bleu', 'Rouge'])
+        svc.create_poll(seed_club['_id'], 'Horaire ?', ['10h', '14h'])
+        svc.vote_poll(voted, 0, seed_admin['_id'])
+        svc.vote_poll(voted, 1, seed_coach['_id'])
+
+        polls = {p['question']: p for p in svc.get_polls(seed_club['_id'], user_id=seed_admin['_id'])}
+        assert (polls['Maillot ?']['voted'], polls['Maillot ?']['my_vote']) == (True, 0)
+        assert polls['Maillot ?']['total_votes'] == 2
+        assert (polls['Horaire ?']['voted'], polls['Horaire ?']['my_vote']) == (False, None)
+        assert all('voters' not in p for p in polls.values())
@@ -0,0 +1,131 @@
+"""Tests for the materialized club/team news feed."""
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+
+def get_service(app):
+    with app.app_context():
+        from app.services import get_feed_service
+        return get_feed_service()
+
+
+def test_sources_fan_out_to_club_and_team_timelines(app, db, seed_club, seed_team, seed_admin):
+    """Club-wide items reach every team timeline; team results only their team."""
+    with app.app_context():
+        from app.services import get_match_service, get_media_service, get_post_service
+        other_team = db.teams.insert_one({'club_id': seed_club['_id'], 'name': 'U17'}).inserted_id
+        post = get_post_service().create(seed_club['_id'], seed_admin['_id'], 'Assemblée générale', 'Vendredi 19h')
+        get_media_service().upload_media(seed_club['_id'], {'title': 'Photos du tournoi'})
+        matches = get_match_service()
+        match = matches.create(seed_club['_id'], 'FC Rival', datetime.utcnow() - timedelta(days=1),
+                               team_id=str(seed_team['_id']))
+
+        svc = get_service(app)
+        assert [e['kind'] for e in svc.get_timeline(seed_club['_id'])[0]] == ['media', 'post']
+
+        matches.set_score(match['_id'], 3, 1, status='completed')
+        club, _ = svc.get_timeline(seed_club['_id'])
+        assert sorted(e['kind'] for e in club) == ['match', 'media', 'post']
+        team, _ = svc.get_timeline(seed_club['_id'], seed_team['_id'])
+        assert sorted(e['kind'] for e in team) == ['match', 'media', 'post']
+        other, _ = svc.get_timeline(seed_club['_id'], other_team)
+        assert sorted(e['kind'] for e in other) == ['media', 'post']
+        result = next(e for e in club if e['kind'] == 'match')
+        assert result['data']['score'] == {'home': 3, 'away': 1}
+
+        get_post_service().delete(post['_id'])
+        matches.update(str(match['_id']), {'status': 'scheduled'})
+        assert [e['kind'] for e in svc.get_timeline(seed_club['_id'])[0]] == ['media']
+        assert svc.get_timeline(seed_club['_id'], seed_team['_id'])[0][0]['kind'] == 'media'
+
+
+def test_post_counters_follow_reactions_and_comments(app, seed_club, seed_admin, seed_coach):
+    """Feed entries carry the post counters, so reading the feed needs no lookups."""
+    with app.app_context():
+        from app.services import get_fan_engagement_service, get_post_service
+        post = get_post_service().create(seed_club['_id'], seed_admin['_id'], 'Victoire', 'Score final 2-0')
+        fan = get_fan_engagement_service()
+        fan.set_reaction(post['_id'], seed_admin['_id'], 'like', True)
+        fan.set_reaction(post['_id'], seed_coach['_id'], 'fire', True)
+        fan.create_comment(post['_id'], seed_coach['_id'], 'Bravo')
+
+        entry = get_service(app).get_timeline(seed_club['_id'])[0][0]
+        assert entry['data']['likes'] == 1
+        assert entry['data']['reaction_counts'] == {'like': 1, 'fire': 1}
+        assert entry['data']['comment_count'] == 1
+
+
+def test_cursor_since_and_cap(app, db, seed_club, seed_admin, monkeypatch):
+    """Pages go back with the cursor, `since` returns only newer entries, old ones are trimmed."""
+    from app.services import feed_service
+    monkeypatch.setattr(feed_service, 'FEED_CAP', 5)
+    with app.app_context():
+        from app.services import get_post_service
+        posts = get_post_service()
+        start = datetime.utcnow() - timedelta(hours=1)
+        for i in range(7):
+            post = posts.create(seed_club['_id'], seed_admin['_id'], f'Post {i}', '')
+            db.posts.update_one({'_id': post['_id']}, {'$set': {'created_at': start + timedelta(minutes=i)}})
+            posts.update(post['_id'], {})
+
+        svc = get_service(app)
+        page, cursor = svc.get_timeline(seed_club['_id'], limit=3)
+        assert [e['data']['title'] for e in page] == ['Post 6', 'Post 5', 'Post 4']
+        page, cursor = svc.get_timeline(seed_club['_id'], cursor=cursor, limit=3)
+        assert [e['data']['title'] for e in page] == ['Post 3', 'Post 2']
+        assert cursor is None
+
+        latest = str(svc.get_timeline(seed_club['_id'], limit=1)[0][0]['key'])
+        assert svc.get_timeline(seed_club['_id'], since=latest) == ([], None)
+        posts.create(seed_club['_id'], seed_admin['_id'], 'Nouveau', '')
+        assert [e['data']['title'] for e in svc.get_timeline(seed_club['_id'], since=latest)[0]] == ['Nouveau']
+
+
+def test_rebuild_recreates_timelines(app, db, seed_club, seed_team, seed_admin):
+    """rebuild() restores entries from the source collections with the same keys."""
+    with app.app_context():
+        from app.services import get_post_service
+        get_post_service().create(seed_club['_id'], seed_admin['_id'], 'Stage de Pâques', 'Inscriptions ouvertes')
+        db.announcements.insert_one({'club_id': seed_club['_id'], 'subject': 'AG', 'body': 'Ordre du jour',
+                                     'target_type': 'all', 'sent_at': datetime.utcnow()})
+        db.announcements.insert_one({'club_id': seed_club['_id'], 'subject': 'Coachs', 'body': 'Réunion',
+                                     'target_type': 'role', 'target_id': 'coach', 'sent_at': datetime.utcnow()})
+        svc = get_service(app)
+        before = [e['key'] for e in svc.get_timeline(seed_club['_id'])[0]]
+
+        assert svc.rebuild(seed_club['_id']) == 2
+        club, _ = svc.get_timeline(seed_club['_id'])
+        assert [e['kind'] for e in club] == ['announcement', 'post']
+        assert club[1]['key'] == before[0]
+        assert len(svc.get_timeline(seed_club['_id'], seed_team['_id'])[0]) == 2
+        assert svc.get_timeline(ObjectId(), seed_team['_id'])[0] == []
+
+
+def _auth(app, user):
+    with app.test_request_context():
+        from app.routes.api import generate_token
+        return {'Authorization': f'Bearer {generate_token(user)}'}
+
+
+def test_team_announcements_stay_in_team_timeline(app, db, client, seed_club, seed_team, seed_coach,
+                                                  seed_player_user):
+    """Team announcements skip the club timeline; team timelines need membership or a staff role."""
+    other_team = db.teams.insert_one({'club_id': seed_club['_id'], 'name': 'U17'}).inserted_id
+    with app.app_context():
+        svc = get_service(app)
+        announcement = {'club_id': seed_club['_id'], 'subject': 'Convocation', 'body': 'Samedi 9h',
+                        'target_type': 'team', 'target_id': str(seed_team['_id']), 'sent_at': datetime.utcnow()}
+        announcement['_id'] = db.announcements.insert_one(announcement).inserted_id
+        svc.publish_announcement(announcement)
+        assert svc.get_timeline(seed_club['_id'])[0] == []
+        assert [e['kind'] for e in svc.get_timeline(seed_club['_id'], seed_team['_id'])[0]] == ['announcement']
+
+    fan = {'_id': ObjectId(), 'email': 'fan@test.com', 'role': 'fan', 'club_id': seed_club['_id']}
+    db.users.insert_one(fan)
+    player = _auth(app, seed_player_user)
+    assert client.get('/api/feed', headers=_auth(app, fan)).get_json()['data'] == []
+    assert client.get(f"/api/feed?team_id={seed_team['_id']}", headers=_auth(app, fan)).status_code == 403
+    assert client.get(f'/api/feed?team_id={other_team}', headers=player).status_code == 403
+    assert len(client.get(f"/api/feed?team_id={seed_team['_id']}", headers=player).get_json()['data']) == 1
+    assert client.get(f'/api/feed?team_id={other_team}', headers=_auth(app, seed_coach)).status_code == 200
@@ -0,0 +1,48 @@
+"""Tests for the fixture generator and CompetitionService.generate_fixtures."""
+
+from datetime import datetime
+
+
+def test_double_round_robin_is_complete_and_balanced():
+    """Every ordered pair plays exactly once and nobody plays twice in a round."""
+    from app.services.fixture_generator import double_round_robin_rounds
+    for n in (4, 7, 10):
+        rounds = double_round_robin_rounds(list(range(n)))
+        pairs = [p for r in rounds for p in r]
+        assert len(pairs) == len(set(pairs)) == n * (n - 1)
+        for r in rounds:
+            teams = [t for p in r for t in p]
+            assert len(teams) == len(set(teams))
+
+
+def test_knockout_byes_go_to_top_seeds():
+    from app.services.fixture_generator import knockout_first_round
+    slots = knockout_first_round(['A', 'B', 'C', 'D', 'E', 'F'])
+    assert slots == [('A', None), ('D', 'E'), ('B', None), ('C', 'F')]
+
+
+def test_scheduler_skips_blackouts_and_venue_clashes():
+    from app.services.fixture_generator import Scheduler
+    scheduler = Scheduler('2030-12-14', venues={'a': 'Stade', 'b': 'Stade'}, blackout_dates=['2030-12-21'])
+    assert scheduler.round_date().day == 14
+    date = scheduler.round_date()
+    assert date.day == 28
+    assert scheduler.place('a', 'x', date)[2].day == 28
+    assert scheduler.place('b', 'y', date)[2].day == 29
+
+
+def test_generate_league_fixtures(app, seed_club, seed_team):
+    """Fixtures are inserted as matches linked to the competition."""
+    with app.app_context():
+        from app.services import get_competition_service
+        svc = get_competition_service()
+        comp = svc.create(str(seed_club['_id']), {'name': 'District', 'type': 'league'})
+        result = svc.generate_fixtures(str(comp['_id']), {
+            'participants': [str(seed_team['_id']), {'name': 'FC Rival'}, {'name': 'AS Voisin'}],
+            'start_date': datetime(2030, 9, 7),
+        })
+        assert result['created'] == 6
+        matches = list(svc.db.matches.find({'competition_id': comp['_id']}))
+        ours = [m for m in matches if m['team_id'] == seed_team['_id']]
+        assert len(ours) == 4
+        assert sum(m['is_home'] for m in ours) == 2
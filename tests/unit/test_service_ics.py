@@ -0,0 +1,36 @@
+"""Tests for IcsFeedService."""
+
+from datetime import datetime
+
+
+def test_render_ics_escapes_and_folds():
+    """Text values are escaped and long lines folded at 75 octets."""
+    from app.services.ics_service import render_ics
+    item = {
+        'id': 'abc', 'type': 'match', 'date': datetime(2030, 3, 10, 15, 0),
+        'title': 'vs FC Rival, Réserve; ' + 'x' * 80, 'location': 'Stade', 'status': 'scheduled',
+    }
+    body = render_ics([item], 'Équipe A')
+    # Stored times are Paris wall-clock times, not UTC
+    assert 'DTSTART;TZID=Europe/Paris:20300310T150000' in body
+    assert 'DTEND;TZID=Europe/Paris:20300310T170000' in body
+    assert 'BEGIN:VTIMEZONE' in body and body.index('END:VTIMEZONE') < body.index('BEGIN:VEVENT')
+    assert r'vs FC Rival\, Réserve\;' in body
+    assert all(len(line.encode('utf-8')) <= 75 for line in body.split('\r\n'))
+
+
+def test_feed_is_cached_until_match_changes(app, seed_admin, seed_club):
+    """A poll reuses the stored body; a match write invalidates it."""
+    with app.app_context():
+        from app.services import get_ics_feed_service, get_match_service
+        svc = get_ics_feed_service()
+        club_id = str(seed_club['_id'])
+        feed = svc.get_or_create(str(seed_admin['_id']), club_id)
+
+        body, etag = svc.get_rendered(feed['token'])
+        assert 'BEGIN:VCALENDAR' in body
+        assert svc.get_rendered(feed['token']) == (body, etag)
+
+        get_match_service().create(club_id, 'FC Rival', datetime.utcnow())
+        assert svc.collection.find_one({'_id': feed['_id']})['body'] is None
+        assert 'vs FC Rival' in svc.get_rendered(feed['token'])[0]
@@ -0,0 +1,99 @@
+"""Tests for the image upload pipeline."""
+import io
+
+import pytest
+from werkzeug.datastructures import FileStorage
+
+from app.services.image_service import VARIANTS, render_variants, save_image
+from app.services.upload_store import LocalBlobStore, UploadService, blob_key
+
+SVG = b'<svg xmlns="http://www.w3.org/2000/svg" width="10" height="10"></svg>'
+
+
+def _upload(data, filename='logo.svg'):
+    return FileStorage(stream=io.BytesIO(data), filename=filename)
+
+
+def test_non_raster_image_kept_under_content_hash(db, tmp_path):
+    """SVG files are stored as-is, keyed by their content; variants point to them."""
+    store = LocalBlobStore(str(tmp_path))
+    uploads = UploadService(db, store)
+    result = save_image(_upload(SVG), uploads, 'svg')
+    key = blob_key(SVG, 'svg')
+    assert result['url'] == f'/api/files/{key}'
+    assert result['variants'] == {v: {'svg': result['url']} for v in VARIANTS}
+    with open(store.path(key), 'rb') as f:
+        assert f.read() == SVG
+
+    again = save_image(_upload(SVG), uploads, 'svg')
+    assert again == result
+    assert len(list(tmp_path.rglob('*.svg'))) == 1
+
+
+def test_render_variants_resizes_and_strips_metadata():
+    """Each variant fits its size, comes as WebP + JPEG, and carries no EXIF."""
+    Image = pytest.importorskip('PIL.Image')
+    exif = Image.Exif()
+    exif[0x010F] = 'PhoneMaker'
+    buf = io.BytesIO()
+    Image.new('RGB', (3000, 2000), 'green').save(buf, 'JPEG', exif=exif)
+
+    variants = render_variants(buf.getvalue())
+    assert set(variants) == set(VARIANTS)
+    for name, edge in VARIANTS.items():
+        assert set(variants[name]) == {'webp', 'jpg'}
+        with Image.open(io.BytesIO(variants[name]['jpg'])) as img:
+            assert max(img.size) == edge
+            assert not img.getexif()
+        with Image.open(io.BytesIO(variants[name]['webp'])) as img:
+            assert img.format == 'WEBP'
+
+
+def test_render_variants_keeps_transparency_as_png():
+    """Images with an alpha channel fall back to PNG instead of JPEG."""
+    Image = pytest.importorskip('PIL.Image')
+    buf = io.BytesIO()
+    Image.new('RGBA', (200, 100), (255, 0, 0, 0)).save(buf, 'PNG')
+    variants = render_variants(buf.getvalue())
+    assert set(variants['thumbnail']) == {'webp', 'png'}
+    with Image.open(io.BytesIO(variants['full']['png'])) as img:
+        assert img.size == (200, 100)
+
+
+def test_broken_pool_is_replaced(monkeypatch):
+    """A pool whose child died is discarded and the image retried on a fresh one."""
+    import sys
+    import types
+    from concurrent.futures import Future
+    from concurrent.futures.process import BrokenProcessPool
+    from app.services import image_service
+
+    class FakePool:
+        def __init__(self, broken):
+            self.broken, self.shut = broken, False
+
+        def submit(self, fn, data):
+            future = Future()
+            if self.broken:
+                future.set_exception(BrokenProcessPool('child killed'))
+            else:
+                future.set_result({'full': {'webp': data}})
+            return future
+
+        def shutdown(self, wait=True):
+            self.shut = True
+
+    monkeypatch.setitem(sys.modules, 'PIL', sys.modules.get('PIL') or types.ModuleType('PIL'))
+    broken = FakePool(broken=True)
+    monkeypatch.setattr(image_service, '_pool', broken)
+    monkeypatch.setattr(image_service, 'ProcessPoolExecutor', lambda **kwargs: FakePool(broken=False))
+
+    assert image_service.process_image(b'img', 'jpg') == {'full': {'webp': b'img'}}
+    assert broken.shut and image_service._pool is not broken
+
+    # Breaking the fresh pool as well means the image itself kills the worker
+    monkeypatch.setattr(image_service, 'ProcessPoolExecutor', lambda **kwargs: FakePool(broken=True))
+    monkeypatch.setattr(image_service, '_pool', None)
+    with pytest.raises(image_service.ImageError):
+        image_service.process_image(b'img', 'jpg')
+    assert image_service._pool is None
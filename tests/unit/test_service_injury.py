@@ -0,0 +1,76 @@
+"""Tests for InjuryService statistics and InjuryAnalyticsService."""
+
+
+def _log(svc, player, coach, team, body_part, date, resolve_on=None):
+    injury_id = svc.log_injury(str(player['_id']), str(coach['_id']), str(team['_id']), {
+        'body_part': body_part, 'severity': 'minor', 'injury_date': date,
+    })
+    if resolve_on:
+        svc.clear_for_play(injury_id, 'Coach', resolve_on)
+    return injury_id
+
+
+def test_get_injury_stats(app, seed_team, seed_coach, seed_player):
+    """get_injury_stats should count by status and average recovery days."""
+    with app.app_context():
+        from app.services import get_injury_service
+        svc = get_injury_service()
+        _log(svc, seed_player, seed_coach, seed_team, 'knee', '2026-01-01', resolve_on='2026-01-11')
+        _log(svc, seed_player, seed_coach, seed_team, 'ankle', '2026-02-01T10:30:00.123456')
+        # Return recorded before the injury: counted, but not in the recovery average
+        _log(svc, seed_player, seed_coach, seed_team, 'hip', '2026-03-10', resolve_on='2026-03-01')
+        stats = svc.get_injury_stats(str(seed_team['_id']))
+        assert stats['total'] == 3
+        assert stats['active'] == 1
+        assert stats['resolved'] == 2
+        assert stats['avg_recovery_days'] == 10
+        assert stats['by_body_part'] == {'knee': 1, 'ankle': 1, 'hip': 1}
+
+
+def test_injury_heatmap(app, seed_club, seed_team, seed_coach, seed_player):
+    """compute should return heatmap cells, median recovery and recurrence."""
+    with app.app_context():
+        from app.services import get_injury_service, get_injury_analytics_service
+        svc = get_injury_service()
+        _log(svc, seed_player, seed_coach, seed_team, 'knee', '2026-01-01', resolve_on='2026-01-05')
+        _log(svc, seed_player, seed_coach, seed_team, 'knee', '2026-03-01', resolve_on='2026-03-11')
+        _log(svc, seed_player, seed_coach, seed_team, 'knee', '2026-03-20', resolve_on='2026-04-19')
+
+        data = get_injury_analytics_service().compute(str(seed_club['_id']))
+        assert data['club']['resolved'] == 3
+        assert data['club']['median_recovery_days'] == 10
+        assert {'body_part': 'knee', 'month': '2026-03', 'count': 2} in data['heatmap']['cells']
+        assert data['recurrence'][0]['recurrent_body_parts'] == ['knee']
+
+
+def test_heatmap_cache_follows_other_workers(app, db, seed_club, seed_team, seed_coach, seed_player, monkeypatch):
+    """Cached heatmaps are keyed by the club's generation in Mongo, bumped by injury writes."""
+    with app.app_context():
+        from app.services import get_injury_service, get_injury_analytics_service
+        from app.services.injury_analytics_service import InjuryAnalyticsService
+        computed = []
+        monkeypatch.setattr(InjuryAnalyticsService, 'compute',
+                            lambda self, club_id, team_id=None: computed.append(club_id) or len(computed))
+        analytics = get_injury_analytics_service()
+        club_id = str(seed_club['_id'])
+
+        assert analytics.get_heatmap(club_id) == analytics.get_heatmap(club_id) == 1
+        # A write in another worker only changes the generation document
+        db.cache_generations.update_one({'_id': f'injury_heatmap:{club_id}'}, {'$inc': {'gen': 1}}, upsert=True)
+        assert analytics.get_heatmap(club_id) == 2
+        _log(get_injury_service(), seed_player, seed_coach, seed_team, 'knee', '2026-01-01')
+        assert analytics.get_heatmap(club_id) == 3
+
+
+def test_heatmap_rejects_other_club_team(app, db, client, seed_club, seed_coach):
+    """A team id of another club is a 404, and compute() ignores it."""
+    from bson import ObjectId
+    other = db.teams.insert_one({'club_id': ObjectId(), 'name': 'Ailleurs'}).inserted_id
+    with app.test_request_context():
+        from app.routes.api import generate_token
+        headers = {'Authorization': f'Bearer {generate_token(seed_coach)}'}
+    response = client.get(f'/api/coach/injuries/heatmap?team_id={other}', headers=headers)
+    assert response.status_code == 404
+    with app.app_context():
+        from app.services import get_injury_analytics_service
+        assert get_injury_analytics_service().compute(str(seed_club['_id']), str(other))['club']['total'] == 0
@@ -0,0 +1,95 @@
+"""Tests for the live match feed."""
+
+import json
+from datetime import datetime
+
+import pytest
+
+
+def _read(stream):
+    """Next SSE message of a stream as (id, event, data)."""
+    fields = dict(line.split(': ', 1) for line in next(stream).strip().split('\n'))
+    return fields['id'], fields['event'], json.loads(fields['data'])
+
+
+def test_writes_are_pushed_as_deltas(app, seed_club):
+    """A subscriber gets a snapshot, then only what set_score/add_event changed."""
+    with app.app_context():
+        from app.services.db import mongo
+        from app.services import get_match_service
+        from app.services.live_match import hub
+        svc = get_match_service()
+        match = svc.create(str(seed_club['_id']), 'FC Rival', datetime(2030, 5, 4))
+
+        subscription = hub.subscribe(mongo.db, str(match['_id']))
+        try:
+            stream = subscription.events()
+            assert next(stream).startswith('retry:')
+            _, event, data = _read(stream)
+            assert event == 'snapshot' and data['score'] == {'home': 0, 'away': 0}
+
+            svc.set_score(str(match['_id']), 1, 0, status='live')
+            _, event, data = _read(stream)
+            assert (event, data) == ('score', {'home': 1, 'away': 0, 'status': 'live'})
+
+            svc.add_event(str(match['_id']), 'goal', None, 12)
+            last_id, event, data = _read(stream)
+            assert event == 'timeline' and [e['minute'] for e in data['events']] == [12]
+        finally:
+            subscription.close()
+        assert hub.stream_count() == 0
+
+
+def test_reconnect_replays_missed_messages(app, seed_club):
+    """Last-Event-ID resumes from the backlog instead of sending a new snapshot."""
+    with app.app_context():
+        from app.services.db import mongo
+        from app.services import get_match_service
+        from app.services.live_match import hub
+        svc = get_match_service()
+        match = svc.create(str(seed_club['_id']), 'AS Voisin', datetime(2030, 5, 5))
+
+        first = hub.subscribe(mongo.db, str(match['_id']))
+        try:
+            stream = first.events()
+            next(stream)
+            snapshot_id, _, _ = _read(stream)
+            svc.set_score(str(match['_id']), 0, 1)
+            svc.set_score(str(match['_id']), 0, 2)
+
+            second = hub.subscribe(mongo.db, str(match['_id']), last_event_id=snapshot_id)
+            try:
+                replay = second.events()
+                next(replay)
+                assert [_read(replay)[2]['away'] for _ in range(2)] == [1, 2]
+            finally:
+                second.close()
+        finally:
+            first.close()
+
+
+def test_slow_subscriber_stream_ends_after_overflow(app, seed_club):
+    """A full queue marks the subscription dropped; the queue stays usable by a reader in get()."""
+    with app.app_context():
+        from app.services.db import mongo
+        from app.services import get_match_service
+        from app.services.live_match import BACKLOG_SIZE, hub
+        match = get_match_service().create(str(seed_club['_id']), 'US Lente', datetime(2030, 5, 6))
+
+        subscription = hub.subscribe(mongo.db, str(match['_id']))
+        try:
+            stream = subscription.events()
+            next(stream)
+            _read(stream)
+            for seq in range(BACKLOG_SIZE + 2):
+                subscription.push((seq, 'stats', {}))
+            assert subscription.dropped and subscription.queue is not None
+            with pytest.raises(StopIteration):
+                next(stream)
+        finally:
+            subscription.close()
+
+
+def test_live_endpoint_unknown_match(client):
+    response = client.get('/api/matches/000000000000000000000000/live')
+    assert response.status_code == 404
@@ -1,5 +1,6 @@
 """Tests for MatchService."""
 from datetime import datetime, timedelta
+from bson import ObjectId
 
 
 def get_service(app):
@@ -122,3 +123,46 @@ def test_delete_match(app, seed_club):
         match = svc.create(str(seed_club['_id']), 'Del', datetime.utcnow())
         svc.delete(str(match['_id']))
         assert svc.get_by_id(str(match['_id'])) is None
+
+
+def test_season_stats_splits_form_and_intervals(app, seed_club):
+    """Home/away splits, form and goal intervals; a score change drops the cached stats."""
+    with app.app_context():
+        svc = get_service(app)
+        club_id = str(seed_club['_id'])
+        home = svc.create(club_id, 'H', datetime(2030, 9, 1), is_home=True)
+        svc.set_score(str(home['_id']), 2, 0, status='completed')
+        svc.add_event(str(home['_id']), 'goal', str(ObjectId()), 15)
+        svc.add_event(str(home['_id']), 'goal', str(ObjectId()), 93)
+        away = svc.create(club_id, 'A', datetime(2030, 10, 1), is_home=False)
+        svc.set_score(str(away['_id']), 1, 0, status='completed')
+        old = svc.create(club_id, 'Old', datetime(2029, 10, 1))
+        svc.set_score(str(old['_id']), 5, 0, status='completed')
+
+        stats = svc.get_season_stats(club_id, season='2030-2031')
+        assert (stats['played'], stats['wins'], stats['losses']) == (2, 1, 1)
+        assert stats['home']['goals_for'] == 2 and stats['away']['goals_against'] == 1
+        assert stats['form'] == ['L', 'W']
+        goals = {row['interval']: row['goals'] for row in stats['goals_by_interval']}
+        assert goals['0-15'] == 1 and goals['76-90+'] == 1
+
+        svc.set_score(str(away['_id']), 1, 1)
+        assert svc.get_season_stats(club_id, season='2030-2031')['draws'] == 1
+
+
+def test_season_stats_follow_writes_from_other_workers(app, db, seed_club):
+    """Cached stats are keyed by the club's generation in Mongo, not only dropped locally."""
+    with app.app_context():
+        from app.services import match_service
+        svc = get_service(app)
+        club_id = str(seed_club['_id'])
+        match = svc.create(club_id, 'H', datetime(2030, 9, 1))
+        svc.set_score(str(match['_id']), 2, 0, status='completed')
+        assert svc.get_season_stats(club_id)['wins'] == 1
+
+        # Another worker's write: the document and the generation change, this process's cache does not
+        db.matches.update_one({'_id': match['_id']}, {'$set': {'score': {'home': 0, 'away': 2}}})
+        assert svc.get_season_stats(club_id)['wins'] == 1
+        db.cache_generations.update_one({'_id': f'season_stats:{club_id}'}, {'$inc': {'gen': 1}})
+        assert svc.get_season_stats(club_id)['losses'] == 1
+        assert match_service._stats_cache.generation(db, club_id) >= 2
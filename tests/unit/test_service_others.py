@@ -70,20 +70,23 @@ def test_create_post(app, seed_club, seed_admin):
         assert post['title'] == 'Test Post'
 
 
-def test_like_and_unlike(app, seed_club, seed_admin):
-    """like/unlike should increment/decrement likes."""
+def test_like_and_unlike(app, seed_club, seed_admin, seed_coach):
+    """like/unlike should increment/decrement likes, once per user."""
     with app.app_context():
         from app.services import get_post_service
         svc = get_post_service()
         post = svc.create(str(seed_club['_id']), str(seed_admin['_id']), 'Likeable', 'Content')
-        svc.like(str(post['_id']))
-        svc.like(str(post['_id']))
+        svc.like(str(post['_id']), seed_admin['_id'])
+        svc.like(str(post['_id']), seed_coach['_id'])
+        svc.like(str(post['_id']), seed_coach['_id'])
         updated = svc.get_by_id(str(post['_id']))
         assert updated['likes'] == 2
 
-        svc.unlike(str(post['_id']))
+        svc.unlike(str(post['_id']), seed_coach['_id'])
+        svc.unlike(str(post['_id']), seed_coach['_id'])
         updated = svc.get_by_id(str(post['_id']))
         assert updated['likes'] == 1
+        assert updated['reaction_counts'] == {'like': 1}
 
 
 def test_add_comment(app, seed_club, seed_admin):
@@ -99,7 +102,7 @@ def test_add_comment(app, seed_club, seed_admin):
 
 
 def test_search_posts(app, seed_club, seed_admin):
-    """search should find posts by title/content regex."""
+    """search should find posts by title/content words."""
     with app.app_context():
         from app.services import get_post_service
         svc = get_post_service()
@@ -223,3 +226,39 @@ def test_calculate_monthly_bill(app, seed_club):
         assert bill is not None
         assert 'total_monthly' in bill
         assert bill['base_price'] > 0
+
+
+# ============================================================
+# DATE HELPERS
+# ============================================================
+
+def test_parse_date_formats():
+    """parse_date should accept ISO, French and datetime values."""
+    from datetime import datetime
+    from app.services.dates import parse_date
+    assert parse_date('2026-03-01') == datetime(2026, 3, 1)
+    assert parse_date('01/03/2026') == datetime(2026, 3, 1)
+    assert parse_date('2026-03-01 10:30') == datetime(2026, 3, 1, 10, 30)
+    assert parse_date('not a date') is None
+
+
+def test_parse_date_converts_aware_inputs_to_local_time():
+    """Aware inputs become naive Europe/Paris times, the convention the ICS feed relies on."""
+    from datetime import datetime, timezone
+    from app.services.dates import parse_date
+    from app.services.ics_service import render_ics
+    assert parse_date('2026-03-01T10:30:00Z') == datetime(2026, 3, 1, 11, 30)
+    assert parse_date(datetime(2026, 7, 1, 16, 0, tzinfo=timezone.utc)) == datetime(2026, 7, 1, 18, 0)
+    kickoff = parse_date('2026-07-01T18:00:00+02:00')
+    assert kickoff == datetime(2026, 7, 1, 18, 0)
+    body = render_ics([{'id': 'm1', 'type': 'match', 'date': kickoff, 'title': 'vs FC Rival'}], 'Club')
+    assert 'DTSTART;TZID=Europe/Paris:20260701T180000' in body
+
+def test_date_range_filter():
+    """date_range should build a half-open BSON date range."""
+    from datetime import datetime
+    from app.services.dates import date_range
+    assert date_range('2026-03-01', '2026-04-01') == {
+        '$gte': datetime(2026, 3, 1), '$lt': datetime(2026, 4, 1)
+    }
+    assert date_range(None, None) is None
@@ -0,0 +1,139 @@
+"""Tests for RecurrenceService (recurring events and sessions)."""
+
+from datetime import datetime
+
+
+def test_expand_weekly_series_in_window(app, seed_club):
+    """Only occurrences inside the window are expanded; exceptions and count are honoured."""
+    with app.app_context():
+        from app.services import get_event_service
+        svc = get_event_service()
+        svc.create_recurring(str(seed_club['_id']), 'Entraînement', 'training', datetime(2030, 1, 7, 18),
+                             interval=1, count=6, exdates=['2030-01-21T18:00'])
+        docs = svc.recurrences.expand('event', str(seed_club['_id']), '2030-01-10', '2030-03-01')
+        assert [d['date'].day for d in docs] == [14, 28, 4, 11]
+        assert all(d['virtual'] for d in docs)
+
+
+def test_date_only_exception_cancels_the_day(app, seed_club):
+    """'2030-01-21' is stored as midnight but still cancels the 18:00 occurrence."""
+    with app.app_context():
+        from app.services import get_event_service
+        svc = get_event_service()
+        series = svc.create_recurring(str(seed_club['_id']), 'Entraînement', 'training', datetime(2030, 1, 7, 18),
+                                      count=4, exdates=['2030-01-14'])
+        svc.recurrences.add_exception(series['_id'], '2030-01-21')
+        docs = svc.recurrences.expand('event', str(seed_club['_id']), '2030-01-01', '2030-02-01')
+        assert [d['date'].day for d in docs] == [7, 28]
+
+
+def test_biweekly_until(app, seed_club):
+    with app.app_context():
+        from app.services import get_event_service
+        svc = get_event_service()
+        series = svc.create_recurring(str(seed_club['_id']), 'Réunion', 'meeting', datetime(2030, 1, 1, 19),
+                                      interval=2, until='2030-02-15')
+        dates = list(svc.recurrences.occurrences(series, datetime(2030, 1, 1), datetime(2030, 12, 31)))
+        assert [d.strftime('%m-%d') for d in dates] == ['01-01', '01-15', '01-29', '02-12']
+
+
+def test_attendance_materializes_occurrence(app, seed_club, seed_player):
+    """Recording attendance writes the occurrence once; expansion then skips it."""
+    with app.app_context():
+        from app.services import get_event_service
+        from app.services.recurrence_service import occurrence_id
+        svc = get_event_service()
+        club_id = str(seed_club['_id'])
+        series = svc.create_recurring(club_id, 'Entraînement', 'training', datetime(2030, 1, 7, 18), count=3)
+
+        occurrence = occurrence_id(series['_id'], datetime(2030, 1, 14, 18))
+        svc.set_attendance(occurrence, str(seed_player['_id']), 'present')
+        svc.set_attendance(occurrence, str(seed_player['_id']), 'late')
+
+        stored = list(svc.collection.find({'series_id': series['_id']}))
+        assert len(stored) == 1
+        assert stored[0]['attendance'] == {str(seed_player['_id']): 'late'}
+        remaining = svc.recurrences.expand('event', club_id, '2030-01-01', '2030-02-01')
+        assert [d['date'].day for d in remaining] == [7, 21]
+
+
+def _auth(app, user):
+    with app.test_request_context():
+        from app.routes.api import generate_token
+        return {'Authorization': f'Bearer {generate_token(user)}'}
+
+
+def _series(app, club_id):
+    with app.app_context():
+        from app.services import get_event_service
+        return get_event_service().create_recurring(str(club_id), 'Entraînement', 'training',
+                                                    datetime(2030, 1, 7, 18), count=3)
+
+
+def test_edit_occurrence_materializes_it(app, db, client, seed_club, seed_coach):
+    """PUT on an occurrence id stores that occurrence with the change; the series is untouched."""
+    from app.services.recurrence_service import occurrence_id
+    series = _series(app, seed_club['_id'])
+    occurrence = occurrence_id(series['_id'], datetime(2030, 1, 14, 18))
+
+    response = client.put(f'/api/coach/events/{occurrence}', json={'location': 'Stade annexe'},
+                          headers=_auth(app, seed_coach))
+    assert response.status_code == 200
+    stored = list(db.events.find({'series_id': series['_id']}))
+    assert [(s['occurrence_date'].day, s['location']) for s in stored] == [(14, 'Stade annexe')]
+    assert db.recurrences.find_one({'_id': series['_id']})['template'].get('location') != 'Stade annexe'
+
+    unknown = occurrence_id(series['_id'], datetime(2030, 1, 15, 18))
+    assert client.put(f'/api/coach/events/{unknown}', json={'location': 'X'},
+                      headers=_auth(app, seed_coach)).status_code == 404
+
+
+def test_delete_occurrence_adds_exception(app, db, client, seed_club, seed_coach, seed_player):
+    """DELETE on an occurrence id cancels that date, dropping its stored copy and attendance."""
+    from app.services.recurrence_service import occurrence_id
+    series = _series(app, seed_club['_id'])
+    occurrence = occurrence_id(series['_id'], datetime(2030, 1, 14, 18))
+    with app.app_context():
+        from app.services import get_event_service
+        get_event_service().set_attendance(occurrence, str(seed_player['_id']), 'present')
+
+    response = client.delete(f'/api/coach/events/{occurrence}', headers=_auth(app, seed_coach))
+    assert response.status_code == 200
+    assert db.recurrences.find_one({'_id': series['_id']})['exdates'] == [datetime(2030, 1, 14, 18)]
+    assert db.events.count_documents({'series_id': series['_id']}) == 0
+    assert db.attendance.count_documents({}) == 0
+    with app.app_context():
+        from app.services import get_event_service
+        docs = get_event_service().recurrences.expand('event', str(seed_club['_id']), '2030-01-01', '2030-02-01')
+        assert [d['date'].day for d in docs] == [7, 21]
+
+    assert client.delete(f'/api/coach/events/{occurrence}', headers=_auth(app, seed_coach)).status_code == 404
+
+
+def test_attendance_page_shows_occurrence(app, coach_client, seed_club):
+    """The attendance page accepts an occurrence id and shows the expanded occurrence."""
+    from app.services.recurrence_service import occurrence_id
+    series = _series(app, seed_club['_id'])
+    occurrence = occurrence_id(series['_id'], datetime(2030, 1, 21, 18))
+    with app.app_context():
+        from app.services import get_event_service
+        event = get_event_service().get_by_id(occurrence)
+        assert event['virtual'] and event['date'] == datetime(2030, 1, 21, 18)
+
+    response = coach_client.get(f'/coach/attendance/{occurrence}')
+    assert response.status_code == 200
+    assert f'data-event-id="{occurrence}"' in response.get_data(as_text=True)
+
+
+def test_invalid_exception_date_is_rejected(app, db, client, seed_club, seed_coach):
+    """An unparseable date is refused (400) instead of storing None; stored junk is ignored."""
+    series = _series(app, seed_club['_id'])
+    url = f"/api/coach/recurrences/{series['_id']}/exceptions"
+    assert client.post(url, json={'date': 'foo'}, headers=_auth(app, seed_coach)).status_code == 400
+    assert db.recurrences.find_one({'_id': series['_id']})['exdates'] == []
+
+    db.recurrences.update_one({'_id': series['_id']}, {'$push': {'exdates': None}})
+    with app.app_context():
+        from app.services import get_event_service
+        docs = get_event_service().recurrences.expand('event', str(seed_club['_id']), '2030-01-01', '2030-02-01')
+        assert [d['date'].day for d in docs] == [7, 14, 21]
@@ -0,0 +1,99 @@
+"""Tests for SearchService (in-process inverted index, BM25 ranking)."""
+from bson import ObjectId
+
+from app.services.search_service import fold, tokenize
+
+
+def get_service(app):
+    with app.app_context():
+        from app.services import get_search_service
+        return get_search_service()
+
+
+def test_tokenize_folds_accents_and_drops_stopwords():
+    """tokenize should lowercase, strip accents and skip French stopwords."""
+    assert fold('Équipe Réserve') == 'equipe reserve'
+    assert tokenize("L'équipe de la Cœur-Défense") == ['equipe', 'coeur', 'defense']
+
+
+def test_search_matches_accents_and_prefixes(app, seed_club):
+    """Queries match regardless of accents, and partial words match as prefixes."""
+    with app.app_context():
+        from app.services import get_post_service
+        posts = get_post_service()
+        post = posts.create(seed_club['_id'], None, 'Victoire de l’équipe réserve', 'Beau match')
+        svc = get_service(app)
+
+        for q in ('equipe', 'ÉQUIPE', 'rés', 'victoire reserve'):
+            hits = svc.search(seed_club['_id'], q)
+            assert [h['id'] for h in hits] == [str(post['_id'])], q
+        assert svc.search(seed_club['_id'], 'victoire defaite') == []
+
+
+def test_search_ranks_with_bm25(app, seed_club):
+    """Title matches and repeated terms rank above passing mentions."""
+    with app.app_context():
+        from app.services import get_post_service
+        posts = get_post_service()
+        weak = posts.create(seed_club['_id'], None, 'Programme du week-end', 'Un mot sur le tournoi et le reste')
+        strong = posts.create(seed_club['_id'], None, 'Tournoi U13', 'Le tournoi U13 commence samedi')
+        posts.create(seed_club['_id'], None, 'Assemblée générale', 'Ordre du jour')
+
+        hits = get_service(app).search(seed_club['_id'], 'tournoi')
+        assert [h['id'] for h in hits] == [str(strong['_id']), str(weak['_id'])]
+        assert hits[0]['score'] > hits[1]['score']
+        assert hits[0]['type'] == 'posts' and hits[0]['title'] == 'Tournoi U13'
+
+
+def test_search_follows_updates_and_deletes(app, seed_club):
+    """Service writes update the index; deleted documents disappear."""
+    with app.app_context():
+        from app.services import get_post_service
+        posts = get_post_service()
+        svc = get_service(app)
+        post = posts.create(seed_club['_id'], None, 'Stage de Pâques', 'Inscriptions ouvertes')
+        assert svc.search(seed_club['_id'], 'paques')
+
+        posts.update(post['_id'], {'title': 'Stage de Toussaint'})
+        assert svc.search(seed_club['_id'], 'paques') == []
+        assert svc.search(seed_club['_id'], 'toussaint')
+
+        posts.delete(post['_id'])
+        assert svc.search(seed_club['_id'], 'toussaint') == []
+
+
+def test_search_types_and_club_scope(app, seed_club):
+    """Results are limited to the requested types and to the caller's club."""
+    with app.app_context():
+        from app.services import get_player_service, get_post_service
+        get_player_service().create(seed_club['_id'], 9, 'ATT', 'Karim Benali')
+        get_post_service().create(seed_club['_id'], None, 'Benali signe', 'Contrat prolongé')
+        get_post_service().create(ObjectId(), None, 'Benali ailleurs', 'Autre club')
+        svc = get_service(app)
+
+        assert {h['type'] for h in svc.search(seed_club['_id'], 'benali')} == {'players', 'posts'}
+        assert [h['type'] for h in svc.search(seed_club['_id'], 'benali', types=['players'])] == ['players']
+
+
+def test_search_rebuilds_from_source(app, seed_club, db):
+    """Documents written outside the services are picked up by a rebuild."""
+    with app.app_context():
+        db.drills.insert_one({'club_id': seed_club['_id'], 'name': 'Toro 5 contre 2', 'category': 'technical'})
+        svc = get_service(app)
+        svc.rebuild(str(seed_club['_id']), 'drills')
+
+        from app.services.search_service import _indexes
+        _indexes.clear()
+        hits = svc.search(seed_club['_id'], 'toro', types=['drills'])
+        assert [h['title'] for h in hits] == ['Toro 5 contre 2']
+
+
+def test_post_search_treats_query_literally(app, seed_club):
+    """PostService.search never reads the query as a regex or as $text operators."""
+    with app.app_context():
+        from app.services import get_post_service
+        posts = get_post_service()
+        posts.create(seed_club['_id'], None, 'Score 3+1 (final)', '')
+        posts.create(seed_club['_id'], None, 'Score 31', '')
+        assert [p['title'] for p in posts.search(seed_club['_id'], '3+1 (')] == ['Score 3+1 (final)']
+        assert posts.search(seed_club['_id'], '.*') == []
@@ -0,0 +1,23 @@
+"""Tests for PlayerSnapshotService."""
+
+
+def test_snapshot_is_reused(app, seed_player):
+    """get_snapshot should build once and serve the stored snapshot afterwards."""
+    with app.app_context():
+        from app.services import get_player_snapshot_service
+        svc = get_player_snapshot_service()
+        first = svc.get_snapshot(str(seed_player['_id']))
+        second = svc.get_snapshot(str(seed_player['_id']))
+        assert first['dashboard']['name'] == 'Player User'
+        assert second['built_at'] == first['built_at']
+
+
+def test_rating_update_invalidates_snapshot(app, seed_player):
+    """Player writes should drop the snapshot so the next read is fresh."""
+    with app.app_context():
+        from app.services import get_player_snapshot_service, get_player_service
+        svc = get_player_snapshot_service()
+        svc.get_snapshot(str(seed_player['_id']))
+        get_player_service().update_technical_ratings(str(seed_player['_id']), {'VIT': 99})
+        assert svc.collection.count_documents({'_id': seed_player['_id']}) == 0
+        assert svc.get_dashboard(str(seed_player['_id']))['technical_ratings'] == {'VIT': 99}
@@ -0,0 +1,71 @@
+"""Tests for StandingsService (competition tables)."""
+
+from datetime import datetime
+
+
+def _league(app, club_id):
+    from app.services import get_competition_service
+    return get_competition_service().create(club_id, {'name': 'District 1', 'type': 'league'})
+
+
+def test_finish_match_updates_table_incrementally(app, seed_club, seed_team):
+    """Finishing a match adds it to the table; correcting the score applies only the difference."""
+    with app.app_context():
+        from app.services import get_match_service, get_standings_service
+        club_id = str(seed_club['_id'])
+        comp = _league(app, club_id)
+        svc = get_match_service()
+        match = svc.create(club_id, 'FC Rival', datetime(2030, 3, 1), team_id=str(seed_team['_id']),
+                           competition_id=str(comp['_id']))
+        svc.set_score(str(match['_id']), 2, 1, status='completed')
+
+        table = get_standings_service().get_table(str(comp['_id']))
+        assert [(r['name'], r['points']) for r in table] == [(seed_team['name'], 3), ('FC Rival', 0)]
+
+        svc.set_score(str(match['_id']), 1, 1)
+        table = get_standings_service().get_table(str(comp['_id']))
+        assert [r['points'] for r in table] == [1, 1]
+        assert all(r['played'] == 1 and r['drawn'] == 1 for r in table)
+        assert table[0]['form'] == ['D']
+
+
+def test_recompute_matches_incremental(app, seed_club, seed_team):
+    """A full recompute yields the same table as the incremental updates."""
+    with app.app_context():
+        from app.services import get_match_service, get_standings_service
+        club_id = str(seed_club['_id'])
+        comp = _league(app, club_id)
+        svc = get_match_service()
+        for opponent, home, away in (('A', 3, 0), ('B', 0, 2), ('A', 1, 1)):
+            m = svc.create(club_id, opponent, datetime(2030, 3, 1), team_id=str(seed_team['_id']),
+                           competition_id=str(comp['_id']))
+            svc.set_score(str(m['_id']), home, away, status='completed')
+
+        standings = get_standings_service()
+        incremental = standings.get_table(str(comp['_id']))
+        standings.recompute(str(comp['_id']))
+        assert standings.get_table(str(comp['_id'])) == incremental
+        assert incremental[0]['played'] == 3
+
+
+def test_table_cache_follows_competition_generation(app, seed_club, seed_team):
+    """A result applied by another worker (generation bump) drops the cached table here too."""
+    with app.app_context():
+        from app.services import get_match_service, get_standings_service
+        from app.services.db import mongo
+        club_id = str(seed_club['_id'])
+        comp = _league(app, club_id)
+        comp_id = str(comp['_id'])
+        m = get_match_service().create(club_id, 'FC Rival', datetime(2030, 3, 1), team_id=str(seed_team['_id']),
+                                       competition_id=comp_id)
+        get_match_service().set_score(str(m['_id']), 2, 0, status='completed')
+
+        standings = get_standings_service()
+        assert standings.get_table(comp_id)[0]['points'] == 3
+
+        doc = standings.collection.find_one({'_id': comp['_id']})
+        key = next(k for k, row in doc['rows'].items() if row['points'] == 3)
+        standings.collection.update_one({'_id': comp['_id']}, {'$set': {f'rows.{key}.points': 7}})
+        assert standings.get_table(comp_id)[0]['points'] == 3
+        mongo.db.cache_generations.update_one({'_id': f'standings:{comp_id}'}, {'$inc': {'gen': 1}}, upsert=True)
+        assert standings.get_table(comp_id)[0]['points'] == 7
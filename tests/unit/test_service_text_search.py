@@ -0,0 +1,68 @@
+"""Tests for $text search over posts and announcements."""
+from datetime import datetime, timedelta
+
+from app.services.text_search import prefix_of, text_terms
+
+
+def test_user_input_is_reduced_to_plain_words():
+    """Quotes, negations and regex characters never reach $search."""
+    assert text_terms('"victoire" -défaite (3-0)') == 'victoire défaite 3 0'
+    assert text_terms('.*') == ''
+    assert prefix_of('entr*') == 'entr'
+    assert prefix_of('entraînement') is None
+    assert prefix_of('*') is None
+
+
+def _posts(app, seed_club, seed_admin, *rows):
+    with app.app_context():
+        from app.services import get_post_service
+        svc = get_post_service()
+        for title, content, age_days in rows:
+            post = svc.create(seed_club['_id'], seed_admin['_id'], title, content)
+            svc.collection.update_one({'_id': post['_id']},
+                                      {'$set': {'created_at': datetime.utcnow() - timedelta(days=age_days)}})
+        return svc
+
+
+def test_title_outranks_content_and_recent_posts_win(app, seed_club, seed_admin):
+    """Title matches beat content matches, unless they are months older."""
+    svc = _posts(app, seed_club, seed_admin,
+                 ('Résultats du week-end', 'Belle victoire des U15', 0),
+                 ('Victoire en coupe', 'Qualification pour le tour suivant', 2),
+                 ('Victoire au tournoi', 'Les seniors remportent le tournoi', 200),
+                 ('Stage de Pâques', 'Inscriptions ouvertes', 0))
+    with app.app_context():
+        titles = [p['title'] for p in svc.search(seed_club['_id'], 'victoires')]
+        assert titles == ['Victoire en coupe', 'Résultats du week-end', 'Victoire au tournoi']
+        assert svc.search(seed_club['_id'], '"-victoire"')
+
+
+def test_prefix_queries_use_anchored_regex(app, seed_club, seed_admin):
+    """"entr*" and unfinished single words match title prefixes, accents and regex chars kept literal."""
+    svc = _posts(app, seed_club, seed_admin,
+                 ('Entraînement annulé', 'Terrain gelé', 1),
+                 ('Entrée gratuite', 'Match de gala', 0),
+                 ('Nouvel entraîneur', 'Bienvenue', 0),
+                 ('(Réunion) parents', 'Salle du club', 0))
+    with app.app_context():
+        assert [p['title'] for p in svc.search(seed_club['_id'], 'entr*')] == ['Entrée gratuite', 'Entraînement annulé']
+        assert [p['title'] for p in svc.search(seed_club['_id'], 'entraînem')] == ['Entraînement annulé']
+        assert [p['title'] for p in svc.search(seed_club['_id'], '(Réu*')] == ['(Réunion) parents']
+
+
+def test_announcements_search(app, db, seed_club, seed_admin):
+    """get_announcements(q=...) searches subjects and bodies and keeps sender names."""
+    now = datetime.utcnow()
+    db.announcements.insert_many([
+        {'club_id': seed_club['_id'], 'subject': 'Assemblée générale', 'body': 'Vote du budget',
+         'sent_by': seed_admin['_id'], 'sent_at': now},
+        {'club_id': seed_club['_id'], 'subject': 'Tournoi de Noël', 'body': 'Inscriptions avant vendredi',
+         'sent_at': now - timedelta(days=3)},
+    ])
+    with app.app_context():
+        from app.services import get_announcement_service
+        svc = get_announcement_service()
+        found = svc.get_announcements(seed_club['_id'], q='budget')
+        assert [(a['subject'], a['sender_name']) for a in found] == [('Assemblée générale', 'Admin User')]
+        assert [a['subject'] for a in svc.get_announcements(seed_club['_id'], q='tour*')] == ['Tournoi de Noël']
+        assert len(svc.get_announcements(seed_club['_id'])) == 2
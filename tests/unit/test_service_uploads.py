@@ -0,0 +1,142 @@
+"""Tests for the content-addressed upload store and /api/files."""
+import io
+
+import pytest
+
+from app.services.upload_store import LocalBlobStore, UploadService, blob_key
+
+PDF = b'%PDF-1.4 licence'
+
+
+def _auth(app, user):
+    with app.test_request_context():
+        from app.routes.api import generate_token
+        return {'Authorization': f'Bearer {generate_token(user)}'}
+
+
+@pytest.fixture
+def uploads(app, db, tmp_path):
+    root = app.config['UPLOAD_ROOT']
+    app.config['UPLOAD_ROOT'] = str(tmp_path)
+    yield UploadService(db, LocalBlobStore(str(tmp_path)))
+    app.config['UPLOAD_ROOT'] = root
+
+
+def test_identical_files_stored_once(uploads, db, tmp_path, seed_club, seed_player_user):
+    """The same bytes map to one blob and one record listing every owner."""
+    first = uploads.save(PDF, 'pdf', club_id=seed_club['_id'], public=False)
+    second = uploads.save(PDF, 'pdf', user_id=seed_player_user['_id'], public=False)
+
+    key = blob_key(PDF, 'pdf')
+    assert first == second == {'key': key, 'url': f'/api/files/{key}', 'size': len(PDF)}
+    assert [p.name for p in tmp_path.rglob('*.pdf')] == [key]
+    stored = db.uploads.find_one({'_id': key})
+    assert stored['club_ids'] == [seed_club['_id']]
+    assert stored['user_ids'] == [seed_player_user['_id']]
+    assert stored['public'] is False
+    assert stored['content_type'] == 'application/pdf'
+
+    uploads.save(PDF, 'pdf')
+    assert db.uploads.find_one({'_id': key})['public'] is True
+
+
+def test_public_file_served_with_immutable_cache(uploads, client):
+    """Public blobs need no token and can be cached forever."""
+    key = uploads.save(b'<svg/>', 'svg')['key']
+    response = client.get(f'/api/files/{key}')
+    assert response.status_code == 200
+    assert response.data == b'<svg/>'
+    assert 'immutable' in response.headers['Cache-Control']
+
+    assert client.get('/api/files/not-a-key.svg').status_code == 404
+
+
+def test_private_file_needs_owner_or_club_staff(app, uploads, client, seed_club, seed_coach,
+                                                seed_player_user):
+    """Private documents go to their owner and club staff only."""
+    key = uploads.save(PDF, 'pdf', club_id=seed_club['_id'], user_id=seed_player_user['_id'],
+                       public=False)['key']
+    player = _auth(app, seed_player_user)
+
+    assert client.get(f'/api/files/{key}').status_code == 401
+    assert client.get(f'/api/files/{key}', headers=_auth(app, seed_coach)).data == PDF
+    response = client.get(f'/api/files/{key}', headers=player)
+    assert response.status_code == 200
+    assert response.headers['Cache-Control'] == 'private, no-cache'
+
+    # Same club, but players only see their own documents
+    other = uploads.save(b'%PDF-1.4 other', 'pdf', club_id=seed_club['_id'], public=False)['key']
+    assert client.get(f'/api/files/{other}', headers=player).status_code == 403
+
+
+def test_accel_modes_leave_the_bytes_to_the_web_server(app, uploads, client):
+    """X-Accel-Redirect / X-Sendfile responses carry headers only."""
+    key = uploads.save(b'<svg/>', 'svg')['key']
+    digest = key.split('.')[0]
+    try:
+        app.config['UPLOAD_ACCEL'] = 'x-accel'
+        response = client.get(f'/api/files/{key}')
+        assert response.headers['X-Accel-Redirect'] == f'/_uploads/{digest[:2]}/{digest[2:4]}/{key}'
+        assert response.data == b''
+        assert response.content_type == 'image/svg+xml'
+
+        app.config['UPLOAD_ACCEL'] = 'x-sendfile'
+        response = client.get(f'/api/files/{key}')
+        assert response.headers['X-Sendfile'] == uploads.store.path(key)
+    finally:
+        app.config['UPLOAD_ACCEL'] = ''
+
+
+def test_admin_document_upload_is_private(app, uploads, db, client, seed_admin, seed_player):
+    """Member documents land in the store as private blobs of the player's club."""
+    response = client.post(
+        f"/api/admin/members/{seed_player['user_id']}/documents/license",
+        data={'file': (io.BytesIO(PDF), 'licence.pdf')},
+        headers=_auth(app, seed_admin),
+        content_type='multipart/form-data',
+    )
+    assert response.status_code == 200
+    key = blob_key(PDF, 'pdf')
+    assert response.get_json()['file'] == f'/api/files/{key}'
+    stored = db.uploads.find_one({'_id': key})
+    assert stored['public'] is False
+    assert stored['club_ids'] == [seed_player['club_id']]
+
+
+def test_signed_link_opens_private_file_without_token(app, uploads, client, seed_club, seed_coach, seed_player_user):
+    """/link gives readers a short-lived URL that plain browser links can follow."""
+    key = uploads.save(PDF, 'pdf', club_id=seed_club['_id'], public=False)['key']
+
+    assert client.get(f'/api/files/{key}/link', headers=_auth(app, seed_player_user)).status_code == 403
+    url = client.get(f'/api/files/{key}/link', headers=_auth(app, seed_coach)).get_json()['data']['url']
+    assert client.get(url).data == PDF
+
+    assert client.get(url.replace('sig=', 'sig=0')).status_code == 403
+    with app.app_context():
+        from app.services.upload_store import signed_url
+        expired = signed_url(key, app.config['SECRET_KEY'], expires_in=-1)
+    assert client.get(expired).status_code == 403
+
+
+def test_player_photo_upload_sets_photo_variants(app, uploads, db, client, seed_player_user, seed_player):
+    """A photo sent as a player document becomes the player's photo, with its variants."""
+    try:
+        from PIL import Image
+        buf = io.BytesIO()
+        Image.new('RGB', (400, 300), 'red').save(buf, 'JPEG')
+        photo = buf.getvalue()
+    except ImportError:
+        # Without Pillow the original is stored and every variant points to it
+        photo = b'\xff\xd8\xff\xe0 photo'
+    response = client.post(
+        '/api/player/documents/photo',
+        data={'file': (io.BytesIO(photo), 'moi.jpg')},
+        headers=_auth(app, seed_player_user),
+        content_type='multipart/form-data',
+    )
+    assert response.status_code == 200
+    data = response.get_json()['data']
+    player = db.players.find_one({'_id': seed_player['_id']})
+    assert player['photo'] == data['url']
+    assert player['photo_variants'] == data['variants']
+    assert player['documents']['photo']['file'] == data['url']
@@ -108,3 +108,28 @@ def test_get_members_by_club(app, seed_club, seed_admin, seed_coach):
         svc = get_service(app)
         members = svc.get_members_by_club(str(seed_club['_id']))
         assert len(members) >= 2
+
+
+def test_list_members_filters_pages_and_facets(app, seed_club, seed_team, seed_coach, seed_player):
+    """Search, paging and the role/status facets come from one aggregation."""
+    with app.app_context():
+        from app.services import get_user_service
+        svc = get_user_service()
+        club_id = str(seed_club['_id'])
+        for i in range(3):
+            svc.create_pending_user(f'fan{i}@test.com', role='fan', club_id=club_id,
+                                    profile={'first_name': 'Fan', 'last_name': f'Numéro {i}'})
+
+        page = svc.list_members(club_id, role='fan', sort='-name', page=2, per_page=2)
+        assert page['total'] == 3
+        assert [m['profile']['last_name'] for m in page['items']] == ['Numéro 0']
+        assert page['facets']['role'] == {'fan': 3, 'coach': 1, 'player': 1}
+        assert page['facets']['status'] == {'pending': 3}
+
+        players = svc.list_members(club_id, team_id=str(seed_team['_id']))
+        assert [m['email'] for m in players['items']] == ['player@test.com']
+        assert players['items'][0]['player_data']['player_id'] == str(seed_player['_id'])
+        assert 'password_hash' not in players['items'][0]
+
+        assert svc.list_members(club_id, search='fan1 numéro')['total'] == 1
+        assert svc.list_members(club_id, search='.*')['total'] == 0
@@ -0,0 +1,85 @@
+"""Tests for the buffered view counters."""
+import time
+
+from bson import ObjectId
+
+from app.services.view_counter import ViewCounter, views
+
+
+def test_views_coalesce_until_flush(app, db):
+    """Views are kept in memory and written as one $inc per document."""
+    first, second = ObjectId(), ObjectId()
+    db.media.insert_many([{'_id': first, 'views': 3}, {'_id': second}])
+    counter = ViewCounter(flush_seconds=0)
+    for _ in range(5):
+        counter.record(db, 'media', first)
+    counter.record(db, 'media', str(second))
+
+    assert counter.pending('media', first) == 5
+    assert db.media.find_one({'_id': first})['views'] == 3
+
+    assert counter.flush() == 2
+    assert db.media.find_one({'_id': first})['views'] == 8
+    assert db.media.find_one({'_id': second})['views'] == 1
+    assert counter.pending('media', first) == 0
+    assert counter.flush() == 0
+
+
+def test_flush_wakes_after_max_pending(app, db):
+    """Reaching max_pending flushes without waiting for the interval."""
+    media_id = db.media.insert_one({'views': 0}).inserted_id
+    counter = ViewCounter(flush_seconds=60, max_pending=3)
+    for _ in range(3):
+        counter.record(db, 'media', media_id)
+    deadline = time.monotonic() + 5
+    while db.media.find_one({'_id': media_id})['views'] != 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert db.media.find_one({'_id': media_id})['views'] == 3
+
+
+def test_media_views_and_top_viewed(app, db, seed_club):
+    """get_media counts views through the buffer; get_top_viewed ranks by views."""
+    with app.app_context():
+        from app.services import get_media_service
+        svc = get_media_service()
+        quiet = svc.upload_media(seed_club['_id'], {'title': 'Échauffement'})
+        popular = svc.upload_media(seed_club['_id'], {'title': 'But de la victoire'})
+        for _ in range(3):
+            item = svc.get_media(popular)
+        svc.get_media(quiet)
+        assert item['views'] == 3
+
+        views.flush()
+        top = svc.get_top_viewed(seed_club['_id'])
+        assert [(m['title'], m['views']) for m in top] == [('But de la victoire', 3), ('Échauffement', 1)]
+
+
+def test_post_views_and_announcement_opens(app, db, seed_club, seed_admin):
+    """Post views and announcement opens use the same buffer."""
+    with app.app_context():
+        from app.services import get_announcement_service, get_post_service
+        posts = get_post_service()
+        post = posts.create(seed_club['_id'], seed_admin['_id'], 'Résultats', 'Victoire 2-0')
+        announcement_id = db.announcements.insert_one({'club_id': seed_club['_id'], 'subject': 'AG'}).inserted_id
+        posts.record_view(post['_id'])
+        posts.record_view(post['_id'])
+        assert get_announcement_service().record_open(announcement_id, seed_club['_id'])
+
+        views.flush()
+        assert db.posts.find_one({'_id': post['_id']})['views'] == 2
+        assert db.announcements.find_one({'_id': announcement_id})['opens'] == 1
+
+
+def test_announcement_opens_are_limited_to_own_club(app, db, client, seed_club, seed_admin):
+    """Opening another club's announcement is a 404 and is not counted."""
+    foreign_id = db.announcements.insert_one({'club_id': ObjectId(), 'subject': 'AG'}).inserted_id
+    own_id = db.announcements.insert_one({'club_id': seed_club['_id'], 'subject': 'AG'}).inserted_id
+    with app.test_request_context():
+        from app.routes.api import generate_token
+        headers = {'Authorization': f'Bearer {generate_token(seed_admin)}'}
+    assert client.post(f'/api/announcements/{foreign_id}/open', headers=headers).status_code == 404
+    assert client.post(f'/api/announcements/{own_id}/open', headers=headers).status_code == 200
+
+    views.flush()
+    assert 'opens' not in db.announcements.find_one({'_id': foreign_id})
+    assert db.announcements.find_one({'_id': own_id})['opens'] == 1